@@ -8,15 +8,25 @@ from lakefs.reference import Reference
 from lakefs.models import (
     Commit,
     Change,
+    ChangeStats,
+    DiffSummary,
     ImportStatus,
     ServerStorageConfiguration,
     ObjectInfo,
+    PrefixUsage,
     CommonPrefix,
-    RepositoryProperties
+    RepositoryProperties,
+    LinkResult,
+    SyncResult,
+    TransferStats,
+    UploadResult,
 )
 from lakefs.tag import Tag
 from lakefs.branch import Branch
 from lakefs.object import StoredObject, WriteableObject, ObjectReader
+from lakefs.cache import ObjectCache
+from lakefs.index import ObjectIndex
+from lakefs.commit_graph import CommitGraph
 from lakefs.branch import LakeFSDeprecationWarning
 
 
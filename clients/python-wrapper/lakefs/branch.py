@@ -4,25 +4,81 @@ Module containing lakeFS branch implementation
 
 from __future__ import annotations
 
+import collections
+import hashlib
+import http
+import os
+import re
+import time
 import uuid
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Optional, Generator, Iterable, Literal, Dict
+from pathlib import Path
+from typing import Optional, Generator, Iterable, Iterator, Literal, Dict, BinaryIO, Callable, Tuple, get_args
 
 import lakefs_sdk
+import urllib3
 from lakefs.client import Client
-from lakefs.object import WriteableObject
+from lakefs.object import WriteableObject, WriteModes, ObjectWriter
 from lakefs.object import StoredObject
 from lakefs.import_manager import ImportManager
-from lakefs.reference import Reference, ReferenceType, generate_listing
-from lakefs.models import Change, Commit
+from lakefs.reference import (
+    Reference,
+    ReferenceType,
+    _diff_parallel,
+    _diff_summary,
+    _generate_records,
+    _rollup_usage,
+    _usage_key
+)
+from lakefs.models import (
+    Change,
+    Commit,
+    DiffSummary,
+    LinkResult,
+    ObjectInfo,
+    PrefixUsage,
+    SyncResult,
+    TransferStats,
+    UploadResult
+)
 from lakefs.exceptions import (
     api_exception_handler,
     ConflictException,
     LakeFSException,
+    ServerException,
     TransactionException
 )
 
+_DELETE_BATCH_SIZE = 1000  # Maximal number of paths the server accepts in a single delete_objects call
+_HASH_CHUNK_SIZE = 1024 * 1024
+_MD5_CHECKSUM = re.compile(r"[0-9a-f]{32}")
+_LINK_ATTEMPTS = 4  # Number of attempts to link an object before reporting its error
+_LINK_RETRY_BACKOFF = 0.5  # Seconds to wait before the first link retry, doubled on every retry
+
+
+def _bounded_map(func: Callable, items: Iterable[tuple], max_workers: int, with_items: bool = False) -> Iterator:
+    """
+    Call func on each item tuple concurrently, and yield the results in the order of the items.
+    Items are consumed lazily - the number of pending calls is bounded, so large iterables are never materialized.
+
+    :param func: The function to call, with the item tuple unpacked
+    :param items: The items to process
+    :param max_workers: Maximal number of concurrent calls
+    :param with_items: Yield (item, result) pairs instead of results
+    """
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for item in items:
+            if len(pending) >= 2 * max_workers:
+                done_item, future = pending.popleft()
+                yield (done_item, future.result()) if with_items else future.result()
+            pending.append((item, executor.submit(func, *item)))
+        while pending:
+            done_item, future = pending.popleft()
+            yield (done_item, future.result()) if with_items else future.result()
+
 
 class LakeFSDeprecationWarning(Warning):
     """
@@ -58,10 +114,90 @@ class _BaseBranch(Reference):
         :raise ServerException: for any other errors
         """
 
-        for diff in generate_listing(self._client.sdk_client.branches_api.diff_branch,
-                                     self._repo_id, self._id, max_amount=max_amount, after=after, prefix=prefix,
-                                     **kwargs):
-            yield Change(**diff.dict())
+        for diff in _generate_records(self._client, self._client.sdk_client.branches_api.diff_branch,
+                                      self._repo_id, self._id, max_amount=max_amount, after=after, prefix=prefix,
+                                      **kwargs):
+            yield Change(**diff)
+
+    def usage(self,
+              prefix: str = "",
+              depth: int = 1,
+              max_workers: Optional[int] = None,
+              directory: Optional[str | os.PathLike] = None) -> Dict[str, PrefixUsage]:
+        """
+        Returns the number and total size of the objects under prefix, and under each of its sub-prefixes up to depth
+        levels deep (similar to du), including uncommitted changes.
+        The usage of the head commit is computed once and cached by commit ID. The uncommitted changes are then
+        applied to it, so only the changed objects are looked at on later calls. See Reference.usage.
+
+        :param prefix: Compute the usage of objects prefixed with this value
+        :param depth: Number of sub-prefix levels (split by '/') to report under prefix
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :param directory: (Optional) The cache directory, defaults to $XDG_CACHE_HOME/lakefs (or ~/.cache/lakefs)
+        :return: The usage by prefix. Includes prefix itself, with the total usage
+        :raise ValueError: if depth is negative
+        :raise NotFoundException: if branch or repository do not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        if depth < 0:
+            raise ValueError("depth must be a non-negative integer")
+        commit_id = self.get_commit().id
+        leaves = self._commit_usage(commit_id, prefix, depth, max_workers, directory)
+        changes = [c for c in self.uncommitted(prefix=prefix) if c.path_type == "object"]
+
+        def committed_size(change: Change) -> int:
+            if change.type == "added":
+                return 0
+            return StoredObject(self._repo_id, commit_id, change.path, client=self._client).stat().size_bytes or 0
+
+        workers = max(1, max_workers or self._client.config.connection_pool_maxsize)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for change, old_size in zip(changes, executor.map(committed_size, changes)):
+                usage = leaves.setdefault(_usage_key(change.path, prefix, depth), [0, 0])
+                if change.type == "added":
+                    usage[0] += 1
+                elif change.type == "removed":
+                    usage[0] -= 1
+                usage[1] += (0 if change.type == "removed" else change.size_bytes or 0) - old_size
+        return _rollup_usage(leaves, prefix)
+
+    def uncommitted_parallel(self,
+                             prefix: str = "",
+                             ordered: bool = True,
+                             max_workers: Optional[int] = None) -> Generator[Change]:
+        """
+        Returns a generator of all uncommitted changes on this branch, listed concurrently.
+        The diff is sharded by the common prefixes directly under prefix (using the '/' delimiter), and the shards
+        are listed concurrently.
+
+        :param prefix: Return changes prefixed with this value
+        :param ordered: Yield changes in lexicographic order, same as uncommitted(). If False, changes are yielded as
+            soon as they are listed, which is faster.
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :raise NotFoundException: if branch or repository do not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        yield from _diff_parallel(self._client, self._client.sdk_client.branches_api.diff_branch, prefix, ordered,
+                                  max_workers, repository=self._repo_id, branch=self._id)
+
+    def uncommitted_summary(self, prefix: str = "", max_workers: Optional[int] = None) -> DiffSummary:
+        """
+        Returns the number and total size of uncommitted changes on this branch, in total, by change type and by the
+        common prefixes directly under prefix. See Reference.diff_summary.
+
+        :param prefix: Summarize changes prefixed with this value
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :raise NotFoundException: if branch or repository do not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        return _diff_summary(self._client, self._client.sdk_client.branches_api.diff_branch, prefix, max_workers,
+                             repository=self._repo_id, branch=self._id)
 
     def delete_objects(self, object_paths: str | StoredObject | Iterable[str | StoredObject]) -> None:
         """
@@ -102,6 +238,222 @@ class _BaseBranch(Reference):
                 lakefs_sdk.PathList(paths=object_paths)
             )
 
+    def upload_many(self,
+                    items: Iterable[Tuple[str, str | bytes | os.PathLike | BinaryIO]],
+                    mode: WriteModes = 'wb',
+                    pre_sign: Optional[bool] = None,
+                    content_type: Optional[str] = None,
+                    metadata: Optional[dict[str, str]] = None,
+                    *,
+                    max_workers: Optional[int] = None,
+                    stats: Optional[TransferStats] = None) -> list[UploadResult]:
+        """
+        Upload many objects to this branch concurrently.
+        Uploads run on a bounded thread pool, so the staging calls of several objects are in flight at the same
+        time instead of being serialized. Items are consumed lazily, so the iterable may be a generator.
+        A failed upload does not stop the others - its error is reported in the matching result.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import pathlib
+            import lakefs
+
+            branch = lakefs.repository("<repository_name>").branch("<branch_name>")
+            stats = lakefs.TransferStats()
+            files = pathlib.Path("/tmp/outputs").glob("*.json")
+            results = branch.upload_many(((f"outputs/{f.name}", f) for f in files), stats=stats)
+            failed = [r for r in results if r.error is not None]
+            print(f"{stats.objects} objects, {stats.bytes_per_second:.0f} bytes/sec")
+
+        :param items: An iterable of (path, data) pairs. Data is either the object content (str or bytes), a local file
+            path (os.PathLike) or a seekable binary file
+        :param mode: Write mode - as supported by WriteModes
+        :param pre_sign: (Optional) Explicitly state whether to use pre_sign mode when uploading the objects.
+            If None, will be taken from the server storage configuration.
+        :param content_type: (Optional) Explicitly set the Content-Type of all objects
+        :param metadata: (Optional) User metadata of all objects
+        :param max_workers: (Optional) Maximal number of concurrent uploads, defaults to the client connection pool size
+        :param stats: (Optional) Throughput counters to update as uploads complete
+        :return: A result per item, in the order of the items
+        :raise ValueError: if mode is not a valid write mode
+        """
+        if mode not in get_args(WriteModes):
+            raise ValueError(f"invalid write mode: '{mode}'. WriteModes: {WriteModes}")
+        if pre_sign is None:  # Resolve once instead of on every upload
+            pre_sign = self._client.storage_config.pre_sign_support
+        if stats is None:
+            stats = TransferStats()
+
+        def upload(path: str, data: str | bytes | os.PathLike | BinaryIO) -> UploadResult:
+            obj = self.object(path)
+            try:
+                if isinstance(data, (str, bytes)):
+                    with ObjectWriter(obj, mode, pre_sign, content_type, metadata, self._client) as writer:
+                        writer.write(data)
+                elif isinstance(data, os.PathLike):
+                    obj.upload_file(data, mode, pre_sign, content_type, metadata)
+                else:
+                    ObjectWriter(obj, mode, pre_sign, content_type, metadata, self._client, source=data).close()
+                info = obj.stat()  # Cached by the upload
+            except (LakeFSException, OSError, urllib3.exceptions.HTTPError) as e:
+                stats.add(error=True)
+                return UploadResult(path=path, stats=None, error=e)
+            stats.add(info.size_bytes or 0)
+            return UploadResult(path=path, stats=info, error=None)
+
+        workers = max(1, max_workers or self._client.config.connection_pool_maxsize)
+        return list(_bounded_map(upload, items, workers))
+
+    def link_many(self,
+                  items: Iterable[Tuple[str, lakefs_sdk.StagingMetadata]],
+                  *,
+                  max_workers: Optional[int] = None,
+                  stats: Optional[TransferStats] = None) -> LinkResult:
+        """
+        Link many objects already written to the storage namespace to this branch, concurrently.
+        Link calls that fail on connection errors, throttling or server errors are retried with exponential backoff,
+        and the number of pending calls is bounded, so items are consumed lazily - the iterable may be a generator.
+        A failed link does not stop the others - its error is reported in the result.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+            import lakefs_sdk
+
+            branch = lakefs.repository("<repository_name>").branch("<branch_name>")
+            files = [("tables/part-0000.parquet", "s3://bucket/namespace/data/part-0000.parquet", 1234, "etag")]
+            res = branch.link_many((path, lakefs_sdk.StagingMetadata(
+                staging=lakefs_sdk.StagingLocation(physical_address=address), size_bytes=size, checksum=checksum))
+                for path, address, size, checksum in files)
+            print(f"linked {res.linked} objects, {len(res.errors)} failed")
+
+        :param items: An iterable of (path, staging metadata) pairs
+        :param max_workers: (Optional) Maximal number of concurrent link calls, defaults to the client connection pool
+            size
+        :param stats: (Optional) Throughput counters to update as links complete
+        :return: The number of linked objects and bytes, and the errors by path
+        """
+        if stats is None:
+            stats = TransferStats()
+        staging_api = self._client.sdk_client.staging_api
+
+        def link(path: str, staging_metadata: lakefs_sdk.StagingMetadata) -> Optional[LakeFSException]:
+            attempt = 1
+            while True:
+                try:
+                    with api_exception_handler():
+                        staging_api.link_physical_address(self._repo_id, self._id, path, staging_metadata)
+                    stats.add(staging_metadata.size_bytes or 0)
+                    return None
+                except (urllib3.exceptions.HTTPError, LakeFSException) as e:
+                    status = e.status_code if isinstance(e, ServerException) else None
+                    retryable = not isinstance(e, LakeFSException) or status == http.HTTPStatus.TOO_MANY_REQUESTS or \
+                        (status or 0) >= 500
+                    if not retryable or attempt >= _LINK_ATTEMPTS:
+                        stats.add(error=True)
+                        return e
+                    time.sleep(_LINK_RETRY_BACKOFF * 2 ** (attempt - 1))
+                    attempt += 1
+
+        workers = max(1, max_workers or self._client.config.connection_pool_maxsize)
+        linked = 0
+        size_bytes = 0
+        errors = {}
+        for (path, staging_metadata), error in _bounded_map(link, items, workers, with_items=True):
+            if error is None:
+                linked += 1
+                size_bytes += staging_metadata.size_bytes or 0
+            else:
+                errors[path] = error
+        return LinkResult(linked=linked, size_bytes=size_bytes, errors=errors)
+
+    def sync_from(self,
+                  local_dir: str | os.PathLike,
+                  prefix: str = "",
+                  delete: bool = False,
+                  pre_sign: Optional[bool] = None,
+                  *,
+                  max_workers: Optional[int] = None,
+                  stats: Optional[TransferStats] = None) -> SyncResult:
+        """
+        Sync a local directory into a prefix on this branch.
+        The destination prefix is listed once and every local file is compared to the matching object - files of a
+        different size are uploaded, and files of the same size are uploaded only if their MD5 differs from the object
+        checksum. Objects whose checksum is not an MD5 (e.g. multipart uploads) are considered unchanged if the local
+        file was not modified after the object. Uploads run concurrently, see upload_many.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            branch = lakefs.repository("<repository_name>").branch("<branch_name>")
+            res = branch.sync_from("/data/daily", prefix="datasets/daily/", delete=True)
+            failed = [r for r in res.uploaded if r.error is not None]
+
+        :param local_dir: The local directory to sync
+        :param prefix: The destination directory, local file paths are appended to it. A trailing '/' is added if
+            missing, so that objects of sibling prefixes (e.g. 'daily_backup/' for 'daily') are not synced or deleted
+        :param delete: Also delete objects under the prefix that do not exist in the local directory
+        :param pre_sign: (Optional) Explicitly state whether to use pre_sign mode when uploading the objects.
+            If None, will be taken from the server storage configuration.
+        :param max_workers: (Optional) Maximal number of concurrent uploads, defaults to the client connection pool size
+        :param stats: (Optional) Throughput counters to update as uploads complete
+        :return: The uploaded objects, the deleted paths and the number of unchanged files
+        :raise NotADirectoryError: if local_dir is not a directory
+        :raise NotFoundException: if branch or repository do not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        if not os.path.isdir(local_dir):
+            raise NotADirectoryError(f"not a directory: '{local_dir}'")
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+
+        local = {}
+        for root, _, files in os.walk(local_dir):
+            for name in files:
+                local_path = os.path.join(root, name)
+                rel = os.path.relpath(local_path, local_dir).replace(os.sep, "/")
+                local[prefix + rel] = local_path
+
+        remote = {}
+        for obj in self.objects(prefix=prefix):
+            if isinstance(obj, ObjectInfo):
+                remote[obj.path] = obj
+
+        def changed(path: str) -> bool:
+            obj = remote.get(path)
+            st = os.stat(local[path])
+            if obj is None or obj.size_bytes != st.st_size:
+                return True
+            checksum = obj.checksum.strip('"').lower()
+            if not _MD5_CHECKSUM.fullmatch(checksum):
+                return st.st_mtime > obj.mtime
+            md5 = hashlib.md5(usedforsecurity=False)
+            with open(local[path], "rb") as f:
+                while chunk := f.read(_HASH_CHUNK_SIZE):
+                    md5.update(chunk)
+            return md5.hexdigest() != checksum
+
+        workers = max(1, max_workers or self._client.config.connection_pool_maxsize)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            to_upload = [path for path, is_changed in zip(local, executor.map(changed, local)) if is_changed]
+
+        uploaded = self.upload_many(((path, Path(local[path])) for path in to_upload), pre_sign=pre_sign,
+                                    max_workers=workers, stats=stats)
+
+        deleted = sorted(path for path in remote if path not in local) if delete else []
+        for i in range(0, len(deleted), _DELETE_BATCH_SIZE):
+            self.delete_objects(deleted[i:i + _DELETE_BATCH_SIZE])
+
+        return SyncResult(uploaded=uploaded, deleted=deleted, skipped=len(local) - len(to_upload))
+
     def reset_changes(self, path_type: Literal["common_prefix", "object", "reset"] = "reset",
                       path: Optional[str] = None) -> None:
         """
@@ -0,0 +1,518 @@
+"""
+Module containing the lakeFS local object cache implementation
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Union
+
+_DEFAULT_CACHE_DIR = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.join(Path.home(), ".cache")), "lakefs")
+_DEFAULT_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+# _EVICT_TARGET - Eviction frees space down to this fraction of max_size, so that a full cache is not scanned on every
+#                 new entry.
+_EVICT_TARGET = 0.9
+_COMMIT_ID_REGEX = re.compile(r"^[0-9a-f]{64}$")
+_PARTIAL_SUFFIX = ".partial"
+_BITMAP_SUFFIX = ".bitmap"
+# _BITMAP_HEADER - Identifies the sparse file (device, inode) a block bitmap describes
+_BITMAP_HEADER = struct.Struct("<QQ")
+
+
+class _DiscardEntry(Exception):
+    """
+    Raised while populating a cache entry whose content should not be cached
+    """
+
+
+def _is_commit_id(reference_id: str) -> bool:
+    """
+    Returns True if reference_id is a full commit ID, which is immutable
+    """
+    return _COMMIT_ID_REGEX.match(reference_id) is not None
+
+
+def _hash_key(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, write: Callable[[BinaryIO], None]) -> None:
+    """
+    Write a file by writing a temporary file in the same directory and renaming it, so that concurrent readers
+    (including other processes) never observe a partially written file
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class CachedObject:
+    """
+    A read only handle on a cached object's content. Reads are thread safe.
+    """
+
+    _open_mode = "rb"
+    _discarded = False
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._fd = open(path, self._open_mode)  # pylint: disable=consider-using-with
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the path of the cached content on the local file system
+        """
+        return self._path
+
+    @property
+    def discarded(self) -> bool:
+        """
+        Returns True if the cached content was found to no longer match the object, and should not be used
+        """
+        return self._discarded
+
+    def fileno(self) -> int:
+        """
+        Returns the file descriptor of the cached content
+        """
+        return self._fd.fileno()
+
+    def read_at(self, start: int, n: Optional[int] = None) -> bytes:
+        """
+        Read up to n bytes starting at the given offset, or until the end of the object if n is None
+        """
+        with self._lock:
+            self._fd.seek(start)
+            return self._fd.read(n if n is not None else -1)
+
+    def readinto_at(self, start: int, buffer: memoryview) -> int:
+        """
+        Read bytes starting at the given offset into buffer, returns the number of bytes read
+        """
+        with self._lock:
+            self._fd.seek(start)
+            return self._fd.readinto(buffer)
+
+    def __enter__(self) -> CachedObject:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the underlying file
+        """
+        self._fd.close()
+
+
+class SparseCachedObject(CachedObject):
+    """
+    A handle on a partially cached object, backed by a sparse file and a bitmap of the blocks it holds.
+    Missing blocks are fetched on first access and are shared with all other readers of the same cache directory, once
+    all blocks are present the entry becomes a regular cache entry. Reads are thread safe.
+    """
+
+    _open_mode = "r+b"
+
+    def __init__(self, path: Path, size: int, block_size: int, fetch: Callable[[int, int], bytes],
+                 promote: Callable[[Path], Path]):
+        """
+        :param path: The sparse file path
+        :param size: The object's size in bytes
+        :param block_size: The size in bytes of the blocks fetched on demand
+        :param fetch: Returns the object's content given an offset and a length, raises _DiscardEntry if the object no
+            longer matches the cache entry
+        :param promote: Turns the sparse file into a complete cache entry once all blocks are present, returns its path
+        :raise _DiscardEntry: if the sparse file was concurrently replaced
+        """
+        try:
+            os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o644))
+            super().__init__(path)
+        except FileNotFoundError as e:  # Promoted or evicted concurrently
+            raise _DiscardEntry from e
+        self._size = size
+        self._block_size = block_size
+        self._fetch = fetch
+        self._promote = promote
+        self._num_blocks = (size + block_size - 1) // block_size
+        self._complete = False
+
+        st = os.fstat(self._fd.fileno())
+        if st.st_size < size:
+            os.ftruncate(self._fd.fileno(), size)
+        header = _BITMAP_HEADER.pack(st.st_dev, st.st_ino)
+        bitmap_path = path.with_name(path.name + _BITMAP_SUFFIX)
+        if not self._bitmap_matches(bitmap_path, header):
+            # Missing bitmap, or a stale bitmap describing an evicted sparse file
+            _atomic_write(bitmap_path, lambda f: f.write(header + bytes(self._num_blocks)))
+        self._bitmap = open(bitmap_path, "r+b")  # pylint: disable=consider-using-with
+        if self._bitmap.read(len(header)) != header:
+            self.close()
+            raise _DiscardEntry
+
+    @staticmethod
+    def _bitmap_matches(bitmap_path: Path, header: bytes) -> bool:
+        try:
+            with open(bitmap_path, "rb") as f:
+                return f.read(len(header)) == header
+        except FileNotFoundError:
+            return False
+
+    def _read_bitmap(self, first: int, last: int) -> bytes:
+        self._bitmap.seek(_BITMAP_HEADER.size + first)
+        return self._bitmap.read(last - first)
+
+    def _missing_runs(self, first: int, last: int) -> list[tuple[int, int]]:
+        """
+        Returns the runs of consecutive missing blocks in the range [first, last), as (first, last) tuples
+        """
+        with self._lock:
+            bitmap = self._read_bitmap(first, last)
+        runs = []
+        for i, present in enumerate(bitmap, start=first):
+            if present:
+                continue
+            if runs and runs[-1][1] == i:
+                runs[-1] = (runs[-1][0], i + 1)
+            else:
+                runs.append((i, i + 1))
+        return runs
+
+    def _ensure(self, start: int, end: int) -> None:
+        """
+        Fetch all missing blocks in the byte range [start, end)
+        """
+        if self._complete or end <= start:
+            return
+
+        if self._discarded:
+            raise _DiscardEntry
+
+        first, last = start // self._block_size, (end - 1) // self._block_size + 1
+        for run_first, run_last in self._missing_runs(first, last):
+            offset = run_first * self._block_size
+            length = min(run_last * self._block_size, self._size) - offset
+            try:
+                data = self._fetch(offset, length)
+                if len(data) != length:
+                    raise _DiscardEntry
+            except _DiscardEntry:
+                self._discarded = True
+                raise
+            with self._lock:
+                # Write the content before marking its blocks, so that readers never observe unwritten blocks
+                self._fd.seek(offset)
+                self._fd.write(data)
+                self._fd.flush()
+                self._bitmap.seek(_BITMAP_HEADER.size + run_first)
+                self._bitmap.write(b"\x01" * (run_last - run_first))
+                self._bitmap.flush()
+
+        with self._lock:
+            if self._complete or 0 in self._read_bitmap(0, self._num_blocks):
+                return
+            self._complete = True
+        self._path = self._promote(self._path)
+
+    @property
+    def complete(self) -> bool:
+        """
+        Returns True if all blocks of the object were fetched
+        """
+        return self._complete
+
+    def fill(self) -> Path:
+        """
+        Fetch all missing blocks, returns the path of the complete cache entry
+        """
+        self._ensure(0, self._size)
+        return self._path
+
+    def read_at(self, start: int, n: Optional[int] = None) -> bytes:
+        end = self._size if n is None else min(start + n, self._size)
+        self._ensure(start, end)
+        return super().read_at(start, max(end - start, 0))
+
+    def readinto_at(self, start: int, buffer: memoryview) -> int:
+        end = min(start + len(buffer), self._size)
+        self._ensure(start, end)
+        return super().readinto_at(start, buffer[:max(end - start, 0)])
+
+    def close(self) -> None:
+        super().close()
+        if hasattr(self, "_bitmap"):
+            self._bitmap.close()
+
+
+class ObjectCache:
+    """
+    Persistent, content addressed cache of lakeFS objects on the local disk.
+
+    Objects are keyed by their checksum, so the same content is downloaded once and shared by all readers, including
+    readers in other processes using the same cache directory. Entries are populated atomically, and the least
+    recently used entries are evicted once the cache exceeds max_size bytes.
+
+    Reads from a full commit ID are served without contacting lakeFS after the first read. Reads from any other
+    reference (branches, tags) are revalidated with a single conditional GET (If-None-Match), which returns no content
+    if the cached object is current, or with a stat call when reading pre-signed or sparse entries.
+
+    By default an object is downloaded in full on first read. When block_size is set, objects are cached sparsely:
+    readers fetch only the blocks they access, and later reads of the same blocks (by any reader) are served locally.
+    This suits random access formats such as HDF5 or video, where a reader touches a small part of a large object.
+
+    Usage example:
+
+    .. code-block:: python
+
+        import lakefs
+        from lakefs.cache import ObjectCache
+
+        cache = ObjectCache("/tmp/lakefs-cache", max_size=50 * 1024 ** 3)
+        obj = lakefs.repository("<repository_name>").ref("<commit_id>").object("train/data.parquet")
+        with obj.reader(cache=cache) as fd:
+            data = fd.read()
+    """
+
+    def __init__(self, directory: Optional[Union[str, os.PathLike]] = None,
+                 max_size: int = _DEFAULT_CACHE_MAX_SIZE, block_size: Optional[int] = None) -> None:
+        """
+        :param directory: (Optional) The cache directory, defaults to $XDG_CACHE_HOME/lakefs (or ~/.cache/lakefs)
+        :param max_size: Maximal total size in bytes of cached objects
+        :param block_size: (Optional) If set, objects are cached sparsely, in blocks of this size fetched on demand
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        if block_size is not None and block_size <= 0:
+            raise ValueError("block_size must be a positive integer")
+
+        self._dir = Path(directory if directory is not None else _DEFAULT_CACHE_DIR)
+        self._max_size = max_size
+        self._block_size = block_size
+        self._objects_dir.mkdir(parents=True, exist_ok=True)
+        self._refs_dir.mkdir(parents=True, exist_ok=True)
+        # Estimated total size of the cached objects, None until the cache directory is first scanned
+        self._size: Optional[int] = None
+        self._size_lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        """
+        Returns the cache root directory
+        """
+        return self._dir
+
+    @property
+    def max_size(self) -> int:
+        """
+        Returns the maximal total size in bytes of cached objects
+        """
+        return self._max_size
+
+    @property
+    def block_size(self) -> Optional[int]:
+        """
+        Returns the block size of sparse cache entries, None if objects are cached in full
+        """
+        return self._block_size
+
+    @property
+    def _objects_dir(self) -> Path:
+        return self._dir / "objects"
+
+    @property
+    def _refs_dir(self) -> Path:
+        return self._dir / "refs"
+
+    def _entry_path(self, checksum: str, size: int) -> Path:
+        key = _hash_key(checksum, str(size))
+        return self._objects_dir / key[:2] / key
+
+    def lookup(self, repository_id: str, reference_id: str, path: str) -> Optional[tuple[str, int]]:
+        """
+        Returns the (checksum, size) previously recorded for an object on a reference, if any.
+        For mutable references (branches) the result is only a hint, which must be revalidated against lakeFS.
+        """
+        try:
+            with open(self._refs_dir / _hash_key(repository_id, reference_id, path), encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry["checksum"], entry["size"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def remember(self, repository_id: str, reference_id: str, path: str, checksum: str, size: int) -> None:
+        """
+        Record the (checksum, size) of an object on a reference, so that reads from an immutable reference are served
+        without stat, and reads from a mutable reference are revalidated using a conditional request
+        """
+        data = json.dumps({"checksum": checksum, "size": size}).encode("utf-8")
+        _atomic_write(self._refs_dir / _hash_key(repository_id, reference_id, path), lambda f: f.write(data))
+
+    def get(self, checksum: str, size: int) -> Optional[CachedObject]:
+        """
+        Returns a handle on the cached content of the object with the given checksum and size, None if not cached
+        """
+        path = self._entry_path(checksum, size)
+        try:
+            os.utime(path)  # Track access time for LRU eviction
+            return CachedObject(path)
+        except FileNotFoundError:
+            return None
+
+    def open(self, checksum: str, size: int, fetch: Callable[[int, int], bytes]) -> Optional[CachedObject]:
+        """
+        Returns a handle on the object with the given checksum and size, which fetches the blocks missing from the cache
+        on first access. Requires a cache with a block_size.
+
+        :param checksum: The object's checksum
+        :param size: The object's size in bytes
+        :param fetch: Returns the object's content given an offset and a length
+        :return: A handle on the cached content, or None if the object cannot be cached
+        :raise ValueError: if the cache has no block_size
+        """
+        if self._block_size is None:
+            raise ValueError("sparse cache entries require a block_size")
+
+        cached = self.get(checksum, size)
+        if cached is not None:
+            return cached
+
+        path = self._entry_path(checksum, size)
+        path.parent.mkdir(exist_ok=True)
+        partial = path.with_name(path.name + _PARTIAL_SUFFIX)
+        self._evict(size)  # Accounted by its full size, which its blocks occupy once fetched
+        try:
+            return SparseCachedObject(partial, size, self._block_size, fetch, self._promote)
+        except _DiscardEntry:
+            return None
+
+    def _promote(self, partial: Path) -> Path:
+        """
+        Turn a complete sparse file into a regular cache entry, returns the path of the entry
+        """
+        path = partial.with_name(partial.name[:-len(_PARTIAL_SUFFIX)])
+        try:
+            os.replace(partial, path)
+        except FileNotFoundError:  # Evicted or promoted concurrently
+            return partial
+        self._remove(partial)
+        self._evict()
+        return path
+
+    @staticmethod
+    def _remove(path: Union[str, os.PathLike]) -> bool:
+        """
+        Remove a cache entry, the bitmap of a sparse entry is removed first so that it never describes a new file
+        """
+        for p in (f"{os.fspath(path)}{_BITMAP_SUFFIX}", path):
+            try:
+                os.unlink(p)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                return False
+        return True
+
+    def put(self, checksum: str, size: int, download: Callable[[BinaryIO], bool]) -> Optional[CachedObject]:
+        """
+        Populate the cache entry for the object with the given checksum and size.
+
+        :param checksum: The object's checksum
+        :param size: The object's size in bytes
+        :param download: Writes the object's content to the given file, returns False if the content does not match
+            the checksum and should not be cached
+        :return: A handle on the cached content, or None if the content was discarded
+        """
+        path = self._entry_path(checksum, size)
+        path.parent.mkdir(exist_ok=True)
+
+        def write(f: BinaryIO) -> None:
+            if not download(f) or f.tell() != size:
+                raise _DiscardEntry
+
+        try:
+            _atomic_write(path, write)
+        except _DiscardEntry:
+            return None
+
+        self._evict(size)
+        return self.get(checksum, size)
+
+    def clear(self) -> None:
+        """
+        Remove all cached objects
+        """
+        with self._size_lock:
+            for entry in self._entries():
+                self._remove(entry.path)
+            self._size = 0
+
+    def _entries(self) -> list[os.DirEntry]:
+        entries = []
+        for bucket in os.scandir(self._objects_dir):
+            if bucket.is_dir():
+                entries.extend(e for e in os.scandir(bucket.path) if e.is_file() and not e.name.startswith(".tmp-")
+                               and not e.name.endswith(_BITMAP_SUFFIX))
+        return entries
+
+    def _evict(self, added: int = 0) -> None:
+        """
+        Account for added bytes, and remove least recently used entries once the total cache size exceeds max_size.
+        The total size is tracked incrementally, and the cache directory is only scanned when the estimate crosses
+        max_size. The scan also corrects the estimate for entries added or removed by other processes.
+
+        :param added: Size in bytes of a new entry
+        """
+        with self._size_lock:
+            if self._size is not None:
+                self._size += added
+                if self._size <= self._max_size:
+                    return
+            self._size = self._scan_and_evict()
+
+    def _scan_and_evict(self) -> int:
+        """
+        Remove least recently used entries until the total cache size is below the eviction target, returns the
+        remaining size
+        """
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                st = entry.stat()
+            except FileNotFoundError:  # Evicted concurrently
+                continue
+            # Sparse files only occupy the blocks written to them
+            size = st.st_size
+            if entry.name.endswith(_PARTIAL_SUFFIX) and hasattr(st, "st_blocks"):
+                size = min(size, st.st_blocks * 512)
+            entries.append((st.st_mtime, size, entry.path))
+            total += size
+
+        if total <= self._max_size:
+            return total
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_size * _EVICT_TARGET:
+                break
+            if self._remove(path):
+                total -= size
+        return total
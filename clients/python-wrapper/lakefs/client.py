@@ -116,6 +116,20 @@ class Client:
         return self._server_conf.version
 
 
+def _call_raw(func, *args, **kwargs) -> dict:
+    """
+    Call a lakefs-sdk API function and decode the response JSON as is, without constructing and validating models.
+    API errors are raised as by the function itself.
+
+    :param func: The API function, bound to its API object
+    :param args: The function args
+    :param kwargs: The function kwargs
+    :return: The decoded response
+    """
+    with_http_info = getattr(func.__self__, f"{func.__name__}_with_http_info")
+    return json.loads(with_http_info(*args, _preload_content=False, **kwargs).raw_data)
+
+
 def _extract_region_from_endpoint(endpoint):
     """
     Extract the region name from an STS endpoint URL.
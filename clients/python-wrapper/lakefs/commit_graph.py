@@ -0,0 +1,261 @@
+"""
+Module containing the lakeFS local commit graph cache implementation
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Optional, Set, Union
+
+from lakefs.cache import _DEFAULT_CACHE_DIR, _is_commit_id
+from lakefs.client import Client, _BaseLakeFSObject
+from lakefs.exceptions import api_exception_handler
+from lakefs.models import Commit
+
+_GRAPH_VERSION = 1
+# _LOG_PAGE_SIZE - Number of ancestors fetched with a single log request when a commit is missing from the graph.
+_LOG_PAGE_SIZE = 1000
+_COLUMNS = ("id", "parents", "committer", "message", "creation_date", "meta_range_id", "metadata")
+
+
+def _graph_path(directory: Optional[Union[str, os.PathLike]], repository_id: str) -> Path:
+    """
+    Returns the path of the commit graph database of a repository
+    """
+    return Path(directory if directory is not None else _DEFAULT_CACHE_DIR) / "commits" / f"{repository_id}.sqlite"
+
+
+class CommitGraph(_BaseLakeFSObject):
+    """
+    A local cache of the commit graph of a repository, stored in a sqlite database.
+    Commits are immutable, so commits are cached by ID forever. The graph is filled incrementally: whenever a
+    traversal reaches a commit which is not cached, a page of its log is fetched from the lakeFS server and all the
+    returned ancestors are cached. Once the commits are cached, ancestry queries and logs are answered locally.
+
+    References which are not commit IDs (branches, tags) are resolved with the lakeFS server on every call, as they
+    may move.
+
+    .. code-block:: python
+
+        import lakefs
+
+        with lakefs.repository("<repository_name>").commit_graph() as graph:
+            if graph.is_ancestor("v1.0", "main"):
+                print("v1.0 was merged into main")
+            base = graph.merge_base("main", "feature")
+            for commit in graph.between(base.id, "feature"):
+                print(commit.message)
+    """
+
+    def __init__(self,
+                 repository_id: str,
+                 client: Optional[Client] = None,
+                 directory: Optional[Union[str, os.PathLike]] = None) -> None:
+        """
+        :param repository_id: The repository ID
+        :param client: Optional lakeFS client to use. If not provided, uses the default client
+        :param directory: (Optional) The cache directory, defaults to ~/.cache/lakefs
+        """
+        self._repo_id = repository_id
+        self._path = _graph_path(directory, repository_id)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._commits: Dict[str, Commit] = {}
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('version', ?)", (str(_GRAPH_VERSION),))
+            self._conn.execute("CREATE TABLE IF NOT EXISTS commits (id TEXT PRIMARY KEY, parents TEXT, "
+                               "committer TEXT, message TEXT, creation_date INTEGER, meta_range_id TEXT, "
+                               "metadata TEXT) WITHOUT ROWID")
+        version = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        if int(version) != _GRAPH_VERSION:
+            self._conn.close()
+            raise ValueError(f"unsupported commit graph version: {version}")
+        super().__init__(client)
+
+    def __enter__(self) -> CommitGraph:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM commits").fetchone()[0]
+
+    def __repr__(self):
+        return f'CommitGraph(repository="{self._repo_id}", path="{self._path}")'
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the commit graph database file
+        """
+        return self._path
+
+    def close(self) -> None:
+        """
+        Close the commit graph database
+        """
+        self._conn.close()
+
+    def get(self, ref: str) -> Commit:
+        """
+        Returns the commit of a reference, fetching it from the lakeFS server if it is not cached
+
+        :param ref: A commit ID, branch or tag
+        :raise NotFoundException: if the reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        if not _is_commit_id(ref):
+            with api_exception_handler():
+                commit = Commit(**self._client.sdk_client.commits_api.get_commit(self._repo_id, ref).dict())
+            self._store([commit])
+            return commit
+        commit = self._lookup(ref)
+        if commit is None:
+            with api_exception_handler():
+                res = self._client.sdk_client.refs_api.log_commits(self._repo_id, ref, amount=_LOG_PAGE_SIZE,
+                                                                   limit=True)
+            self._store(Commit(**c.dict()) for c in res.results)
+            commit = self._lookup(ref)
+        if commit is None:
+            with api_exception_handler():
+                commit = Commit(**self._client.sdk_client.commits_api.get_commit(self._repo_id, ref).dict())
+            self._store([commit])
+        return commit
+
+    def log(self, ref: str, max_amount: Optional[int] = None) -> Generator[Commit]:
+        """
+        Returns a generator of the commits reachable from a reference, newest first, the same as Reference.log()
+
+        :param ref: A commit ID, branch or tag
+        :param max_amount: (Optional) Stop after this amount of commits
+        :raise NotFoundException: if the reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        yield from self._walk([self.get(ref)], max_amount=max_amount)
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """
+        Returns True if ancestor is reachable from descendant. A commit is an ancestor of itself.
+        Commits are walked from descendant by descending creation date, and the walk stops once it reaches commits
+        older than ancestor.
+
+        :param ancestor: A commit ID, branch or tag
+        :param descendant: A commit ID, branch or tag
+        :raise NotFoundException: if either reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        target = self.get(ancestor)
+        for commit in self._walk([self.get(descendant)]):
+            if commit.id == target.id:
+                return True
+            if commit.creation_date < target.creation_date:
+                return False  # The remaining commits are older than ancestor, and so are their parents
+        return False
+
+    def merge_base(self, ref: str, other_ref: str) -> Optional[Commit]:
+        """
+        Returns the newest common ancestor of two references, or None if they have no common history.
+        The ancestors of both references are walked together by descending creation date, and the walk stops at the
+        first commit reached from both.
+
+        :param ref: A commit ID, branch or tag
+        :param other_ref: A commit ID, branch or tag
+        :raise NotFoundException: if either reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        # The sides each commit was reached from: 1 for ref, 2 for other_ref
+        sides: Dict[str, int] = {}
+        heap = []
+
+        def reach(commit: Commit, side: int) -> None:
+            reached = sides.get(commit.id, 0)
+            if reached | side != reached:  # Pushed again when reached from a new side, to pass it to its parents
+                sides[commit.id] = reached | side
+                heapq.heappush(heap, (-commit.creation_date, commit.id, commit))
+
+        reach(self.get(ref), 1)
+        reach(self.get(other_ref), 2)
+        while heap:
+            _, commit_id, commit = heapq.heappop(heap)
+            side = sides[commit_id]
+            if side == 3:
+                return commit
+            for parent_id in commit.parents:
+                reach(self.get(parent_id), side)
+        return None
+
+    def between(self, base: str, head: str) -> Generator[Commit]:
+        """
+        Returns a generator of the commits reachable from head but not from base, newest first (git's base..head)
+
+        :param base: A commit ID, branch or tag
+        :param head: A commit ID, branch or tag
+        :raise NotFoundException: if either reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        excluded = {commit.id for commit in self._walk([self.get(base)])}
+        yield from self._walk([self.get(head)], excluded=excluded)
+
+    def _walk(self,
+              heads: List[Commit],
+              excluded: Optional[Set[str]] = None,
+              max_amount: Optional[int] = None) -> Generator[Commit]:
+        """
+        Traverse the ancestors of heads by descending creation date, fetching missing commits as they are reached
+        """
+        seen = set(excluded or ())
+        heap = []
+        for commit in heads:
+            if commit.id not in seen:
+                seen.add(commit.id)
+                heapq.heappush(heap, (-commit.creation_date, commit.id, commit))
+        while heap and (max_amount is None or max_amount > 0):
+            _, _, commit = heapq.heappop(heap)
+            yield commit
+            if max_amount is not None:
+                max_amount -= 1
+            for parent_id in commit.parents:
+                if parent_id not in seen:
+                    seen.add(parent_id)
+                    parent = self.get(parent_id)
+                    heapq.heappush(heap, (-parent.creation_date, parent.id, parent))
+
+    def _lookup(self, commit_id: str) -> Optional[Commit]:
+        commit = self._commits.get(commit_id)
+        if commit is not None:
+            return commit
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM commits WHERE id = ?",
+                                     (commit_id,)).fetchone()
+        if row is None:
+            return None
+        commit_id, parents, committer, message, creation_date, meta_range_id, metadata = row
+        commit = Commit(id=commit_id, parents=json.loads(parents), committer=committer, message=message,
+                        creation_date=creation_date, meta_range_id=meta_range_id,
+                        metadata=json.loads(metadata) if metadata is not None else None)
+        self._commits[commit_id] = commit
+        return commit
+
+    def _store(self, commits: Iterable[Commit]) -> None:
+        rows = []
+        for commit in commits:
+            self._commits[commit.id] = commit
+            rows.append((commit.id, json.dumps(commit.parents), commit.committer, commit.message,
+                         commit.creation_date, commit.meta_range_id,
+                         json.dumps(commit.metadata) if commit.metadata is not None else None))
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
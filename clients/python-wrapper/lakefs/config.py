@@ -31,6 +31,10 @@ class ClientConfig(Configuration):
 
     This class also encapsulates the required lakectl configuration for authentication and used to unmarshall the
     lakectl yaml file.
+
+    Pass trusted_decoding=True to decode object listing, diff, log and stat responses directly from JSON, skipping
+    the SDK model validation. This saves most of the CPU time of large listings, but should only be used with a
+    trusted lakeFS server.
     """
 
     class Server(LenientNamedTuple):
@@ -49,8 +53,10 @@ class ClientConfig(Configuration):
     server: Server
     credentials: Credentials
 
-    def __init__(self, verify_ssl: Optional[bool] = None, proxy: Optional[str] = None, **kwargs):
+    def __init__(self, verify_ssl: Optional[bool] = None, proxy: Optional[str] = None, trusted_decoding: bool = False,
+                 **kwargs):
         super().__init__(**kwargs)
+        self.trusted_decoding = trusted_decoding
         if verify_ssl is not None:
             self.verify_ssl = verify_ssl
         if proxy is not None:
@@ -0,0 +1,252 @@
+"""
+Module containing the lakeFS local listing index implementation
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Generator, Iterable, List, Optional, Union
+
+from lakefs.cache import _DEFAULT_CACHE_DIR
+from lakefs.models import CommonPrefix, ObjectInfo
+
+_INDEX_VERSION = 1
+# _INDEX_BATCH_ROWS - Number of listed objects inserted into the index at a time while it is built.
+_INDEX_BATCH_ROWS = 10000
+# _MAX_CHAR - Sorts after any character, used as the exclusive upper bound of a prefix range.
+_MAX_CHAR = chr(0x10FFFF)
+_GLOB_WILDCARD = re.compile(r"[*?\[]")
+_COLUMNS = ("path", "physical_address", "checksum", "mtime", "size_bytes", "content_type", "metadata")
+
+
+def _index_path(directory: Optional[Union[str, os.PathLike]], repository_id: str, commit_id: str) -> Path:
+    """
+    Returns the path of the index of a commit
+    """
+    return Path(directory if directory is not None else _DEFAULT_CACHE_DIR) / "indexes" / repository_id / \
+        f"{commit_id}.sqlite"
+
+
+class ObjectIndex:
+    """
+    A local, read-only index of all the objects of a commit, stored in a sqlite database.
+    Commits are immutable, so once built the index is valid forever, and prefix, delimiter and glob queries are
+    answered at local disk speed without calling the lakeFS server.
+
+    Indexes are built and cached by commit ID using Reference.index():
+
+    .. code-block:: python
+
+        import lakefs
+
+        ref = lakefs.repository("<repository_name>").ref("<commit_id>")
+        with ref.index() as index:
+            for obj in index.objects(prefix="datasets/", delimiter="/"):
+                print(obj.path)
+            parquet_files = list(index.glob("datasets/*.parquet"))
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        """
+        :param path: The index database file
+        """
+        self._path = Path(path)
+        self._conn = sqlite3.connect(f"{self._path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+            if int(meta.get("version", 0)) != _INDEX_VERSION:
+                raise ValueError(f"unsupported index version: {meta.get('version')}")
+        except BaseException:
+            self._conn.close()
+            raise
+        self._user_metadata = meta.get("user_metadata") == "1"
+
+    @classmethod
+    def build(cls, path: Union[str, os.PathLike], records: Iterable[dict], user_metadata: bool) -> ObjectIndex:
+        """
+        Build an index from object listing records, and open it.
+        The index is written to a temporary file and moved into place once complete, so a partially built index is
+        never visible.
+
+        :param path: The index database file
+        :param records: The listed objects, as dicts of the ObjectStats fields
+        :param user_metadata: Whether the records include the objects user metadata
+        :return: The new index
+        """
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            conn = sqlite3.connect(tmp)
+            try:
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.execute("CREATE TABLE objects (path TEXT PRIMARY KEY, physical_address TEXT, checksum TEXT, "
+                             "mtime INTEGER, size_bytes INTEGER, content_type TEXT, metadata TEXT) WITHOUT ROWID")
+                conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                                 [("version", str(_INDEX_VERSION)), ("user_metadata", "1" if user_metadata else "0")])
+                rows = []
+                for res in records:
+                    if res.get("path_type", "object") != "object":
+                        continue
+                    metadata = res.get("metadata") if user_metadata else None
+                    rows.append((res["path"], res["physical_address"], res["checksum"], res["mtime"],
+                                 res.get("size_bytes"), res.get("content_type"),
+                                 json.dumps(metadata) if metadata is not None else None))
+                    if len(rows) >= _INDEX_BATCH_ROWS:
+                        conn.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                        rows = []
+                conn.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.commit()
+            finally:
+                conn.close()
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return cls(path)
+
+    def __enter__(self) -> ObjectIndex:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def __repr__(self):
+        return f'ObjectIndex(path="{self._path}")'
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the index database file
+        """
+        return self._path
+
+    @property
+    def user_metadata(self) -> bool:
+        """
+        Returns whether the index includes the objects user metadata
+        """
+        return self._user_metadata
+
+    def close(self) -> None:
+        """
+        Close the index database
+        """
+        self._conn.close()
+
+    def objects(self,
+                prefix: str = "",
+                delimiter: Optional[str] = None,
+                after: Optional[str] = None,
+                max_amount: Optional[int] = None) -> Generator[ObjectInfo | CommonPrefix]:
+        """
+        Returns the indexed objects in lexicographic order, the same as Reference.objects() would for the commit.
+
+        :param prefix: Return items prefixed with this value
+        :param delimiter: Group common prefixes by this delimiter
+        :param after: Return items after this value
+        :param max_amount: Stop after this amount of items
+        """
+        prefix = prefix or ""
+        upper = prefix + _MAX_CHAR
+        lower, op = (after, ">") if after is not None and after >= prefix else (prefix, ">=")
+        while max_amount is None or max_amount > 0:
+            rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM objects "
+                                      f"WHERE path {op} ? AND path < ? ORDER BY path", (lower, upper))
+            common = None
+            for row in rows:
+                i = row[0].find(delimiter, len(prefix)) if delimiter else -1
+                if i >= 0:
+                    common = row[0][:i + len(delimiter)]
+                    break
+                yield self._object_info(row)
+                if max_amount is not None:
+                    max_amount -= 1
+                    if max_amount <= 0:
+                        return
+            rows.close()
+            if common is None:
+                return
+
+            if after is None or common > after:
+                yield CommonPrefix(path=common)
+                if max_amount is not None:
+                    max_amount -= 1
+            # Seek past all the objects under the common prefix
+            lower, op = common + _MAX_CHAR, ">="
+
+    def glob(self, pattern: str) -> Generator[ObjectInfo]:
+        """
+        Returns the indexed objects whose path matches a glob pattern, in lexicographic order.
+        The pattern is matched one '/' separated level at a time: '*' matches any characters except '/', '?' matches
+        a single character except '/', '[...]' matches a character class ('[!...]' negates it), and a '**' level
+        matches any number of levels. Only the objects under the literal prefix of the pattern are scanned.
+
+        :param pattern: The glob pattern
+        """
+        literal = _literal_head(pattern)
+        regex = _glob_regex(pattern.split("/"))
+        rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM objects "
+                                  "WHERE path >= ? AND path < ? ORDER BY path", (literal, literal + _MAX_CHAR))
+        for row in rows:
+            if regex.fullmatch(row[0]):
+                yield self._object_info(row)
+
+    @staticmethod
+    def _object_info(row: tuple) -> ObjectInfo:
+        path, physical_address, checksum, mtime, size_bytes, content_type, metadata = row
+        return ObjectInfo(path=path, physical_address=physical_address, checksum=checksum, mtime=mtime,
+                          size_bytes=size_bytes, content_type=content_type,
+                          metadata=json.loads(metadata) if metadata is not None else None)
+
+
+def _literal_head(level: str) -> str:
+    """
+    Returns the part of a glob pattern level before its first wildcard
+    """
+    match = _GLOB_WILDCARD.search(level)
+    return level[:match.start()] if match else level
+
+
+def _glob_regex(levels: List[str]) -> re.Pattern:
+    """
+    Translate the levels of a glob pattern to a regular expression matching full paths
+    """
+    res = ""
+    for i, level in enumerate(levels):
+        if level != "**":
+            res += _glob_level_regex(level) + ("/" if i < len(levels) - 1 else "")
+        else:
+            res += "(?:.*/)?" if i < len(levels) - 1 else ".*"
+    return re.compile(res)
+
+
+def _glob_level_regex(level: str) -> str:
+    """
+    Translate a single level of a glob pattern to a regular expression, wildcards do not match '/'
+    """
+    res = []
+    i = 0
+    while i < len(level):
+        c = level[i]
+        i += 1
+        end = level.find("]", i + 1) if c == "[" else -1
+        if c == "*":
+            res.append("[^/]*")
+        elif c == "?":
+            res.append("[^/]")
+        elif end > 0:
+            chars = level[i:end].replace("\\", "\\\\")
+            res.append("[^/" + chars[1:] + "]" if chars.startswith("!") else "[" + chars + "]")
+            i = end + 1
+        else:
+            res.append(re.escape(c))
+    return "".join(res)
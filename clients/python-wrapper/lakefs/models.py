@@ -4,8 +4,10 @@ Module containing all of lakeFS data models
 
 from __future__ import annotations
 
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
 from lakefs.namedtuple import LenientNamedTuple
 
@@ -33,12 +35,46 @@ class Change(LenientNamedTuple):
     type: Literal["added", "removed", "changed", "conflict", "prefix_changed"]
     path: str
     path_type: Literal["common_prefix", "object"]
-    size_bytes: Optional[int]
+    size_bytes: Optional[int] = None
 
     def __repr__(self):
         return f'Change(type="{self.type}", path="{self.path}", path_type="{self.path_type}")'
 
 
+class ChangeStats(LenientNamedTuple):
+    """
+    Represent the number and total size of a group of changes
+    """
+    count: int
+    size_bytes: int
+
+    def __repr__(self):
+        return f'ChangeStats(count={self.count}, size_bytes={self.size_bytes})'
+
+
+class DiffSummary(LenientNamedTuple):
+    """
+    Represent the aggregated changes of a diff, in total, by change type and by prefix
+    """
+    total: ChangeStats
+    types: Dict[str, ChangeStats]
+    prefixes: Dict[str, Dict[str, ChangeStats]]
+
+    def __repr__(self):
+        return f'DiffSummary(count={self.total.count}, size_bytes={self.total.size_bytes})'
+
+
+class PrefixUsage(LenientNamedTuple):
+    """
+    Represent the number and total size of the objects under a prefix
+    """
+    count: int
+    size_bytes: int
+
+    def __repr__(self):
+        return f'PrefixUsage(count={self.count}, size_bytes={self.size_bytes})'
+
+
 class ImportStatus(LenientNamedTuple):
     """
     NamedTuple representing an ongoing import's status in lakeFS
@@ -78,6 +114,7 @@ class ServerStorageConfiguration(LenientNamedTuple):
     pre_sign_support_ui: bool
     import_validity_regex: str
     default_namespace_prefix: Optional[str] = None
+    pre_sign_multipart_upload: Optional[bool] = None
 
 
 class ObjectInfo(LenientNamedTuple):
@@ -115,3 +152,93 @@ class RepositoryProperties(LenientNamedTuple):
     creation_date: int
     default_branch: str
     storage_namespace: str
+
+
+class UploadResult(LenientNamedTuple):
+    """
+    Represent the outcome of a single object upload in a bulk upload
+    """
+    path: str
+    stats: Optional[ObjectInfo] = None
+    error: Optional[Exception] = None
+
+    def __repr__(self):
+        return f'UploadResult(path="{self.path}")'
+
+
+class LinkResult(LenientNamedTuple):
+    """
+    Represent the aggregated outcome of linking many objects
+    """
+    linked: int
+    size_bytes: int
+    errors: Dict[str, Exception]
+
+    def __repr__(self):
+        return f'LinkResult(linked={self.linked}, errors={len(self.errors)})'
+
+
+class SyncResult(LenientNamedTuple):
+    """
+    Represent the outcome of syncing a local directory to a branch
+    """
+    uploaded: List[UploadResult]
+    deleted: List[str]
+    skipped: int
+
+    def __repr__(self):
+        return f'SyncResult(uploaded={len(self.uploaded)}, deleted={len(self.deleted)}, skipped={self.skipped})'
+
+
+class TransferStats:
+    """
+    Thread-safe throughput counters of a bulk operation.
+    Counters are updated as each object completes, so they may be read from another thread while the operation runs.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.objects = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return f'TransferStats(objects={self.objects}, bytes={self.bytes}, errors={self.errors})'
+
+    def add(self, size: int = 0, error: bool = False) -> None:
+        """
+        Record a completed object
+
+        :param size: The number of bytes transferred for the object
+        :param error: Whether the object failed
+        """
+        with self._lock:
+            if error:
+                self.errors += 1
+            else:
+                self.objects += 1
+                self.bytes += size
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Seconds since the counters were created
+        """
+        return time.monotonic() - self._start
+
+    @property
+    def objects_per_second(self) -> float:
+        """
+        Average rate of successfully transferred objects
+        """
+        elapsed = self.elapsed
+        return self.objects / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """
+        Average rate of successfully transferred bytes
+        """
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
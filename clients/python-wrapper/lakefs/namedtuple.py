@@ -2,30 +2,97 @@
 LenientNamedTuple Module
 """
 
+from __future__ import annotations
 
-class LenientNamedTuple:
+_setattr = object.__setattr__
+# _UNKNOWN_INTERN_MAX - Maximal number of distinct unknown field name tuples shared between the instances of a class.
+_UNKNOWN_INTERN_MAX = 1024
+
+
+def _restore(cls, values: tuple, unknown_names: tuple | None, unknown_values: tuple | None) -> LenientNamedTuple:
+    """
+    Recreates a LenientNamedTuple from its field values and unknown fields, used for pickling and copying
+    """
+    obj = object.__new__(cls)
+    for field, value in zip(cls._fields, values):
+        _setattr(obj, field, value)
+    _setattr(obj, "_unknown_names", unknown_names)
+    _setattr(obj, "_unknown_values", unknown_values)
+    return obj
+
+
+class _LenientNamedTupleMeta(type):
+    """
+    Precomputes the field tables of a LenientNamedTuple class, and stores its fields in slots instead of an instance
+    dict. Default values are moved from the class namespace to the field tables, as they would conflict with the slots.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        own_fields = tuple(namespace.get("__annotations__", {}))
+        defaults = {}
+        for field in own_fields:
+            if field in namespace:
+                defaults[field] = namespace.pop(field)
+        namespace["__slots__"] = tuple(namespace.get("__slots__", ())) + own_fields
+
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        fields = ()
+        all_defaults = {}
+        for base in reversed(cls.__mro__[1:]):
+            fields += tuple(f for f in base.__dict__.get("_fields", ()) if f not in fields)
+            all_defaults.update(base.__dict__.get("_defaults", {}))
+        cls._fields = fields + tuple(f for f in own_fields if f not in fields)
+        cls._field_set = frozenset(cls._fields)
+        cls._defaults = {**all_defaults, **defaults}
+        cls._unknown_cache = {}
+        return cls
+
+
+class LenientNamedTuple(metaclass=_LenientNamedTupleMeta):
     """
     Class which provides the NamedTuple functionality but allows initializing with unknown fields.
     The unknown fields will be ignored and mandatory fields are enforced
     """
 
-    __initialized: bool = False
-    unknown: dict = {}
+    __slots__ = ("_unknown_names", "_unknown_values")
+    _fields = ()
+    _field_set = frozenset()
+    _defaults = {}
+    _unknown_cache = {}
 
     def __init__(self, **kwargs):
-        fields = list(self.__class__.__dict__["__annotations__"].keys())
-        for k, v in kwargs.items():
-            if k in fields:
-                setattr(self, k, v)
-                fields.remove(k)
+        cls = self.__class__
+        missing = []
+        for field in cls._fields:
+            if field in kwargs:
+                _setattr(self, field, kwargs[field])
+            elif field in cls._defaults:
+                _setattr(self, field, cls._defaults[field])
             else:
-                self.unknown[k] = v
+                missing.append(field)
 
-        if len(fields) > 0:
-            raise TypeError(f"missing {len(fields)} required arguments: {fields}")
+        if len(missing) > 0:
+            raise TypeError(f"missing {len(missing)} required arguments: {missing}")
 
-        self.__initialized = True
-        super().__init__()
+        # Unknown fields are kept as tuples of names and values, which are much smaller than a dict. Responses usually
+        # repeat the same unknown fields (e.g. path_type), so equal name tuples are shared between instances.
+        names = tuple(k for k in kwargs if k not in cls._field_set) or None
+        if names is not None:
+            if len(cls._unknown_cache) < _UNKNOWN_INTERN_MAX:
+                names = cls._unknown_cache.setdefault(names, names)
+            else:
+                names = cls._unknown_cache.get(names, names)
+        _setattr(self, "_unknown_names", names)
+        _setattr(self, "_unknown_values", tuple(kwargs[k] for k in names) if names is not None else None)
+
+    @property
+    def unknown(self) -> dict:
+        """
+        Returns the fields given on initialization which are not fields of this class
+        """
+        if self._unknown_names is None:  # pylint: disable=no-member
+            return {}
+        return dict(zip(self._unknown_names, self._unknown_values))  # pylint: disable=no-member
 
     def __repr__(self):
         class_name = self.__class__.__name__
@@ -33,25 +100,19 @@ class LenientNamedTuple:
             return f'{class_name}(id="{self.id}")'
         return f'{class_name}()'
 
+    def __reduce__(self):
+        # Fields are read-only slots, so the default pickle and copy protocols, which set attributes, cannot be used
+        values = tuple(getattr(self, f) for f in self._fields)
+        return _restore, (self.__class__, values, self._unknown_names, self._unknown_values)  # pylint: disable=no-member
+
     def __setattr__(self, name, value):
-        if self.__initialized:
-            raise AttributeError("can't set attribute")
-        super().__setattr__(name, value)
+        raise AttributeError("can't set attribute")
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        for k, v in self.__dict__.items():
-            if k == "unknown":
-                continue
-            if other.__dict__[k] != v:
-                return False
-
-        return True
+        return all(getattr(self, f) == getattr(other, f) for f in self._fields)
 
     def __str__(self):
-        fields = {}
-        for k, v in self.__dict__.items():
-            if k != "unknown" and k[0] != "_":  # Filter internal and unknown fields
-                fields[k] = v
-        return str(fields)
+        # Filter internal and unknown fields
+        return str({f: getattr(self, f) for f in self._fields if f[0] != "_"})
@@ -1,23 +1,36 @@
 """
 Module containing lakeFS reference implementation
 """
+# pylint: disable=too-many-lines
 
 from __future__ import annotations
 
 import base64
 import binascii
+import codecs
+import http
 import io
 import json
+import mmap
 import os
+import queue
+import re
 import tempfile
+import threading
+import time
 import urllib.parse
 from abc import abstractmethod
-from typing import AnyStr, IO, Iterator, List, Literal, Optional, Union, get_args
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AnyStr, BinaryIO, Callable, IO, Iterable, Iterator, List, Literal, Optional, Union, get_args
 
 import lakefs_sdk
-from lakefs_sdk import StagingMetadata
+from lakefs_sdk import AbortPresignMultipartUpload, CompletePresignMultipartUpload, StagingMetadata, UploadPart
+import urllib3
+from urllib3 import HTTPResponse
 
-from lakefs.client import Client, _BaseLakeFSObject
+from lakefs.cache import CachedObject, ObjectCache, SparseCachedObject, _DiscardEntry, _is_commit_id
+from lakefs.client import Client, _BaseLakeFSObject, _call_raw
 from lakefs.exceptions import (
     api_exception_handler,
     handle_http_error,
@@ -29,6 +42,7 @@ from lakefs.exceptions import (
     PermissionException,
     ObjectExistsException,
     InvalidRangeException,
+    ServerException,
 )
 from lakefs.models import ObjectInfo
 
@@ -36,8 +50,45 @@ _LAKEFS_METADATA_PREFIX = "x-lakefs-meta-"
 # _BUFFER_SIZE - Writer buffer size. While buffer size not exceed, data will be maintained in memory and file will
 #                not be created.
 _WRITER_BUFFER_SIZE = 32 * 1024 * 1024
+# _READER_MAX_BLOCKS - Default number of blocks kept in memory by a buffered reader.
+_READER_MAX_BLOCKS = 4
+# _READLINE_CHUNK_SIZE - Size of the ranged reads used when iterating an object line by line, and when decoding text.
+_READLINE_CHUNK_SIZE = 64 * 1024
+# _PRESIGN_EXPIRY_MARGIN - Seconds before expiry in which a cached presigned URL is considered stale and refreshed.
+_PRESIGN_EXPIRY_MARGIN = 60
+# _STREAM_CHUNK_SIZE - Max size of a single socket read when streaming a response into a caller supplied buffer.
+_STREAM_CHUNK_SIZE = 1024 * 1024
+# _READ_RANGES_MAX_GAP - Ranges which are at most this many bytes apart are fetched using a single request.
+_READ_RANGES_MAX_GAP = 1024 * 1024
+# _WRITER_STREAM_MAX_CHUNKS - Number of _STREAM_CHUNK_SIZE chunks a streaming writer buffers for its upload.
+_WRITER_STREAM_MAX_CHUNKS = 8
+# _WRITER_PART_SIZE - Part size of streamed presigned multipart uploads, must be at least 5 MiB.
+_WRITER_PART_SIZE = 8 * 1024 * 1024
+# _WRITER_STREAM_MAX_PARTS - Number of part URLs requested for a streamed presigned multipart upload. As the size of
+#                            a stream is unknown in advance, it is limited to _WRITER_PART_SIZE * this many parts.
+_WRITER_STREAM_MAX_PARTS = 1000
+# _WRITER_MULTIPART_THRESHOLD - Objects of at least this size are uploaded using a parallel presigned multipart upload.
+_WRITER_MULTIPART_THRESHOLD = 64 * 1024 * 1024
+# _MULTIPART_MAX_PARTS - Maximal number of parts in a multipart upload, the part size is increased to fit large objects.
+_MULTIPART_MAX_PARTS = 10000
+# _MULTIPART_PART_ATTEMPTS - Number of attempts to upload a part before failing the upload.
+_MULTIPART_PART_ATTEMPTS = 4
+# _MULTIPART_RETRY_BACKOFF - Seconds to wait before the first part upload retry, doubled on every retry.
+_MULTIPART_RETRY_BACKOFF = 0.5
+# _STREAM_POLL_INTERVAL - Seconds a blocked streaming writer waits before checking whether its upload failed.
+_STREAM_POLL_INTERVAL = 0.1
+_AUTH_SETTINGS = ['basic_auth', 'cookie_auth', 'oidc_auth', 'saml_auth', 'jwt_token']
 
 ReadModes = Literal['r', 'rb']
+_NEWLINES = (None, "", "\n", "\r", "\r\n")
+# _LINE_ENDS - Line terminators by newline mode, a single "\r" is ambiguous until the next character is known
+_LINE_ENDS = {
+    None: re.compile("\r\n|\r|\n"),
+    "": re.compile("\r\n|\r|\n"),
+    "\n": re.compile("\n"),
+    "\r": re.compile("\r"),
+    "\r\n": re.compile("\r\n"),
+}
 WriteModes = Literal['x', 'xb', 'w', 'wb']
 AllModes = Union[ReadModes, WriteModes]
 
@@ -181,21 +232,294 @@ class LakeFSIOBase(_BaseLakeFSObject, IO):
         return self._pos
 
 
+class _BlockBuffer:
+    """
+    In memory LRU of fixed size object blocks, used by ObjectReader in buffered mode.
+    When read-ahead is enabled, sequential access to block N triggers a background fetch of block N+1.
+    """
+    _blocks: OrderedDict[int, bytes]
+    _pending: Optional[tuple[int, Future]] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _last_block: Optional[int] = None
+    _eof: Optional[int] = None
+
+    def __init__(self, fetch: Callable[[int, int], bytes], block_size: int, max_blocks: int, read_ahead: bool):
+        if block_size <= 0:
+            raise ValueError("block_size must be a positive integer")
+        if max_blocks <= 0:
+            raise ValueError("max_blocks must be a positive integer")
+
+        self._fetch = fetch
+        self._block_size = block_size
+        self._max_blocks = max_blocks
+        self._read_ahead = read_ahead
+        self._blocks = OrderedDict()
+
+    def read(self, start: int, n: Optional[int] = None) -> bytes:
+        """
+        Read up to n bytes starting at the given offset, or until the end of the object if n is None
+        """
+        chunks = []
+        pos = start
+        while n is None or pos < start + n:
+            if self._eof is not None and pos >= self._eof:
+                break
+
+            idx, offset = divmod(pos, self._block_size)
+            block = self._get_block(idx)
+            end = len(block) if n is None else min(len(block), offset + start + n - pos)
+            if offset >= end:
+                break
+
+            chunks.append(memoryview(block)[offset:end])
+            pos += end - offset
+
+        return b"".join(chunks)
+
+    def close(self) -> None:
+        """
+        Drop all buffered blocks and cancel pending read-ahead
+        """
+        self._blocks.clear()
+        self._pending = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_block(self, idx: int) -> bytes:
+        block = self._blocks.get(idx)
+        if block is not None:
+            self._blocks.move_to_end(idx)
+        else:
+            if self._pending is not None and self._pending[0] == idx:
+                block = self._pending[1].result()
+                self._pending = None
+            else:
+                block = self._fetch(idx * self._block_size, self._block_size)
+            self._store(idx, block)
+
+        if self._read_ahead and (self._last_block is None or idx == self._last_block + 1):
+            self._schedule(idx + 1)
+        self._last_block = idx
+        return block
+
+    def _store(self, idx: int, block: bytes) -> None:
+        if len(block) < self._block_size:
+            self._eof = idx * self._block_size + len(block)
+        self._blocks[idx] = block
+        while len(self._blocks) > self._max_blocks:
+            self._blocks.popitem(last=False)
+
+    def _schedule(self, idx: int) -> None:
+        if self._eof is not None and idx * self._block_size >= self._eof:
+            return
+        if idx in self._blocks or (self._pending is not None and self._pending[0] == idx):
+            return
+
+        if self._pending is not None:  # Only a single read-ahead is kept in flight
+            self._pending[1].cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lakefs-read-ahead")
+        self._pending = (idx, self._executor.submit(self._fetch, idx * self._block_size, self._block_size))
+
+
+class _PresignedAddress:
+    """
+    Caches an object's presigned physical address and refreshes it shortly before it expires.
+    Resolves to None if the server returned an address which cannot be read directly.
+    """
+    _url: Optional[str] = None
+    _stats: Optional[lakefs_sdk.ObjectStats] = None
+
+    def __init__(self, resolve: Callable[[], lakefs_sdk.ObjectStats]):
+        self._resolve = resolve
+        self._lock = threading.Lock()
+
+    def get(self, refresh: bool = False) -> Optional[str]:
+        """
+        Returns the cached presigned URL, resolving it if missing, stale or refresh is requested
+        """
+        with self._lock:
+            expiry = self._stats.physical_address_expiry if self._stats is not None else None
+            stale = expiry is not None and time.time() >= expiry - _PRESIGN_EXPIRY_MARGIN
+            if self._stats is None or stale or refresh:
+                self._stats = self._resolve()
+                address = self._stats.physical_address
+                self._url = address if address.startswith(("http://", "https://")) else None
+            return self._url
+
+    def stats(self) -> lakefs_sdk.ObjectStats:
+        """
+        Returns the object stats the presigned URL was resolved from
+        """
+        self.get()
+        return self._stats
+
+
+class _TextDecoder:
+    """
+    Incrementally decodes the object's UTF-8 content, with newline handling as in the built-in open() function.
+    The byte offset of every returned character is tracked, so that the reader position remains a byte offset.
+    """
+
+    def __init__(self, fetch: Callable[[int, Optional[int]], bytes], newline: Optional[str]):
+        self._fetch = fetch
+        self._newline = newline
+        self._line_end = _LINE_ENDS[newline]
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""  # Decoded characters, only self._buf[self._idx:] were not returned yet
+        self._idx = 0
+        self._start = 0  # Byte offset of self._buf[self._idx]
+        self._end = 0  # Byte offset of the next byte to fetch
+        self._eof = False
+
+    def _seek(self, pos: int) -> None:
+        if pos != self._start:
+            self._decoder.reset()
+            self._buf = ""
+            self._idx = 0
+            self._start = self._end = pos
+            self._eof = False
+
+    def _available(self) -> int:
+        return len(self._buf) - self._idx
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        """
+        Fetch and decode at least size bytes (or until EOF if size is None). Returns False if already at EOF
+        """
+        if self._eof:
+            return False
+
+        size = None if size is None else max(size, _READLINE_CHUNK_SIZE)
+        data = self._fetch(self._end, size)
+        self._end += len(data)
+        self._eof = size is None or len(data) < size
+        self._buf = self._buf[self._idx:] + self._decoder.decode(data, final=self._eof)
+        self._idx = 0
+        return True
+
+    def _translate(self, text: str) -> str:
+        if self._newline is None:
+            return text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def _raw_length(self, n: int) -> int:
+        """
+        Returns the number of buffered characters which translate to n characters
+        """
+        k = n
+        if self._newline is None:
+            while True:
+                extra = self._buf.count("\r\n", self._idx, self._idx + k)
+                if n + extra == k:
+                    break
+                k = n + extra
+            end = self._idx + k
+            if 0 < k < self._available() and self._buf[end - 1] == "\r" and self._buf[end] == "\n":
+                k += 1  # Never split a "\r\n"
+        return k
+
+    def _take(self, k: int) -> str:
+        text = self._buf[self._idx:self._idx + k]
+        self._idx += k
+        self._start += len(text) if text.isascii() else len(text.encode("utf-8"))
+        return self._translate(text)
+
+    def read(self, pos: int, n: Optional[int] = None) -> tuple[str, int]:
+        """
+        Read up to n characters (until EOF if n is None) starting at byte offset pos.
+        Returns the text and the byte offset following it.
+        """
+        self._seek(pos)
+        if n == 0:
+            return "", self._start
+        if n is None or n < 0:
+            while self._fill():
+                pass
+            k = self._available()
+        else:
+            while True:
+                k = self._raw_length(n)
+                # One more character is needed to tell whether a trailing "\r" is followed by "\n"
+                if self._available() > k or not self._fill(k + 1 - self._available()):
+                    break
+            k = min(k, self._available())
+        return self._take(k), self._start
+
+    def readline(self, pos: int, limit: int = -1) -> tuple[str, int]:
+        """
+        Read a line of at most limit characters (if limit > -1) starting at byte offset pos.
+        Returns the line and the byte offset following it.
+        """
+        self._seek(pos)
+        searched = 0  # Characters already searched for a line end, relative to self._idx
+        while True:
+            match = self._line_end.search(self._buf, self._idx + searched)
+            if match is not None:
+                ambiguous = self._newline in (None, "") and match.group() == "\r" and match.end() == len(self._buf)
+                if not ambiguous or self._eof:
+                    k = match.end() - self._idx
+                    break
+            if 0 <= limit < self._available():
+                k = self._available()
+                break
+            # A line end may span chunks
+            searched = max(self._available() - 1, 0)
+            if not self._fill():
+                k = self._available()
+                break
+
+        if limit >= 0:
+            k = min(k, self._raw_length(limit))
+        return self._take(k), self._start
+
+
 class ObjectReader(LakeFSIOBase):
     """
     ObjectReader provides read-only functionality for lakeFS objects with IO semantics.
     This Object is instantiated and returned for immutable reference types (Commit, Tag...)
     """
-    _readlines_buf: io.BytesIO
+    _line_buf: tuple[int, bytes] = (0, b"")  # Start offset and content of the readline buffer
+    _text: Optional[_TextDecoder] = None
+    _block_buf: Optional[_BlockBuffer] = None
+    _presigned: _PresignedAddress
+    _cache: Optional[ObjectCache] = None
+    _cached: Optional[CachedObject] = None
 
     def __init__(self, obj: StoredObject, mode: ReadModes, pre_sign: Optional[bool] = None,
-                 client: Optional[Client] = None) -> None:
+                 client: Optional[Client] = None, *, block_size: Optional[int] = None,
+                 max_blocks: int = _READER_MAX_BLOCKS, read_ahead: bool = True,
+                 cache: Optional[ObjectCache] = None, newline: Optional[str] = None) -> None:
+        """
+        :param obj: The object to read
+        :param mode: Read mode - as supported by ReadModes
+        :param pre_sign: (Optional), enforce the pre_sign mode on the lakeFS server
+        :param client: (Optional) The lakeFS client to use
+        :param block_size: (Optional) Enables buffered mode: data is fetched in blocks of this size, and reads which
+            fall inside a buffered block are served from memory. If None, every read issues a single request.
+        :param max_blocks: Number of blocks kept in memory in buffered mode
+        :param read_ahead: In buffered mode, fetch the next block in the background while reading sequentially
+        :param cache: (Optional) Local object cache to serve the object's content from
+        :param newline: (Optional) Text mode only, controls line endings as in the built-in open() function
+        """
         if mode not in get_args(ReadModes):
             raise ValueError(f"invalid read mode: '{mode}'. ReadModes: {ReadModes}")
+        if newline not in _NEWLINES:
+            raise ValueError(f"illegal newline value: {newline!r}")
+        if 'b' in mode and newline is not None:
+            raise ValueError("binary mode doesn't take a newline argument")
 
         super().__init__(obj, mode, pre_sign, client)
-        self._readlines_buf = io.BytesIO(b"")
         self._is_closed = False
+        self._presigned = _PresignedAddress(self._stat_presigned)
+        if cache is not None:
+            self._cache = cache
+            self._cache_lock = threading.Lock()
+        if block_size is not None:
+            self._block_buf = _BlockBuffer(self._read_at, block_size, max_blocks, read_ahead)
+        if 'b' not in mode:
+            self._text = _TextDecoder(self._fetch_at, newline)
 
     @property
     def pre_sign(self):
@@ -277,13 +601,255 @@ class ObjectReader(LakeFSIOBase):
         self._pos = pos
         return pos
 
-    def _cast_by_mode(self, retval):
-        if 'b' not in self.mode:
-            return retval.decode('utf-8')
-        return retval
+    def _cached_object(self) -> Optional[CachedObject]:
+        """
+        Returns the object's content in the local cache, populating the cache on first access.
+        Returns None if the reader has no cache or the content could not be cached.
+        """
+        if self._cache is not None:
+            with self._cache_lock:
+                if self._cache is not None:  # Resolve only once
+                    self._cached = self._open_cached(self._cache)
+                    self._cache = None
+
+        if self._cached is not None and self._cached.discarded:
+            return None
+        return self._cached
+
+    def _open_cached(self, cache: ObjectCache) -> Optional[CachedObject]:
+        repo, ref, path = self._obj.repo, self._obj.ref, self._obj.path
+        immutable = _is_commit_id(ref)
+        entry = cache.lookup(repo, ref, path)
+        if not immutable and not self.pre_sign and cache.block_size is None:
+            return self._revalidate(cache, entry)
+
+        if not immutable:
+            entry = None
+        if entry is None:
+            if self.pre_sign:
+                stats = self._presigned.stats()
+            else:
+                with api_exception_handler(_io_exception_handler):
+                    stats = self._client.sdk_client.objects_api.stat_object(repo, ref, path)
+            entry = (stats.checksum, stats.size_bytes)
+            if immutable:
+                cache.remember(repo, ref, path, *entry)
+
+        if cache.block_size is not None:
+            return cache.open(*entry, fetch=lambda start, n: self._fetch_range(start, n, entry[0]))
+
+        cached = cache.get(*entry)
+        if cached is None:
+            cached = cache.put(*entry, download=lambda f: self._download(f, entry[0]))
+        return cached
+
+    def _revalidate(self, cache: ObjectCache, entry: Optional[tuple[str, int]]) -> Optional[CachedObject]:
+        """
+        Serve a mutable reference using a conditional GET: if the cached content is still current the server replies
+        with 304 Not Modified, otherwise the new content is downloaded to the cache by the same request
+        """
+        cached = cache.get(*entry) if entry is not None else None
+        headers = {"If-None-Match": f'"{entry[0]}"'} if cached is not None else {}
+        resp = self._request_object(headers, presign=False)
+        if resp.status == http.HTTPStatus.NOT_MODIFIED:
+            resp.release_conn()
+            return cached
+
+        if cached is not None:
+            cached.close()
+        consumed = False
+        try:
+            self._check_response(resp)
+            checksum = resp.headers.get("ETag", "").strip(' "')
+            size = resp.headers.get("Content-Length")
+            if not checksum or size is None:
+                return None  # Content cannot be keyed, read it remotely
+
+            def download(f: BinaryIO) -> bool:
+                nonlocal consumed
+                for chunk in resp.stream(_STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+                consumed = True
+                return True
+
+            entry = (checksum, int(size))
+            cached = cache.get(*entry) or cache.put(*entry, download=download)
+        finally:
+            if consumed:
+                resp.release_conn()
+            else:  # The new content was already cached, could not be cached, or its download failed
+                _discard_response(resp)
+
+        if cached is not None:
+            cache.remember(self._obj.repo, self._obj.ref, self._obj.path, *entry)
+        return cached
+
+    def _request_checksum(self, headers: dict[str, str], checksum: str) -> Optional[HTTPResponse]:
+        """
+        GET the object content for caching, returns None if the content no longer matches checksum
+        """
+        url = self._presigned.get() if self.pre_sign else None
+        if url is not None:
+            resp = self._request_presigned(url, headers, preload_content=False)
+            # The presigned URL points to the physical object the checksum was taken from, unless it was refreshed
+            # after the object was modified
+            if resp is None:
+                return None
+            if self._presigned.stats().checksum != checksum:
+                _discard_response(resp)
+                return None
+        else:
+            resp = self._request_object(headers, presign=False)
+
+        try:
+            self._check_response(resp)
+        except Exception:
+            resp.release_conn()
+            raise
+        etag = resp.headers.get("ETag", "").strip(' "')
+        if url is None and not _is_commit_id(self._obj.ref) and etag != checksum:
+            _discard_response(resp)
+            return None  # Object was modified since stat
+        return resp
+
+    def _download(self, f: BinaryIO, checksum: str) -> bool:
+        """
+        Write the whole object content to f. Returns False if the downloaded content does not match checksum
+        """
+        resp = self._request_checksum({}, checksum)
+        if resp is None:
+            return False
+
+        try:
+            for chunk in resp.stream(_STREAM_CHUNK_SIZE):
+                f.write(chunk)
+        except BaseException:  # The content was not read to the end
+            _discard_response(resp)
+            raise
+        resp.release_conn()
+        return True
+
+    def _fetch_range(self, start: int, n: int, checksum: str) -> bytes:
+        """
+        Fetch a range of the object for a sparse cache entry
+
+        :raise _DiscardEntry: if the content no longer matches checksum
+        """
+        resp = self._request_checksum({"Range": self._get_range_string(start=start, read_bytes=n)}, checksum)
+        if resp is None:
+            raise _DiscardEntry
+        try:
+            return resp.data
+        finally:
+            resp.release_conn()
+
+    def _stat_presigned(self) -> lakefs_sdk.ObjectStats:
+        with api_exception_handler(_io_exception_handler):
+            return self._client.sdk_client.objects_api.stat_object(self._obj.repo,
+                                                                   self._obj.ref,
+                                                                   self._obj.path,
+                                                                   presign=True)
+
+    def _request_presigned(self, url: str, headers: dict[str, str],
+                           preload_content: bool = True) -> Optional[HTTPResponse]:
+        """
+        GET from the object store using the presigned URL, refreshing it once if it was rejected as expired
+        """
+        pool_manager = self._client.sdk_client.objects_api.api_client.rest_client.pool_manager
+        resp = pool_manager.request(method="GET", url=url, headers=headers, preload_content=preload_content)
+        if resp.status == http.HTTPStatus.FORBIDDEN:
+            resp.drain_conn()  # The error body may be unread, drain it so the connection can be reused
+            resp.release_conn()
+            url = self._presigned.get(refresh=True)
+            if url is None:
+                return None
+            resp = pool_manager.request(method="GET", url=url, headers=headers, preload_content=preload_content)
+        return resp
+
+    def _request_object(self, headers: dict[str, str], presign: Optional[bool] = None) -> HTTPResponse:
+        """
+        Use raw get object API call, so that the response body can be streamed
+        """
+        headers = {"Accept": "application/octet-stream, application/json", **headers}
+        resource_path = urllib.parse.quote(f"/repositories/{self._obj.repo}/refs/{self._obj.ref}/objects",
+                                           encoding="utf-8")
+        query = {"path": self._obj.path}
+        if presign if presign is not None else self.pre_sign:
+            query["presign"] = "true"
+        url = self._client.config.host + resource_path + f"?{urllib.parse.urlencode(query, encoding='utf-8')}"
+        api_client = self._client.sdk_client.objects_api.api_client
+        api_client.update_params_for_auth(headers, None, _AUTH_SETTINGS, resource_path, "GET", None)
+        return api_client.rest_client.pool_manager.request(method="GET", url=url, headers=headers,
+                                                           preload_content=False)
+
+    @staticmethod
+    def _check_response(resp: HTTPResponse) -> None:
+        try:
+            handle_http_error(resp)
+        except LakeFSException as e:
+            raise _io_exception_handler(e) from e
+
+    def _read_presigned(self, url: str, read_range: Optional[str]) -> Optional[bytes]:
+        headers = {"Range": read_range} if read_range is not None else {}
+        resp = self._request_presigned(url, headers)
+        if resp is None:
+            return None
+        self._check_response(resp)
+        return resp.data
+
+    def _open_stream(self, read_range: Optional[str]) -> Optional[HTTPResponse]:
+        """
+        Returns an unread response for the given range, or None if the range is not satisfiable
+        """
+        headers = {"Range": read_range} if read_range is not None else {}
+        url = self._presigned.get() if self.pre_sign else None
+        resp = self._request_presigned(url, headers, preload_content=False) if url is not None else None
+        if resp is None:
+            resp = self._request_object(headers)
+
+        try:
+            self._check_response(resp)
+        except InvalidRangeException:
+            return None
+        return resp
+
+    def _stream_into(self, start: int, view: memoryview) -> int:
+        cached = self._cached_object()
+        if cached is not None:
+            try:
+                return cached.readinto_at(start, view)
+            except _DiscardEntry:  # Object was modified, read it remotely
+                pass
+
+        resp = self._open_stream(self._get_range_string(start=start, read_bytes=len(view)))
+        if resp is None:
+            return 0
+
+        count = 0
+        try:
+            while count < len(view):
+                read = resp.readinto(view[count:count + _STREAM_CHUNK_SIZE])
+                if read == 0:
+                    break
+                count += read
+            exhausted = count < len(view) or not resp.read(1)
+        except BaseException:
+            _discard_response(resp)
+            raise
+        if exhausted:
+            resp.release_conn()
+        else:  # The response is longer than the requested range
+            _discard_response(resp)
+        return count
 
     def _read(self, read_range: str) -> str | bytes:
         try:
+            url = self._presigned.get() if self.pre_sign else None
+            if url is not None:
+                contents = self._read_presigned(url, read_range)
+                if contents is not None:
+                    return contents
+
             with api_exception_handler(_io_exception_handler):
                 return self._client.sdk_client.objects_api.get_object(self._obj.repo,
                                                                       self._obj.ref,
@@ -295,13 +861,22 @@ class ObjectReader(LakeFSIOBase):
             # This is done in order to behave like the built-in open() function
             return b''
 
+    def _read_at(self, start: int, read_bytes: Optional[int] = None) -> str | bytes:
+        cached = self._cached_object()
+        if cached is not None:
+            try:
+                return cached.read_at(start, read_bytes)
+            except _DiscardEntry:  # Object was modified, read it remotely
+                pass
+        return self._read(self._get_range_string(start=start, read_bytes=read_bytes))
+
     def read(self, n: int = None) -> str | bytes:
         """
         Read object data
 
-        :param n: How many bytes to read. If read_bytes is None, will read from current position to end.
-            If current position + read_bytes > object size.
-        :return: The bytes read
+        :param n: How many bytes to read (characters in text mode). If read_bytes is None, will read from current
+            position to end. If current position + read_bytes > object size.
+        :return: The bytes read, or the decoded text in text mode
         :raise ValueError: if reader is closed
         :raise OSError: if read_bytes is non-positive
         :raise ObjectNotFoundException: if repository id, reference id or object path does not exist
@@ -314,17 +889,110 @@ class ObjectReader(LakeFSIOBase):
         if n and n <= 0:
             raise OSError("read_bytes must be a positive integer")
 
-        read_range = self._get_range_string(start=self._pos, read_bytes=n)
-        contents = self._read(read_range)
+        if self._text is not None:
+            text, self._pos = self._text.read(self._pos, n)
+            return text
+
+        contents = self._fetch_at(self._pos, n)
         self._pos += len(contents)  # Update pointer position
+        return contents
+
+    def readinto(self, buffer) -> int:
+        """
+        Read bytes into a pre-allocated, writable bytes-like object (bytearray, memoryview, numpy array...).
+        Unless the reader is buffered, the response body is streamed straight into the buffer without loading the
+        whole range into memory.
+        Allows wrapping the reader with io.BufferedReader.
+
+        :param buffer: The buffer to read into
+        :return: The number of bytes read, 0 on EOF
+        :raise ValueError: if reader is closed
+        :raise io.UnsupportedOperation: if reader is not in binary mode
+        :raise ObjectNotFoundException: if repository id, reference id or object path does not exist
+        :raise PermissionException: if user is not authorized to perform this operation, or operation is forbidden
+        :raise ServerException: for any other errors
+        """
+        if self._is_closed:
+            raise ValueError("I/O operation on closed file")
+        if 'b' not in self.mode:
+            raise io.UnsupportedOperation("readinto is supported only in binary mode")
+
+        with memoryview(buffer) as mv, mv.cast("B") as view:
+            if len(view) == 0:
+                return 0
+            if self._block_buf is not None:
+                contents = self._block_buf.read(self._pos, len(view))
+                count = len(contents)
+                view[:count] = contents
+            else:
+                count = self._stream_into(self._pos, view)
+
+        self._pos += count
+        return count
+
+    def read_ranges(self, ranges: Iterable[tuple[int, int]], max_gap: int = _READ_RANGES_MAX_GAP,
+                    max_workers: Optional[int] = None) -> list[memoryview]:
+        """
+        Read multiple byte ranges of the object, without moving the read position.
+        Ranges which are at most max_gap bytes apart are merged, and the merged ranges are fetched concurrently.
 
-        return self._cast_by_mode(contents)
+        :param ranges: An iterable of (offset, length) tuples
+        :param max_gap: Ranges separated by at most this many bytes are fetched using a single request
+        :param max_workers: (Optional) Max number of concurrent requests, defaults to the client's connection pool size
+        :return: A memoryview with the data of each range, in the order of the given ranges. A range which exceeds the
+            object's size is truncated.
+        :raise ValueError: if reader is closed or a range is invalid
+        :raise io.UnsupportedOperation: if reader is not in binary mode
+        :raise ObjectNotFoundException: if repository id, reference id or object path does not exist
+        :raise PermissionException: if user is not authorized to perform this operation, or operation is forbidden
+        :raise ServerException: for any other errors
+        """
+        if self._is_closed:
+            raise ValueError("I/O operation on closed file")
+        if 'b' not in self.mode:
+            raise io.UnsupportedOperation("read_ranges is supported only in binary mode")
+
+        ranges = list(ranges)
+        if any(offset < 0 or length < 0 for offset, length in ranges):
+            raise ValueError("range offset and length must be non-negative integers")
+
+        merged = []  # [start, end, [range indexes]]
+        for i in sorted(range(len(ranges)), key=lambda idx: ranges[idx][0]):
+            offset, length = ranges[i]
+            if merged and offset <= merged[-1][1] + max_gap:
+                merged[-1][1] = max(merged[-1][1], offset + length)
+                merged[-1][2].append(i)
+            else:
+                merged.append([offset, offset + length, [i]])
+
+        def fetch(start: int, end: int) -> memoryview:
+            buf = memoryview(bytearray(end - start))
+            return buf[:self._stream_into(start, buf)] if end > start else buf
+
+        workers = max_workers or self._client.config.connection_pool_maxsize
+        results: list[Optional[memoryview]] = [None] * len(ranges)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(merged)))) as executor:
+            futures = [(start, indexes, executor.submit(fetch, start, end)) for start, end, indexes in merged]
+            for start, indexes, future in futures:
+                data = future.result()
+                for i in indexes:
+                    offset, length = ranges[i]
+                    results[i] = data[offset - start:offset - start + length]
+        return results
+
+    def readinto1(self, buffer) -> int:
+        """
+        Same as readinto
+        """
+        return self.readinto(buffer)
 
     def readline(self, limit: int = -1):
         """
         Read and return a line from the stream.
+        The object is streamed using ranged reads, so memory usage does not depend on the object size.
+        In text mode, line endings are recognized and translated according to the reader's newline argument.
 
-        :param limit: If limit > -1 returns at most limit bytes
+        :param limit: If limit > -1 returns at most limit bytes (characters in text mode)
         :raise ValueError: if reader is closed
         :raise ObjectNotFoundException: if repository id, reference id or object path does not exist
         :raise PermissionException: if user is not authorized to perform this operation, or operation is forbidden
@@ -333,12 +1001,60 @@ class ObjectReader(LakeFSIOBase):
         if self._is_closed:
             raise ValueError("I/O operation on closed file")
 
-        if self._readlines_buf.getbuffer().nbytes == 0:
-            self._readlines_buf = io.BytesIO(self._read(self._get_range_string(0)))
-        self._readlines_buf.seek(self._pos)
-        line = self._readlines_buf.readline(limit)
-        self._pos = self._readlines_buf.tell()
-        return self._cast_by_mode(line)
+        if self._text is not None:
+            line, self._pos = self._text.readline(self._pos, limit)
+            return line
+
+        line = bytearray()
+        while limit < 0 or len(line) < limit:
+            buf, offset = self._line_chunk(self._pos)
+            if offset >= len(buf):  # EOF
+                break
+
+            end = len(buf) if limit < 0 else min(len(buf), offset + limit - len(line))
+            newline = buf.find(b"\n", offset, end)
+            if newline != -1:
+                end = newline + 1
+            line += buf[offset:end]
+            self._pos += end - offset
+            if newline != -1:
+                break
+
+        return bytes(line)
+
+    def readlines(self, hint: int = -1):
+        """
+        Read and return a list of lines from the stream.
+
+        :param hint: If hint > 0, stop reading lines once their total size exceeds hint
+        :raise ValueError: if reader is closed
+        :raise ObjectNotFoundException: if repository id, reference id or object path does not exist
+        :raise PermissionException: if user is not authorized to perform this operation, or operation is forbidden
+        :raise ServerException: for any other errors
+        """
+        lines = []
+        total = 0
+        for line in self:
+            lines.append(line)
+            total += len(line)
+            if 0 < hint <= total:
+                break
+        return lines
+
+    def _line_chunk(self, pos: int) -> tuple[bytes, int]:
+        """
+        Returns the line buffer and the offset of pos in it. A new chunk is fetched if pos is outside the buffer
+        """
+        start, buf = self._line_buf
+        if not start <= pos < start + len(buf):
+            start, buf = pos, self._fetch_at(pos, _READLINE_CHUNK_SIZE)
+            self._line_buf = (start, buf)
+        return buf, pos - start
+
+    def _fetch_at(self, start: int, n: Optional[int] = None) -> bytes:
+        if self._block_buf is not None:
+            return self._block_buf.read(start, n)
+        return self._read_at(start, n)
 
     def flush(self) -> None:
         """
@@ -357,7 +1073,11 @@ class ObjectReader(LakeFSIOBase):
             return
 
         self._is_closed = True
-        self._readlines_buf.close()
+        self._line_buf = (0, b"")
+        if self._cached is not None:
+            self._cached.close()
+        if self._block_buf is not None:
+            self._block_buf.close()
 
     def _abort(self):
         """
@@ -380,6 +1100,102 @@ class ObjectReader(LakeFSIOBase):
         return f'ObjectReader(path="{self._obj.path}")'
 
 
+class _UploadAborted(Exception):
+    """
+    Raised inside a streaming upload when its writer is discarded
+    """
+
+
+class _StreamingUpload:
+    """
+    Write-only file-like object which feeds the written data to an upload running in a background thread.
+    The upload consumes the data as an iterator of chunks and starts on the first write. Writers block while
+    max_chunks chunks are pending, so memory usage does not depend on the object size.
+    """
+    _future: Optional[Future] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    def __init__(self, upload: Callable[[Iterator[bytes]], lakefs_sdk.ObjectStats], max_chunks: int):
+        self._upload = upload
+        self._queue: queue.Queue[Optional[bytes] | BaseException] = queue.Queue(maxsize=max_chunks)
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        """
+        Returns True once the upload was committed or aborted
+        """
+        return self._closed
+
+    def _chunks(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield chunk
+
+    def _put(self, item: Optional[bytes] | BaseException) -> None:
+        if self._future is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+            self._future = self._executor.submit(self._upload, self._chunks())
+
+        while True:
+            if self._future.done():
+                self._future.result()  # Raises the upload's error
+                raise OSError("upload completed before all data was written")
+            try:
+                self._queue.put(item, timeout=_STREAM_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, data: bytes) -> int:
+        """
+        Queue data for upload, blocks while the upload is behind
+        """
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+
+        with memoryview(data) as mv, mv.cast("B") as view:
+            for i in range(0, len(view), _STREAM_CHUNK_SIZE):
+                self._put(bytes(view[i:i + _STREAM_CHUNK_SIZE]))  # Copy, as callers may reuse their buffer
+            return len(view)
+
+    def flush(self) -> None:
+        """
+        Data is sent as it is written, nothing to flush
+        """
+
+    def commit(self) -> lakefs_sdk.ObjectStats:
+        """
+        Wait for the upload of all written data to complete and return the uploaded object's stats
+        """
+        self._closed = True
+        try:
+            self._put(None)
+            return self._future.result()
+        finally:
+            self._executor.shutdown()
+
+    def close(self) -> None:
+        """
+        Abort the upload
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._future is None:
+            return
+        try:
+            self._put(_UploadAborted())
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass  # Upload already failed
+        self._executor.shutdown()
+
+
 class ObjectWriter(LakeFSIOBase):
     """
     ObjectWriter provides write-only functionality for lakeFS objects with IO semantics.
@@ -387,7 +1203,7 @@ class ObjectWriter(LakeFSIOBase):
     For the data to be actually written to the lakeFS server the close() method must be invoked explicitly or
     implicitly when using writer as a context.
     """
-    _fd: tempfile.SpooledTemporaryFile
+    _fd: tempfile.SpooledTemporaryFile | _StreamingUpload
     _obj_stats: ObjectInfo = None
 
     def __init__(self,
@@ -396,7 +1212,20 @@ class ObjectWriter(LakeFSIOBase):
                  pre_sign: Optional[bool] = None,
                  content_type: Optional[str] = None,
                  metadata: Optional[dict[str, str]] = None,
-                 client: Optional[Client] = None) -> None:
+                 client: Optional[Client] = None,
+                 *,
+                 streaming: bool = False,
+                 source: Optional[BinaryIO] = None) -> None:
+        """
+        :param obj: The object to write
+        :param mode: Write mode - as supported by WriteModes
+        :param pre_sign: (Optional), enforce the pre_sign mode on the lakeFS server
+        :param content_type: (Optional) Specify the data media type
+        :param metadata: (Optional) User defined metadata to save on the object
+        :param client: (Optional) The lakeFS client to use
+        :param streaming: Upload data as it is written instead of buffering the whole object until close()
+        :param source: (Optional) A seekable binary file whose content is uploaded on close(), instead of written data
+        """
 
         if 'x' in mode and obj.exists():  # Requires explicit create
             raise ObjectExistsException
@@ -414,8 +1243,15 @@ class ObjectWriter(LakeFSIOBase):
             "mode": 'wb+',  # Always write to file in binary mode (bug in urllib3 < 2.0,
             "max_size": _WRITER_BUFFER_SIZE,
         }
-        self._fd = tempfile.SpooledTemporaryFile(**open_kwargs)  # pylint: disable=consider-using-with
+        if source is not None:
+            self._fd = source
+        elif streaming:
+            self._fd = _StreamingUpload(self._upload_stream, _WRITER_STREAM_MAX_CHUNKS)
+        else:
+            self._fd = tempfile.SpooledTemporaryFile(**open_kwargs)  # pylint: disable=consider-using-with
         super().__init__(obj, mode, pre_sign, client)
+        if source is not None:
+            self._pos = source.seek(0, os.SEEK_END)
 
     @property
     def pre_sign(self) -> bool:
@@ -484,9 +1320,25 @@ class ObjectWriter(LakeFSIOBase):
         if self._fd.closed:
             return
 
-        stats = self._upload_presign() if self.pre_sign else self._upload_raw()
-        self._obj_stats = ObjectInfo(**stats.dict())
-        self._fd.close()
+        try:
+            if isinstance(self._fd, _StreamingUpload):
+                stats = self._fd.commit()
+            elif self.pre_sign and self._pos >= _WRITER_MULTIPART_THRESHOLD and \
+                    self._client.storage_config.pre_sign_multipart_upload:
+                lock = threading.Lock()
+
+                def read(offset: int, n: int) -> bytes:
+                    with lock:
+                        self._fd.seek(offset)
+                        return self._fd.read(n)
+
+                stats = self._upload_parts(self._pos, read)
+            else:
+                stats = self._upload_presign() if self.pre_sign else self._upload_raw()
+            self._obj_stats = ObjectInfo(**stats.dict())
+            self._obj._stats = self._obj_stats  # pylint: disable=protected-access
+        finally:  # The buffered data is discarded if the upload failed
+            self._fd.close()
 
     def _abort(self) -> None:
         """
@@ -510,11 +1362,21 @@ class ObjectWriter(LakeFSIOBase):
         etag = headers.get("ETag", "").strip(' "')
         return etag
 
-    def _upload_raw(self) -> lakefs_sdk.ObjectStats:
+    def _upload_stream(self, chunks: Iterator[bytes]) -> lakefs_sdk.ObjectStats:
+        """
+        Upload a stream of unknown size: as a presigned multipart upload if supported, otherwise as a chunked request
+        body sent to lakeFS
+        """
+        if self.pre_sign and self._client.storage_config.pre_sign_multipart_upload:
+            return self._upload_multipart(chunks)
+        return self._upload_raw(chunks)
+
+    def _upload_raw(self, chunks: Optional[Iterator[bytes]] = None) -> lakefs_sdk.ObjectStats:
         """
         Use raw upload API call to bypass validation of content parameter
+
+        :param chunks: (Optional) Upload the given chunks as a chunked request body, instead of the write buffer
         """
-        auth_settings = ['basic_auth', 'cookie_auth', 'oidc_auth', 'saml_auth', 'jwt_token']
         headers = {
             "Accept": "application/json",
             "Content-Type": self.content_type if self.content_type is not None else "application/octet-stream"
@@ -525,26 +1387,147 @@ class ObjectWriter(LakeFSIOBase):
             for k, v in self.metadata.items():
                 headers[_LAKEFS_METADATA_PREFIX + k] = v
 
-        self._fd.seek(0)
+        body_kwargs = {"body": chunks, "chunked": True}
+        if chunks is None:
+            self._fd.seek(0)
+            body_kwargs = {"body": self._fd}
+            headers["Content-Length"] = str(self._pos)
         resource_path = urllib.parse.quote(f"/repositories/{self._obj.repo}/branches/{self._obj.ref}/objects",
                                            encoding="utf-8")
         query_params = urllib.parse.urlencode({"path": self._obj.path}, encoding="utf-8")
         url = self._client.config.host + resource_path + f"?{query_params}"
-        self._client.sdk_client.objects_api.api_client.update_params_for_auth(headers, None, auth_settings,
-                                                                              resource_path, "POST", self._fd)
+        self._client.sdk_client.objects_api.api_client.update_params_for_auth(headers, None, _AUTH_SETTINGS,
+                                                                              resource_path, "POST",
+                                                                              body_kwargs["body"])
         resp = self._client.sdk_client.objects_api.api_client.rest_client.pool_manager.request(url=url,
                                                                                                method="POST",
                                                                                                headers=headers,
-                                                                                               body=self._fd)
+                                                                                               **body_kwargs)
 
         handle_http_error(resp)
         return lakefs_sdk.ObjectStats(**json.loads(resp.data))
 
-    def _upload_presign(self) -> lakefs_sdk.ObjectStats:
-        staging_location = self._client.sdk_client.staging_api.get_physical_address(self._obj.repo,
-                                                                                    self._obj.ref,
-                                                                                    self._obj.path,
-                                                                                    True)
+    def _upload_multipart(self, chunks: Iterator[bytes]) -> lakefs_sdk.ObjectStats:
+        """
+        Upload a stream to the object store using a presigned multipart upload, each part is uploaded as soon as it is
+        complete. A stream smaller than a single part is uploaded with a single presigned PUT.
+        """
+        buf = bytearray()
+        parts: list[UploadPart] = []
+        mpu = None
+        try:
+            for chunk in chunks:
+                buf += chunk
+                while len(buf) >= _WRITER_PART_SIZE:
+                    if mpu is None:
+                        mpu = self._create_multipart(_WRITER_STREAM_MAX_PARTS)
+                    with memoryview(buf) as view:
+                        part = bytes(view[:_WRITER_PART_SIZE])
+                    del buf[:_WRITER_PART_SIZE]
+                    parts.append(self._upload_part(mpu, len(parts) + 1, part))
+
+            if mpu is None:
+                return self._upload_presign(bytes(buf))
+            if buf:
+                parts.append(self._upload_part(mpu, len(parts) + 1, bytes(buf)))
+            return self._complete_multipart(mpu, parts)
+        except BaseException:
+            if mpu is not None:
+                self._abort_multipart(mpu)
+            raise
+
+    def _upload_parts(self, size: int, read: Callable[[int, int], bytes]) -> lakefs_sdk.ObjectStats:
+        """
+        Upload content of a known size to the object store using a presigned multipart upload, with the parts uploaded
+        concurrently. Each part is read right before it is uploaded, so memory usage is bounded by the concurrency.
+
+        :param size: The content size in bytes
+        :param read: Returns the content given an offset and a length, must be thread safe
+        """
+        part_size = max(_WRITER_PART_SIZE, -(-size // _MULTIPART_MAX_PARTS))
+        num_parts = max(-(-size // part_size), 1)
+        mpu = self._create_multipart(num_parts)
+
+        def upload(part_number: int) -> UploadPart:
+            offset = (part_number - 1) * part_size
+            return self._upload_part(mpu, part_number, read(offset, min(part_size, size - offset)))
+
+        workers = min(self._client.config.connection_pool_maxsize, num_parts)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            # Results are collected in submission order, so parts are completed in order
+            futures = [executor.submit(upload, i + 1) for i in range(num_parts)]
+            parts = [future.result() for future in futures]
+            return self._complete_multipart(mpu, parts)
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._abort_multipart(mpu)
+            raise
+        finally:
+            executor.shutdown()
+
+    def _create_multipart(self, num_parts: int) -> lakefs_sdk.PresignMultipartUpload:
+        with api_exception_handler():
+            return self._client.sdk_client.experimental_api.create_presign_multipart_upload(self._obj.repo,
+                                                                                            self._obj.ref,
+                                                                                            self._obj.path,
+                                                                                            parts=num_parts)
+
+    def _complete_multipart(self, mpu: lakefs_sdk.PresignMultipartUpload,
+                            parts: list[UploadPart]) -> lakefs_sdk.ObjectStats:
+        complete = CompletePresignMultipartUpload(physical_address=mpu.physical_address,
+                                                  parts=parts,
+                                                  user_metadata=self.metadata,
+                                                  content_type=self.content_type)
+        with api_exception_handler():
+            return self._client.sdk_client.experimental_api.complete_presign_multipart_upload(
+                self._obj.repo, self._obj.ref, mpu.upload_id, self._obj.path,
+                complete_presign_multipart_upload=complete)
+
+    def _abort_multipart(self, mpu: lakefs_sdk.PresignMultipartUpload) -> None:
+        abort = AbortPresignMultipartUpload(physical_address=mpu.physical_address)
+        try:
+            self._client.sdk_client.experimental_api.abort_presign_multipart_upload(
+                self._obj.repo, self._obj.ref, mpu.upload_id, self._obj.path, abort_presign_multipart_upload=abort)
+        except lakefs_sdk.exceptions.ApiException:
+            pass  # The original error is more relevant
+
+    def _upload_part(self, mpu: lakefs_sdk.PresignMultipartUpload, part_number: int, data: bytes) -> UploadPart:
+        """
+        Upload a single part, retrying connection errors and server errors with exponential backoff
+        """
+        if part_number > len(mpu.presigned_urls or []):
+            raise OSError(f"object exceeds the maximal multipart upload size of {len(mpu.presigned_urls or [])} parts")
+
+        pool_manager = self._client.sdk_client.staging_api.api_client.rest_client.pool_manager
+        attempt = 1
+        while True:
+            try:
+                resp = pool_manager.request(method="PUT",
+                                            url=mpu.presigned_urls[part_number - 1],
+                                            body=data,
+                                            headers={"Content-Length": len(data)})
+                handle_http_error(resp)
+                return UploadPart(part_number=part_number,
+                                  etag=ObjectWriter._extract_etag_from_response(resp.headers))
+            except (urllib3.exceptions.HTTPError, ServerException) as e:
+                retryable = not isinstance(e, ServerException) or (e.status_code or 0) >= 500
+                if not retryable or attempt >= _MULTIPART_PART_ATTEMPTS:
+                    raise
+                time.sleep(_MULTIPART_RETRY_BACKOFF * 2 ** (attempt - 1))
+                attempt += 1
+
+    def _upload_presign(self, data: Optional[bytes] = None) -> lakefs_sdk.ObjectStats:
+        """
+        Upload using a presigned PUT
+
+        :param data: (Optional) Upload the given data, instead of the write buffer
+        """
+        with api_exception_handler():
+            staging_location = self._client.sdk_client.staging_api.get_physical_address(self._obj.repo,
+                                                                                        self._obj.ref,
+                                                                                        self._obj.path,
+                                                                                        True)
         url = staging_location.presigned_url
 
         headers = {"Content-Length": self._pos}
@@ -553,10 +1536,13 @@ class ObjectWriter(LakeFSIOBase):
         if self._client.storage_config.blockstore_type == "azure":
             headers["x-ms-blob-type"] = "BlockBlob"
 
-        self._fd.seek(0)
+        body = data
+        if body is None:
+            self._fd.seek(0)
+            body = self._fd
         resp = self._client.sdk_client.staging_api.api_client.rest_client.pool_manager.request(method="PUT",
                                                                                                url=url,
-                                                                                               body=self._fd,
+                                                                                               body=body,
                                                                                                headers=headers)
         handle_http_error(resp)
 
@@ -567,10 +1553,11 @@ class ObjectWriter(LakeFSIOBase):
                                            checksum=etag,
                                            user_metadata=self.metadata,
                                            content_type=self.content_type)
-        return self._client.sdk_client.staging_api.link_physical_address(self._obj.repo,
-                                                                         self._obj.ref,
-                                                                         self._obj.path,
-                                                                         staging_metadata=staging_metadata)
+        with api_exception_handler():
+            return self._client.sdk_client.staging_api.link_physical_address(self._obj.repo,
+                                                                             self._obj.ref,
+                                                                             self._obj.path,
+                                                                             staging_metadata=staging_metadata)
 
     def readable(self) -> bool:
         """
@@ -648,7 +1635,9 @@ class StoredObject(_BaseLakeFSObject):
         """
         return self._path
 
-    def reader(self, mode: ReadModes = 'rb', pre_sign: Optional[bool] = None) -> ObjectReader:
+    def reader(self, mode: ReadModes = 'rb', pre_sign: Optional[bool] = None, *, block_size: Optional[int] = None,
+               max_blocks: int = _READER_MAX_BLOCKS, read_ahead: bool = True,
+               cache: Optional[ObjectCache] = None, newline: Optional[str] = None) -> ObjectReader:
         """
         Context manager which provide a file-descriptor like object that allow reading the given object.
 
@@ -669,10 +1658,94 @@ class StoredObject(_BaseLakeFSObject):
 
         :param mode: Read mode - as supported by ReadModes
         :param pre_sign: (Optional), enforce the pre_sign mode on the lakeFS server. If not set, will probe server for
-            information.
+            information. In pre_sign mode the object's presigned URL is resolved once and data is read directly from
+            the object store, the URL is refreshed shortly before it expires.
+        :param block_size: (Optional) Read the object in blocks of this size and serve small reads from memory.
+            Recommended for code that reads in small chunks (csv readers, shutil.copyfileobj, zip readers).
+            If not set, every read is sent to the server.
+        :param max_blocks: Number of blocks kept in memory when block_size is set
+        :param read_ahead: When block_size is set, fetch the next block in the background during sequential reads
+        :param cache: (Optional) An ObjectCache to serve the object from. On first read the object is downloaded to the
+            local cache (or only the accessed blocks, if the cache has a block_size), and it is served locally as long
+            as its checksum is unchanged. Branch reads which are not pre-signed are revalidated using a conditional GET
+            (If-None-Match), so an unchanged object costs a single request and no data transfer.
+        :param newline: (Optional) In text mode, controls how line endings are recognized and translated, as in the
+            built-in open() function. Text is decoded incrementally, so multi-byte characters may span reads.
         :return: A Reader object
         """
-        return ObjectReader(self, mode=mode, pre_sign=pre_sign, client=self._client)
+        return ObjectReader(self, mode=mode, pre_sign=pre_sign, client=self._client, block_size=block_size,
+                            max_blocks=max_blocks, read_ahead=read_ahead, cache=cache, newline=newline)
+
+    def read_ranges(self, ranges: Iterable[tuple[int, int]], pre_sign: Optional[bool] = None,
+                    max_gap: int = _READ_RANGES_MAX_GAP, max_workers: Optional[int] = None) -> list[memoryview]:
+        """
+        Read multiple byte ranges of the object using concurrent requests.
+        Nearby ranges are merged into a single request, which makes this method suitable for columnar file formats
+        which read a footer followed by many small column chunks.
+
+        Usage Example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            obj = lakefs.repository("<repository_name>").branch("<branch_name>").object("data.parquet")
+            footer, chunk1, chunk2 = obj.read_ranges([(1000, 64), (0, 100), (200, 50)])
+
+        :param ranges: An iterable of (offset, length) tuples
+        :param pre_sign: (Optional), enforce the pre_sign mode on the lakeFS server. If not set, will probe server for
+            information.
+        :param max_gap: Ranges separated by at most this many bytes are fetched using a single request
+        :param max_workers: (Optional) Max number of concurrent requests, defaults to the client's connection pool size
+        :return: A memoryview with the data of each range, in the order of the given ranges
+        :raise ValueError: if a range is invalid
+        :raise ObjectNotFoundException: if repository id, reference id or object path does not exist
+        :raise PermissionException: if user is not authorized to perform this operation, or operation is forbidden
+        :raise ServerException: for any other errors
+        """
+        with self.reader(mode='rb', pre_sign=pre_sign) as reader:
+            return reader.read_ranges(ranges, max_gap=max_gap, max_workers=max_workers)
+
+    def mmap(self, cache: Optional[ObjectCache] = None, pre_sign: Optional[bool] = None) -> mmap.mmap:
+        """
+        Memory map the object's content from the local cache. Blocks missing from the cache are fetched first, so that
+        the mapped file is complete.
+
+        Usage Example:
+
+        .. code-block:: python
+
+            import lakefs
+            from lakefs.cache import ObjectCache
+
+            obj = lakefs.repository("<repository_name>").ref("<commit_id>").object("video.mp4")
+            with obj.mmap(ObjectCache(block_size=8 * 1024 * 1024)) as m:
+                header = m[:1024]
+
+        :param cache: (Optional) The ObjectCache to materialize the object in, defaults to an ObjectCache in the
+            default cache directory
+        :param pre_sign: (Optional), enforce the pre_sign mode on the lakeFS server. If not set, will probe server for
+            information.
+        :return: A read only memory map of the object's content
+        :raise ValueError: if the object is empty
+        :raise OSError: if the object could not be cached
+        :raise ObjectNotFoundException: if repository id, reference id or object path does not exist
+        :raise PermissionException: if user is not authorized to perform this operation, or operation is forbidden
+        :raise ServerException: for any other errors
+        """
+        with self.reader(mode='rb', pre_sign=pre_sign, cache=cache or ObjectCache()) as reader:
+            cached = reader._cached_object()  # pylint: disable=protected-access
+            if isinstance(cached, SparseCachedObject):
+                try:
+                    cached.fill()
+                except _DiscardEntry:
+                    cached = None
+            if cached is None or cached.discarded:
+                raise OSError(f"object {self!r} could not be cached")
+            if os.fstat(cached.fileno()).st_size == 0:
+                raise ValueError("cannot mmap an empty object")
+            # The mapping remains valid after the cache entry is closed
+            return mmap.mmap(cached.fileno(), 0, access=mmap.ACCESS_READ)
 
     def stat(self) -> ObjectInfo:
         """
@@ -680,8 +1753,11 @@ class StoredObject(_BaseLakeFSObject):
         """
         if self._stats is None:
             with api_exception_handler(_io_exception_handler):
-                stat = self._client.sdk_client.objects_api.stat_object(self._repo_id, self._ref_id, self._path)
-                self._stats = ObjectInfo(**stat.dict())
+                stat_object = self._client.sdk_client.objects_api.stat_object
+                if self._client.config.trusted_decoding:
+                    self._stats = ObjectInfo(**_call_raw(stat_object, self._repo_id, self._ref_id, self._path))
+                else:
+                    self._stats = ObjectInfo(**stat_object(self._repo_id, self._ref_id, self._path).dict())
         return self._stats
 
     def exists(self) -> bool:
@@ -773,6 +1849,44 @@ class WriteableObject(StoredObject):
 
         return self
 
+    def upload_file(self,
+                    path: str | os.PathLike,
+                    mode: WriteModes = 'wb',
+                    pre_sign: Optional[bool] = None,
+                    content_type: Optional[str] = None,
+                    metadata: Optional[dict[str, str]] = None) -> WriteableObject:
+        """
+        Upload a local file as a new object or overwrite an existing object.
+        The request body is read directly from the file, without an intermediate buffer. In pre_sign mode, large files
+        are uploaded using a parallel multipart upload if the server supports it.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            obj = lakefs.repository("<repository_name>").branch("<branch_name>").object("checkpoints/model.pt")
+            obj.upload_file("/tmp/model.pt")
+
+        :param path: The local file to upload
+        :param mode: Write mode - as supported by WriteModes
+        :param pre_sign: (Optional) Explicitly state whether to use pre_sign mode when uploading the object.
+            If None, will be taken from pre_sign property.
+        :param content_type: (Optional) Explicitly set the object Content-Type
+        :param metadata: (Optional) User metadata
+        :return: The Stat object representing the newly created object
+        :raise FileNotFoundError: if the local file does not exist
+        :raise ObjectExistsException: if object exists and mode is exclusive ('x')
+        :raise ObjectNotFoundException: if repo id, reference id or object path does not exist
+        :raise PermissionException: if user is not authorized to perform this operation, or operation is forbidden
+        :raise ServerException: for any other errors
+        """
+        with open(path, "rb") as source:
+            ObjectWriter(self, mode, pre_sign, content_type, metadata, self._client, source=source).close()
+
+        return self
+
     def delete(self) -> None:
         """
         Delete object from lakeFS
@@ -789,7 +1903,9 @@ class WriteableObject(StoredObject):
                mode: WriteModes = 'wb',
                pre_sign: Optional[bool] = None,
                content_type: Optional[str] = None,
-               metadata: Optional[dict[str, str]] = None) -> ObjectWriter:
+               metadata: Optional[dict[str, str]] = None,
+               *,
+               streaming: bool = False) -> ObjectWriter:
         """
         Context manager which provide a file-descriptor like object that allow writing the given object to lakeFS
         The writes are saved in a buffer as long as the writer is open. Only when it closes it writes the data into
@@ -812,6 +1928,10 @@ class WriteableObject(StoredObject):
             information.
         :param content_type: (Optional) Specify the data media type
         :param metadata: (Optional) User defined metadata to save on the object
+        :param streaming: Upload the data as it is written, using bounded memory and no local disk. In pre_sign mode
+            the data is uploaded directly to the object store as a multipart upload, if the server supports it.
+            Otherwise it is sent to lakeFS as a chunked request, so content_type and metadata must be set before the
+            first write.
         :return: A Writer object
         """
         return ObjectWriter(self,
@@ -819,7 +1939,8 @@ class WriteableObject(StoredObject):
                             pre_sign=pre_sign,
                             content_type=content_type,
                             metadata=metadata,
-                            client=self._client)
+                            client=self._client,
+                            streaming=streaming)
 
 
 def _io_exception_handler(e: LakeFSException):
@@ -828,3 +1949,12 @@ def _io_exception_handler(e: LakeFSException):
     if isinstance(e, (NotAuthorizedException, ForbiddenException)):
         return PermissionException(e.status_code, e.reason)
     return e
+
+
+def _discard_response(resp: HTTPResponse) -> None:
+    """
+    Release a response whose body will not be read to the end. Its connection is closed rather than drained, as the
+    remaining body may be a whole object, and the pool reconnects it on next use.
+    """
+    resp.close()
+    resp.release_conn()
@@ -4,14 +4,45 @@ Module containing lakeFS reference implementation
 
 from __future__ import annotations
 
-from typing import Optional, Generator, Union
+import collections
+import functools
+import itertools
+import json
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Generator, Iterable, List, Union
 
 import lakefs_sdk
 
-from lakefs.models import Commit, Change, CommonPrefix, ObjectInfo, _OBJECT
-from lakefs.client import Client, _BaseLakeFSObject
+from lakefs.models import Commit, Change, ChangeStats, CommonPrefix, DiffSummary, ObjectInfo, PrefixUsage, _OBJECT
+from lakefs.client import Client, _BaseLakeFSObject, _call_raw
 from lakefs.exceptions import api_exception_handler
 from lakefs.object import StoredObject
+from lakefs.cache import _DEFAULT_CACHE_DIR, _hash_key, _is_commit_id
+from lakefs.index import ObjectIndex, _glob_level_regex, _glob_regex, _index_path, _literal_head
+
+if TYPE_CHECKING:
+    import pyarrow
+
+_LISTING_MIN_PAGE_SIZE = 100  # The server default page size
+_LISTING_MAX_PAGE_SIZE = 1000  # The maximal page size accepted by the server
+# _PARALLEL_LISTING_MAX_DEPTH - Maximal number of prefix levels to descend when discovering listing partitions.
+_PARALLEL_LISTING_MAX_DEPTH = 3
+# _PARALLEL_LISTING_DISCOVERY_LIMIT - A prefix with more entries than this is listed as a single partition.
+_PARALLEL_LISTING_DISCOVERY_LIMIT = 10000
+# _PARALLEL_LISTING_BUFFERED_PAGES - Maximal number of unconsumed pages buffered per partition.
+_PARALLEL_LISTING_BUFFERED_PAGES = 4
+_PARALLEL_LISTING_POLL_INTERVAL = 0.1
+# _TABLE_BATCH_ROWS - Number of listed rows converted to a columnar record batch at a time.
+_TABLE_BATCH_ROWS = 65536
+_TABLE_COLUMNS = ("path", "physical_address", "checksum", "size_bytes", "mtime", "content_type")
 
 
 class Reference(_BaseLakeFSObject):
@@ -75,16 +106,321 @@ class Reference(_BaseLakeFSObject):
         :raise ServerException: for any other errors
         """
 
-        for res in generate_listing(self._client.sdk_client.objects_api.list_objects,
-                                    repository=self._repo_id,
-                                    ref=self._id,
-                                    max_amount=max_amount,
-                                    after=after,
-                                    prefix=prefix,
-                                    delimiter=delimiter,
-                                    **kwargs):
-            type_class = ObjectInfo if res.path_type == _OBJECT else CommonPrefix
-            yield type_class(**res.dict())
+        if not kwargs and _is_commit_id(self._id):
+            path = _index_path(None, self._repo_id, self._id)
+            index = None
+            if path.exists():
+                try:
+                    index = ObjectIndex(path)
+                except (sqlite3.DatabaseError, ValueError):
+                    pass  # A corrupt or incompatible index is not used, the server is listed instead
+            if index is not None:
+                with index:
+                    # The index is used only if it holds everything the listing would return
+                    if index.user_metadata:
+                        yield from index.objects(prefix, delimiter, after, max_amount)
+                        return
+
+        for res in _generate_records(self._client, self._client.sdk_client.objects_api.list_objects,
+                                     repository=self._repo_id,
+                                     ref=self._id,
+                                     max_amount=max_amount,
+                                     after=after,
+                                     prefix=prefix,
+                                     delimiter=delimiter,
+                                     **kwargs):
+            type_class = ObjectInfo if res["path_type"] == _OBJECT else CommonPrefix
+            yield type_class(**res)
+
+    def objects_parallel(self,
+                         prefix: str = "",
+                         ordered: bool = True,
+                         max_workers: Optional[int] = None) -> Generator[ObjectInfo]:
+        """
+        Returns a generator of all objects under a prefix, listed concurrently.
+        The key space is partitioned by discovering sub-prefixes using the '/' delimiter, descending a few levels
+        until there are enough partitions to keep all workers busy. The partitions are then listed concurrently.
+        Prefixes with too many direct entries to partition are listed as a single partition.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            ref = lakefs.repository("<repository_name>").ref("<ref_id>")
+            total_size = sum(obj.size_bytes for obj in ref.objects_parallel(prefix="datasets/", ordered=False))
+
+        :param prefix: Return objects prefixed with this value
+        :param ordered: Yield objects in lexicographic order, same as objects(). If False, objects are yielded as soon
+            as they are listed, which is faster.
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :raise NotFoundException: if this reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        workers = max(1, max_workers or self._client.config.connection_pool_maxsize)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            plan = self._listing_partitions(prefix, workers, executor)
+        yield from _generate_partitioned(plan, lambda partition: self.objects(prefix=partition), ordered, workers)
+
+    def _listing_partitions(self, prefix: str, workers: int, executor: ThreadPoolExecutor) -> List[str | ObjectInfo]:
+        """
+        Split the key space under prefix into partitions.
+
+        :return: The objects directly under the discovered prefixes and the partition prefixes, in lexicographic order
+        """
+
+        def expand(partition: str) -> Optional[List[str | ObjectInfo]]:
+            entries = list(self.objects(prefix=partition, delimiter="/",
+                                        max_amount=_PARALLEL_LISTING_DISCOVERY_LIMIT + 1))
+            if len(entries) > _PARALLEL_LISTING_DISCOVERY_LIMIT:
+                return None
+            return [entry.path if isinstance(entry, CommonPrefix) else entry for entry in entries]
+
+        plan = [prefix]
+        unsplittable = set()
+        for _ in range(_PARALLEL_LISTING_MAX_DEPTH):
+            if sum(isinstance(entry, str) for entry in plan) >= workers:
+                break
+            splittable = [entry for entry in plan if isinstance(entry, str) and entry not in unsplittable]
+            if not splittable:
+                break
+            expanded = dict(zip(splittable, executor.map(expand, splittable)))
+            next_plan = []
+            for entry in plan:
+                sub = expanded.get(entry) if isinstance(entry, str) else None
+                if sub is not None:
+                    next_plan.extend(sub)
+                    continue
+                if isinstance(entry, str):
+                    unsplittable.add(entry)
+                next_plan.append(entry)
+            plan = next_plan
+        return plan
+
+    def glob(self,
+             pattern: str,
+             ordered: bool = True,
+             max_workers: Optional[int] = None) -> Generator[ObjectInfo]:
+        """
+        Returns a generator of the objects whose path matches a glob pattern.
+        The pattern is matched one '/' separated level at a time: '*' matches any characters except '/', '?' matches
+        a single character except '/', '[...]' matches a character class, and a '**' level matches any number of
+        levels. Literal levels and the literal prefix of each pattern level are pushed down to the server as listing
+        prefixes, and directory levels which do not match are pruned using delimiter listings, so only matching
+        directories are listed. Directories of the same level are listed concurrently.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            ref = lakefs.repository("<repository_name>").ref("<ref_id>")
+            for obj in ref.glob("logs/2024-*/part-*.parquet"):
+                print(obj.path)
+
+        :param pattern: The glob pattern
+        :param ordered: Yield objects in lexicographic order. If False, objects are yielded as soon as they are listed,
+            which is faster.
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :raise NotFoundException: if this reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        workers = max(1, max_workers or self._client.config.connection_pool_maxsize)
+        levels = pattern.split("/")
+        regex = _glob_regex(levels)
+        frontier = [""]
+        i = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while i < len(levels) - 1 and levels[i] != "**":
+                level = levels[i]
+                i += 1
+                if _literal_head(level) == level:
+                    frontier = [p + level + "/" for p in frontier]
+                    continue
+
+                level_regex = re.compile(_glob_level_regex(level))
+
+                def matching_dirs(parent: str, level: str = level, level_regex: re.Pattern = level_regex) -> List[str]:
+                    entries = self.objects(prefix=parent + _literal_head(level), delimiter="/")
+                    return [entry.path for entry in entries
+                            if isinstance(entry, CommonPrefix) and level_regex.fullmatch(entry.path[len(parent):-1])]
+
+                frontier = [path for paths in executor.map(matching_dirs, frontier) for path in paths]
+
+        recursive = levels[i] == "**"
+        head = "" if recursive else _literal_head(levels[i])
+
+        def list_matches(parent: str) -> Generator[ObjectInfo]:
+            for entry in self.objects(prefix=parent + head, delimiter=None if recursive else "/"):
+                if isinstance(entry, ObjectInfo) and regex.fullmatch(entry.path):
+                    yield entry
+
+        yield from _generate_partitioned(frontier, list_matches, ordered, workers)
+
+    def objects_table(self,
+                      prefix: Optional[str] = None,
+                      max_amount: Optional[int] = None,
+                      columns: Iterable[str] = ("path", "size_bytes", "mtime", "checksum")) -> pyarrow.Table:
+        """
+        Returns the objects of this reference as a pyarrow Table, with a row per object.
+        Listing pages are decoded straight into columns, without constructing a model per object, so very large
+        listings can be filtered and aggregated using vectorized operations. Requires the pyarrow package.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import pyarrow.compute as pc
+            import lakefs
+
+            ref = lakefs.repository("<repository_name>").ref("<ref_id>")
+            table = ref.objects_table(prefix="datasets/")
+            large = table.filter(pc.greater(table["size_bytes"], 1024 * 1024))
+            print(pc.sum(table["size_bytes"]))
+
+        :param prefix: Return objects prefixed with this value
+        :param max_amount: Stop listing after this amount of objects
+        :param columns: The columns of the table, any of: path, physical_address, checksum, size_bytes, mtime
+            (a timestamp with seconds precision) and content_type
+        :raise ValueError: if an unknown column is requested
+        :raise ImportError: if pyarrow is not installed
+        :raise NotFoundException: if this reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel, import-error
+
+        columns = list(columns)
+        unknown = set(columns) - set(_TABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown columns: {sorted(unknown)}. Available columns: {_TABLE_COLUMNS}")
+        types = {"size_bytes": pa.int64(), "mtime": pa.timestamp("s")}
+        schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+        batches = []
+        values = {column: [] for column in columns}
+        rows = 0
+        for res in generate_listing(functools.partial(_raw_page, self._client.sdk_client.objects_api.list_objects),
+                                    self._repo_id, self._id, max_amount=max_amount, prefix=prefix):
+            for column, column_values in values.items():
+                column_values.append(res.get(column))
+            rows += 1
+            if rows == _TABLE_BATCH_ROWS:
+                batches.append(pa.record_batch(list(values.values()), schema=schema))
+                values = {column: [] for column in columns}
+                rows = 0
+        batches.append(pa.record_batch(list(values.values()), schema=schema))
+        return pa.Table.from_batches(batches, schema=schema)
+
+    def index(self,
+              user_metadata: bool = False,
+              directory: Optional[Union[str, os.PathLike]] = None) -> ObjectIndex:
+        """
+        Returns a local index of all the objects of the commit this reference points to.
+        The index is built by listing the commit once, and is cached by commit ID, so later calls for the same commit -
+        from any process - open it without calling the lakeFS server. Once an index with user metadata exists in the
+        default directory, objects() on the commit ID uses it instead of listing the server.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            branch = lakefs.repository("<repository_name>").branch("<branch_name>")
+            with branch.index() as index:  # Index of the current head commit
+                total_size = sum(obj.size_bytes for obj in index.objects(prefix="datasets/"))
+
+        :param user_metadata: Include the objects user metadata in the index
+        :param directory: (Optional) The cache directory, defaults to $XDG_CACHE_HOME/lakefs (or ~/.cache/lakefs)
+        :return: The commit index, which should be closed after use
+        :raise NotFoundException: if this reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        commit_id = self._id if _is_commit_id(self._id) else self.get_commit().id
+        path = _index_path(directory, self._repo_id, commit_id)
+        if path.exists():
+            index = ObjectIndex(path)
+            if index.user_metadata or not user_metadata:
+                return index
+            index.close()  # Rebuild with user metadata
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        records = _generate_records(self._client, self._client.sdk_client.objects_api.list_objects,
+                                    repository=self._repo_id, ref=commit_id, user_metadata=user_metadata)
+        return ObjectIndex.build(path, records, user_metadata)
+
+    def usage(self,
+              prefix: str = "",
+              depth: int = 1,
+              max_workers: Optional[int] = None,
+              directory: Optional[Union[str, os.PathLike]] = None) -> Dict[str, PrefixUsage]:
+        """
+        Returns the number and total size of the objects under prefix, and under each of its sub-prefixes up to depth
+        levels deep (similar to du).
+        Objects are listed concurrently (see objects_parallel) and counted once at the deepest level, which is then
+        rolled up to the higher levels. Results for full commit IDs are cached, since commits are immutable.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            branch = lakefs.repository("<repository_name>").branch("<branch_name>")
+            for prefix, usage in sorted(branch.usage(prefix="datasets/", depth=2).items()):
+                print(f"{usage.size_bytes:>16} {usage.count:>10} {prefix}")
+
+        :param prefix: Compute the usage of objects prefixed with this value
+        :param depth: Number of sub-prefix levels (split by '/') to report under prefix
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :param directory: (Optional) The cache directory, defaults to $XDG_CACHE_HOME/lakefs (or ~/.cache/lakefs)
+        :return: The usage by prefix. Includes prefix itself, with the total usage
+        :raise ValueError: if depth is negative
+        :raise NotFoundException: if this reference does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        if depth < 0:
+            raise ValueError("depth must be a non-negative integer")
+        if _is_commit_id(self._id):
+            leaves = self._commit_usage(self._id, prefix, depth, max_workers, directory)
+        else:
+            leaves = _scan_usage(self, prefix, depth, max_workers)
+        return _rollup_usage(leaves, prefix)
+
+    def _commit_usage(self, commit_id: str, prefix: str, depth: int, max_workers: Optional[int],
+                      directory: Optional[Union[str, os.PathLike]]) -> Dict[str, List[int]]:
+        """
+        Returns the usage of a commit by its deepest prefixes, cached by commit ID
+        """
+        path = Path(directory if directory is not None else _DEFAULT_CACHE_DIR) / "usage" / self._repo_id / \
+            f"{_hash_key(commit_id, prefix, str(depth))}.json"
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+
+        leaves = _scan_usage(Reference(self._repo_id, commit_id, client=self._client), prefix, depth, max_workers)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(leaves, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return leaves
 
     def log(self, max_amount: Optional[int] = None, **kwargs) -> Generator[Commit]:
         """
@@ -96,9 +432,9 @@ class Reference(_BaseLakeFSObject):
         :raise NotAuthorizedException: if user is not authorized to perform this operation
         :raise ServerException: for any other errors
         """
-        for res in generate_listing(self._client.sdk_client.refs_api.log_commits, self._repo_id, self._id,
-                                    max_amount=max_amount, **kwargs):
-            yield Commit(**res.dict())
+        for res in _generate_records(self._client, self._client.sdk_client.refs_api.log_commits, self._repo_id,
+                                     self._id, max_amount=max_amount, **kwargs):
+            yield Commit(**res)
 
     def get_commit(self) -> Commit:
         """
@@ -135,16 +471,75 @@ class Reference(_BaseLakeFSObject):
         :raise ServerException: for any other errors
         """
         other_ref_id = other_ref if isinstance(other_ref, str) else other_ref.id
-        for diff in generate_listing(self._client.sdk_client.refs_api.diff_refs,
-                                     repository=self._repo_id,
-                                     left_ref=self._id,
-                                     right_ref=other_ref_id,
-                                     after=after,
-                                     max_amount=max_amount,
-                                     prefix=prefix,
-                                     delimiter=delimiter,
-                                     **kwargs):
-            yield Change(**diff.dict())
+        for diff in _generate_records(self._client, self._client.sdk_client.refs_api.diff_refs,
+                                      repository=self._repo_id,
+                                      left_ref=self._id,
+                                      right_ref=other_ref_id,
+                                      after=after,
+                                      max_amount=max_amount,
+                                      prefix=prefix,
+                                      delimiter=delimiter,
+                                      **kwargs):
+            yield Change(**diff)
+
+    def diff_parallel(self,
+                      other_ref: ReferenceType,
+                      prefix: str = "",
+                      ordered: bool = True,
+                      max_workers: Optional[int] = None) -> Generator[Change]:
+        """
+        Returns a generator of all changes between this reference and other_ref, listed concurrently.
+        The diff is sharded by the common prefixes directly under prefix (using the '/' delimiter), and the shards
+        are listed concurrently.
+
+        :param other_ref: The other ref to diff against
+        :param prefix: Return changes prefixed with this value
+        :param ordered: Yield changes in lexicographic order, same as diff(). If False, changes are yielded as soon as
+            they are listed, which is faster.
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :raise NotFoundException: if this reference or other_ref does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        other_ref_id = other_ref if isinstance(other_ref, str) else other_ref.id
+        yield from _diff_parallel(self._client, self._client.sdk_client.refs_api.diff_refs, prefix, ordered,
+                                  max_workers, repository=self._repo_id, left_ref=self._id, right_ref=other_ref_id)
+
+    def diff_summary(self,
+                     other_ref: ReferenceType,
+                     prefix: str = "",
+                     max_workers: Optional[int] = None) -> DiffSummary:
+        """
+        Returns the number and total size of changes between this reference and other_ref, in total, by change type
+        and by the common prefixes directly under prefix.
+        Changes are aggregated as they are listed, without constructing a Change per changed object, and the prefixes
+        are listed concurrently.
+
+        Usage example:
+
+        .. code-block:: python
+
+            import lakefs
+
+            repo = lakefs.repository("<repository_name>")
+            summary = repo.branch("<branch_name>").diff_summary("main", prefix="datasets/")
+            print(summary.types["added"].count, summary.total.size_bytes)
+            for prefix, types in summary.prefixes.items():
+                print(prefix, {change_type: stats.count for change_type, stats in types.items()})
+
+        :param other_ref: The other ref to diff against
+        :param prefix: Summarize changes prefixed with this value
+        :param max_workers: (Optional) Maximal number of concurrent listings, defaults to the client connection pool
+            size
+        :return: The diff summary. Changes directly under prefix are summarized under prefix itself
+        :raise NotFoundException: if this reference or other_ref does not exist
+        :raise NotAuthorizedException: if user is not authorized to perform this operation
+        :raise ServerException: for any other errors
+        """
+        other_ref_id = other_ref if isinstance(other_ref, str) else other_ref.id
+        return _diff_summary(self._client, self._client.sdk_client.refs_api.diff_refs, prefix, max_workers,
+                             repository=self._repo_id, left_ref=self._id, right_ref=other_ref_id)
 
     def merge_into(self, destination_branch: ReferenceType, **kwargs) -> str:
         """
@@ -181,7 +576,10 @@ class Reference(_BaseLakeFSObject):
 
 def generate_listing(func, *args, max_amount: Optional[int] = None, **kwargs):
     """
-    Generic generator function, for lakefs-sdk listings functionality
+    Generic generator function, for lakefs-sdk listings functionality.
+    The next page is fetched in the background while the current page is consumed. Unless an explicit amount is
+    given, the page size starts at the server default and doubles on every page up to the API maximum, capped by the
+    remaining max_amount.
 
     :param func: The listing function
     :param args: The function args
@@ -189,19 +587,281 @@ def generate_listing(func, *args, max_amount: Optional[int] = None, **kwargs):
     :param kwargs: The function kwargs
     :return: A generator based on the listing function
     """
-    has_more = True
-    with api_exception_handler():
-        while has_more:
-            page = func(*args, **kwargs)
-            has_more = page.pagination.has_more
-            kwargs["after"] = page.pagination.next_offset
-            for res in page.results:
-                yield res
-
-                if max_amount is not None:
-                    max_amount -= 1
-                    if max_amount <= 0:
+    adaptive = kwargs.get("amount") is None
+    amount = _LISTING_MIN_PAGE_SIZE if adaptive else kwargs["amount"]
+
+    def fetch(after, page_size):
+        with api_exception_handler():
+            return func(*args, **{**kwargs, "after": after, "amount": page_size})
+
+    def page_size():
+        return amount if max_amount is None else max(1, min(amount, max_amount))
+
+    executor = None
+    pending = None
+    try:
+        page = fetch(kwargs.get("after"), page_size())
+        while True:
+            results = page.results
+            if max_amount is not None:
+                results = results[:max_amount]
+                max_amount -= len(results)
+            if adaptive:
+                amount = min(amount * 2, _LISTING_MAX_PAGE_SIZE)
+            if page.pagination.has_more and (max_amount is None or max_amount > 0):
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=1)
+                pending = executor.submit(fetch, page.pagination.next_offset, page_size())
+
+            yield from results
+            if pending is None:
+                return
+            page, pending = pending.result(), None
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _raw_page(func, *args, **kwargs) -> SimpleNamespace:
+    """
+    Call a lakefs-sdk listing function and decode the page JSON as is, without constructing and validating models
+
+    :param func: The listing function
+    :param args: The function args
+    :param kwargs: The function kwargs
+    :return: The page, with results as dicts
+    """
+    page = _call_raw(func, *args, **kwargs)
+    return SimpleNamespace(results=page["results"], pagination=SimpleNamespace(**page["pagination"]))
+
+
+def _generate_records(client: Client, func, *args, **kwargs) -> Generator[dict]:
+    """
+    Same as generate_listing, but yields the results as dicts.
+    If the client is configured for trusted decoding, pages are decoded as is, without model validation.
+
+    :param client: The client used for the listing
+    :param func: The listing function
+    :param args: The function args
+    :param kwargs: The function kwargs
+    """
+    if client.config.trusted_decoding:
+        yield from generate_listing(functools.partial(_raw_page, func), *args, **kwargs)
+    else:
+        for res in generate_listing(func, *args, **kwargs):
+            yield res.dict()
+
+
+def _usage_key(path: str, prefix: str, depth: int) -> str:
+    """
+    Returns the deepest prefix, up to depth levels under prefix, which contains path
+    """
+    end = len(prefix)
+    for _ in range(depth):
+        i = path.find("/", end)
+        if i < 0:
+            break
+        end = i + 1
+    return path[:end]
+
+
+def _scan_usage(ref: Reference, prefix: str, depth: int, max_workers: Optional[int]) -> Dict[str, List[int]]:
+    """
+    Returns the [count, size_bytes] of the objects of ref by their deepest prefix
+    """
+    leaves = {}
+    for obj in ref.objects_parallel(prefix=prefix, ordered=False, max_workers=max_workers):
+        usage = leaves.get(key := _usage_key(obj.path, prefix, depth))
+        if usage is None:
+            usage = leaves[key] = [0, 0]
+        usage[0] += 1
+        usage[1] += obj.size_bytes or 0
+    return leaves
+
+
+def _rollup_usage(leaves: Dict[str, List[int]], prefix: str) -> Dict[str, PrefixUsage]:
+    """
+    Add the usage of the deepest prefixes to all of their parent prefixes, up to prefix
+    """
+    totals = {prefix: [0, 0]}
+    for key, (count, size_bytes) in leaves.items():
+        end = len(key)
+        while end >= len(prefix):
+            total = totals.setdefault(key[:end], [0, 0])
+            total[0] += count
+            total[1] += size_bytes
+            if end == len(prefix):
+                break
+            end = key.rfind("/", len(prefix), end - 1) + 1 or len(prefix)
+    return {key: PrefixUsage(count=count, size_bytes=size_bytes) for key, (count, size_bytes) in totals.items()}
+
+
+def _diff_plan(client: Client, func, prefix: str, **kwargs) -> List[str | dict]:
+    """
+    Split a diff into shards by the common prefixes directly under prefix.
+
+    :return: The changes directly under prefix (as dicts) and the shard prefixes, in lexicographic order
+    """
+    records = list(_generate_records(client, func, prefix=prefix, delimiter="/",
+                                     max_amount=_PARALLEL_LISTING_DISCOVERY_LIMIT + 1, **kwargs))
+    if len(records) > _PARALLEL_LISTING_DISCOVERY_LIMIT:
+        return [prefix]
+    return [r["path"] if r["path_type"] != _OBJECT else r for r in records]
+
+
+def _diff_parallel(client: Client, func, prefix: str, ordered: bool, max_workers: Optional[int],
+                   **kwargs) -> Generator[Change]:
+    """
+    Generate the changes of a diff, listing its shards concurrently
+
+    :param client: The client used for the listing
+    :param func: The diff listing function
+    :param prefix: Return changes prefixed with this value
+    :param ordered: Yield changes in lexicographic order
+    :param max_workers: (Optional) Maximal number of concurrent listings
+    :param kwargs: The diff function kwargs
+    """
+    workers = max(1, max_workers or client.config.connection_pool_maxsize)
+    plan = [entry if isinstance(entry, str) else Change(**entry)
+            for entry in _diff_plan(client, func, prefix, **kwargs)]
+
+    def list_shard(shard: str) -> Generator[Change]:
+        for diff in _generate_records(client, func, prefix=shard, **kwargs):
+            yield Change(**diff)
+
+    yield from _generate_partitioned(plan, list_shard, ordered, workers)
+
+
+def _diff_summary(client: Client, func, prefix: str, max_workers: Optional[int], **kwargs) -> DiffSummary:
+    """
+    Summarize the changes of a diff, listing its shards concurrently
+
+    :param client: The client used for the listing
+    :param func: The diff listing function
+    :param prefix: Summarize changes prefixed with this value
+    :param max_workers: (Optional) Maximal number of concurrent listings
+    :param kwargs: The diff function kwargs
+    """
+
+    def summarize(records: Iterable[dict]) -> dict[str, list[int]]:
+        types = {}
+        for record in records:
+            stats = types.get(record["type"])
+            if stats is None:
+                stats = types[record["type"]] = [0, 0]
+            stats[0] += 1
+            stats[1] += record.get("size_bytes") or 0
+        return types
+
+    plan = _diff_plan(client, func, prefix, **kwargs)
+    shards = [entry for entry in plan if isinstance(entry, str)]
+    prefixes = {}
+    direct = summarize(entry for entry in plan if not isinstance(entry, str))
+    if direct:
+        prefixes[prefix] = direct
+    workers = max(1, max_workers or client.config.connection_pool_maxsize)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(shards)))) as executor:
+        summaries = executor.map(lambda shard: summarize(_generate_records(client, func, prefix=shard, **kwargs)),
+                                 shards)
+        for shard, types in zip(shards, summaries):
+            if types:
+                prefixes[shard] = types
+
+    totals = {}
+    for types in prefixes.values():
+        for change_type, (count, size_bytes) in types.items():
+            total = totals.setdefault(change_type, [0, 0])
+            total[0] += count
+            total[1] += size_bytes
+    return DiffSummary(total=ChangeStats(count=sum(t[0] for t in totals.values()),
+                                         size_bytes=sum(t[1] for t in totals.values())),
+                       types={t: ChangeStats(count=c, size_bytes=b) for t, (c, b) in totals.items()},
+                       prefixes={p: {t: ChangeStats(count=c, size_bytes=b) for t, (c, b) in types.items()}
+                                 for p, types in prefixes.items()})
+
+
+def _generate_partitioned(plan: List, list_partition: Callable[[str], Iterable], ordered: bool,
+                          workers: int) -> Generator:
+    """
+    Generate the results of a listing split into partitions, listing the partitions concurrently.
+
+    :param plan: The listing plan, in order - partition prefixes (str) mixed with items to yield as is
+    :param list_partition: Returns the items of a partition, given its prefix
+    :param ordered: Yield the items in the order of the plan. Otherwise, items are yielded as soon as they are listed
+    :param workers: Maximal number of concurrent partition listings
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    stop = threading.Event()
+    shared = queue.Queue()
+
+    def list_into(partition: str, out: queue.Queue, slots: threading.Semaphore) -> None:
+        batch = []
+        for item in list_partition(partition):
+            batch.append(item)
+            if len(batch) >= _LISTING_MAX_PAGE_SIZE:
+                while not slots.acquire(timeout=_PARALLEL_LISTING_POLL_INTERVAL):
+                    if stop.is_set():
                         return
+                out.put((slots, batch))
+                batch = []
+        out.put((None, batch))
+
+    def start(partition: str) -> queue.Queue:
+        out = queue.Queue() if ordered else shared
+        slots = threading.Semaphore(_PARALLEL_LISTING_BUFFERED_PAGES)
+        future = executor.submit(list_into, partition, out, slots)
+        # The future is the partition's end marker, result() raises the listing error if any
+        future.add_done_callback(out.put)
+        return out
+
+    try:
+        partitions = iter([entry for entry in plan if isinstance(entry, str)])
+        started = collections.deque(start(partition) for partition in itertools.islice(partitions, workers))
+        if ordered:
+            for entry in plan:
+                if not isinstance(entry, str):
+                    yield entry
+                    continue
+                out = started.popleft()
+                partition = next(partitions, None)
+                if partition is not None:
+                    started.append(start(partition))
+                yield from _drain_partition(out)
+        else:
+            yield from (entry for entry in plan if not isinstance(entry, str))
+            pending = len(started)
+            while pending > 0:
+                item = shared.get()
+                if isinstance(item, Future):
+                    item.result()
+                    pending -= 1
+                    partition = next(partitions, None)
+                    if partition is not None:
+                        start(partition)
+                        pending += 1
+                    continue
+                slots, batch = item
+                if slots is not None:
+                    slots.release()
+                yield from batch
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _drain_partition(out: queue.Queue) -> Generator[ObjectInfo]:
+    """
+    Yield the objects of a single partition listing until its end marker
+    """
+    while True:
+        item = out.get()
+        if isinstance(item, Future):
+            item.result()
+            return
+        slots, batch = item
+        if slots is not None:
+            slots.release()
+        yield from batch
 
 
 ReferenceType = Union[str, Reference, Commit]
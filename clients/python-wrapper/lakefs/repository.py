@@ -4,7 +4,8 @@ Module containing lakeFS repository implementation
 
 from __future__ import annotations
 
-from typing import Optional, Generator
+import os
+from typing import Optional, Generator, Union
 
 import lakefs_sdk
 
@@ -12,6 +13,7 @@ from lakefs.models import RepositoryProperties
 from lakefs.tag import Tag
 from lakefs.branch import Branch
 from lakefs.client import Client, _BaseLakeFSObject
+from lakefs.commit_graph import CommitGraph
 from lakefs.exceptions import api_exception_handler, ConflictException, LakeFSException
 from lakefs.reference import Reference, generate_listing
 
@@ -105,6 +107,14 @@ class Repository(_BaseLakeFSObject):
         """
         return Tag(self._id, tag_id, self._client)
 
+    def commit_graph(self, directory: Optional[Union[str, os.PathLike]] = None) -> CommitGraph:
+        """
+        Return the local commit graph cache of this repository, answering ancestry queries and logs locally
+
+        :param directory: (Optional) The cache directory, defaults to ~/.cache/lakefs
+        """
+        return CommitGraph(self._id, self._client, directory=directory)
+
     def branches(self, max_amount: Optional[int] = None,
                  after: Optional[str] = None, prefix: Optional[str] = None, **kwargs) -> Generator[Branch]:
         """
@@ -42,7 +42,8 @@ setup(
     long_description=long_description,
     long_description_content_type='text/markdown',
     extras_require={
-        "all": ["boto3 >= 1.26.0"],
+        "all": ["boto3 >= 1.26.0", "pyarrow >= 14.0.1"],
         "aws-iam": ["boto3 >= 1.26.0"],
+        "arrow": ["pyarrow >= 14.0.1"],
     },
 )
@@ -1,10 +1,17 @@
+import hashlib
 import http
+import io
+import json
+import os
+import urllib.parse
 
 import lakefs_sdk
 import pytest
+import urllib3
 
 import lakefs
 from tests.utests.common import get_test_client, expect_exception_context
+from lakefs.reference import Reference
 from lakefs.repository import Repository
 from lakefs.exceptions import ConflictException
 
@@ -164,3 +171,232 @@ def test_branch_revert(monkeypatch):
             # was called with reference "hello" due to the monkey-patching above
             # always returning "ab1234" as ref ID.
             branch.revert(ref_id, reference_id="hello")
+
+
+def test_branch_upload_many(monkeypatch, tmp_path):
+    branch = get_test_branch()
+    local_path = tmp_path / "local_file"
+    local_path.write_bytes(b"from a file")
+    items = [("a", "text data"), ("b", b"binary data"), ("c", local_path), ("d", io.BytesIO(b"file object")),
+             ("fail", b"x"), ("missing", tmp_path / "missing")]
+    received = {}
+
+    def monkey_request(_, method, url, body=None, **__):
+        assert method == "POST"
+        path = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)["path"][0]
+        if path == "fail":
+            return urllib3.response.HTTPResponse(body=b"", status=http.HTTPStatus.INTERNAL_SERVER_ERROR.value)
+        received[path] = body if isinstance(body, bytes) else body.read()
+        stats = lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address="physical_address",
+                                       checksum="checksum", size_bytes=len(received[path]), mtime=12345)
+        return urllib3.response.HTTPResponse(body=json.dumps(stats.to_dict()).encode(), status=201)
+
+    with monkeypatch.context():
+        monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+        stats = lakefs.TransferStats()
+        results = branch.upload_many(iter(items), pre_sign=False, max_workers=2, stats=stats)
+
+    # Results are returned in the order of the items
+    assert [r.path for r in results] == [path for path, _ in items]
+    assert received == {"a": b"text data", "b": b"binary data", "c": b"from a file", "d": b"file object"}
+    for result in results[:4]:
+        assert result.error is None
+        assert result.stats.size_bytes == len(received[result.path])
+    assert isinstance(results[4].error, lakefs.exceptions.ServerException)
+    assert isinstance(results[5].error, FileNotFoundError)
+    assert stats.objects == 4
+    assert stats.errors == 2
+    assert stats.bytes == sum(len(v) for v in received.values())
+
+    with expect_exception_context(ValueError):
+        branch.upload_many(items, mode="r")
+
+
+def test_branch_upload_many_errors(monkeypatch):
+    branch = get_test_branch()
+    items = [("a", b"a"), ("denied", b"denied"), ("unreachable", b"unreachable"), ("b", b"b")]
+    conf = lakefs_sdk.Config(version_config=lakefs_sdk.VersionConfig(), storage_config=lakefs_sdk.StorageConfig(
+        blockstore_type="s3", blockstore_namespace_example="", blockstore_namespace_ValidityRegex="",
+        pre_sign_support=True, pre_sign_support_ui=False, import_support=False, import_validity_regex=""))
+
+    def monkey_get_physical_address(_, __, ___, path, *____, **_____):
+        if path == "denied":
+            raise lakefs_sdk.ApiException(status=http.HTTPStatus.FORBIDDEN.value, reason="Forbidden")
+        return lakefs_sdk.StagingLocation(physical_address=path, presigned_url=f"https://storage/{path}")
+
+    def monkey_request(_, method, url, **__):
+        if "unreachable" in url:
+            raise urllib3.exceptions.MaxRetryError(None, url)
+        if method == "PUT":
+            return urllib3.response.HTTPResponse(status=200, headers={"ETag": "etag"})
+        path = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)["path"][0]
+        stats = lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address=path, checksum="etag",
+                                       size_bytes=1, mtime=12345)
+        return urllib3.response.HTTPResponse(body=json.dumps(stats.to_dict()).encode(), status=201)
+
+    def monkey_link_physical_address(_, __, ___, path, staging_metadata, **____):
+        return lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address=path, checksum="etag",
+                                      size_bytes=staging_metadata.size_bytes, mtime=12345)
+
+    with monkeypatch.context():
+        monkeypatch.setattr(branch._client, "_server_conf", conf)
+        monkeypatch.setattr(lakefs_sdk.api.StagingApi, "get_physical_address", monkey_get_physical_address)
+        monkeypatch.setattr(lakefs_sdk.api.StagingApi, "link_physical_address", monkey_link_physical_address)
+        monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+        # A failing item does not abort the batch, in both presign and raw mode
+        for pre_sign in (True, False):
+            results = branch.upload_many(items, pre_sign=pre_sign, max_workers=2)
+            assert [r.path for r in results] == [path for path, _ in items]
+            succeeded = ["a", "b"] if pre_sign else ["a", "denied", "b"]
+            assert [r.stats.path for r in results if r.error is None] == succeeded
+            assert isinstance(results[2].error, urllib3.exceptions.HTTPError)
+            if pre_sign:
+                assert isinstance(results[1].error, lakefs.exceptions.ForbiddenException)
+
+
+def test_branch_sync_from(monkeypatch, tmp_path):
+    branch = get_test_branch()
+    files = {"same": b"same data", "changed": b"new data!", "new": b"new", "sub/nested": b"nested",
+             "multipart": b"multipart data"}
+    for name, data in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(data)
+    remote = {
+        "same": hashlib.md5(b"same data").hexdigest(),
+        "changed": hashlib.md5(b"old data!").hexdigest(),
+        "multipart": "0123456789abcdef-2",
+        "gone": hashlib.md5(b"gone").hexdigest(),
+    }
+
+    def monkey_list_objects(*_, prefix=None, **__):
+        # A sibling prefix shares the destination prefix as a string
+        paths = [f"data/{name}" for name in remote] + ["data_backup/gone"]
+        results = [lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address="address",
+                                          checksum=remote.get(path.split("/", 1)[1], "0" * 32),
+                                          size_bytes=len(files.get(path.split("/", 1)[1], b"gone")),
+                                          mtime=2 ** 40) for path in paths if path.startswith(prefix)]
+        return lakefs_sdk.ObjectStatsList(pagination=lakefs_sdk.Pagination(
+            has_more=False, next_offset="", max_per_page=len(results), results=len(results)), results=results)
+
+    uploads = {}
+
+    def monkey_upload_many(_, items, **__):
+        for path, local_path in items:
+            uploads[path] = local_path.read_bytes()
+        return [lakefs.UploadResult(path=path, stats=None, error=None) for path in uploads]
+
+    deletes = []
+    with monkeypatch.context():
+        monkeypatch.setattr(branch._client.sdk_client.objects_api, "list_objects", monkey_list_objects)
+        monkeypatch.setattr(lakefs.Branch, "upload_many", monkey_upload_many)
+        monkeypatch.setattr(branch._client.sdk_client.objects_api, "delete_objects",
+                            lambda repo, br, path_list: deletes.extend(path_list.paths))
+
+        res = branch.sync_from(tmp_path, prefix="data/")
+        assert uploads == {"data/changed": b"new data!", "data/new": b"new", "data/sub/nested": b"nested"}
+        assert res.skipped == 2
+        assert not res.deleted
+        assert not deletes
+
+        uploads.clear()
+        res = branch.sync_from(tmp_path, prefix="data", delete=True)
+        assert res.deleted == deletes == ["data/gone"]
+
+    with expect_exception_context(NotADirectoryError):
+        branch.sync_from(tmp_path / "same")
+
+
+def test_branch_link_many(monkeypatch):
+    branch = get_test_branch()
+    calls = {}
+
+    def monkey_link_physical_address(repo, br, path, staging_metadata, *_):
+        assert (repo, br) == (branch.repo_id, branch.id)
+        calls[path] = calls.get(path, 0) + 1
+        if path == "throttled" and calls[path] < 3:
+            raise lakefs_sdk.exceptions.ApiException(status=http.HTTPStatus.TOO_MANY_REQUESTS.value)
+        if path == "unavailable":
+            raise lakefs_sdk.exceptions.ApiException(status=http.HTTPStatus.SERVICE_UNAVAILABLE.value)
+        if path == "invalid":
+            raise lakefs_sdk.exceptions.ApiException(status=http.HTTPStatus.BAD_REQUEST.value)
+        return lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address="address", checksum="",
+                                      size_bytes=staging_metadata.size_bytes, mtime=0)
+
+    def staging_metadata(size):
+        return lakefs_sdk.StagingMetadata(staging=lakefs_sdk.StagingLocation(physical_address="address"),
+                                          checksum="checksum", size_bytes=size)
+
+    paths = [f"path-{i}" for i in range(20)] + ["throttled", "unavailable", "invalid"]
+    with monkeypatch.context():
+        monkeypatch.setattr(lakefs.branch, "_LINK_RETRY_BACKOFF", 0)
+        monkeypatch.setattr(branch._client.sdk_client.staging_api, "link_physical_address",
+                            monkey_link_physical_address)
+        stats = lakefs.TransferStats()
+        res = branch.link_many(((path, staging_metadata(10)) for path in paths), max_workers=3, stats=stats)
+
+    assert res.linked == stats.objects == 21
+    assert res.size_bytes == stats.bytes == 210
+    assert set(res.errors) == {"unavailable", "invalid"}
+    assert isinstance(res.errors["invalid"], lakefs.exceptions.BadRequestException)
+    assert calls["throttled"] == 3
+    assert calls["unavailable"] == lakefs.branch._LINK_ATTEMPTS
+    assert calls["invalid"] == 1
+
+
+def test_branch_usage(monkeypatch, tmp_path):
+    branch = get_test_branch()
+    commit_id = "c" * 64
+    committed = {"data/a/1": 10, "data/a/2": 20, "data/b/1": 30, "top": 5}
+    listings = []
+
+    def monkey_list_objects(*_, ref=None, prefix=None, **__):
+        assert ref == commit_id
+        listings.append(prefix)
+        results = [lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address="", checksum="",
+                                          size_bytes=size, mtime=0) for path, size in sorted(committed.items())]
+        return lakefs_sdk.ObjectStatsList(pagination=lakefs_sdk.Pagination(
+            has_more=False, next_offset="", max_per_page=len(results), results=len(results)), results=results)
+
+    def monkey_diff_branch(*_, **__):
+        results = [lakefs_sdk.Diff(type="removed", path="data/a/1", path_type="object"),
+                   lakefs_sdk.Diff(type="changed", path="data/b/1", path_type="object", size_bytes=35),
+                   lakefs_sdk.Diff(type="added", path="data/b/2", path_type="object", size_bytes=7)]
+        return lakefs_sdk.DiffList(pagination=lakefs_sdk.Pagination(
+            has_more=False, next_offset="", max_per_page=len(results), results=len(results)), results=results)
+
+    def monkey_stat_object(repository, ref, path, *_, **__):
+        assert (repository, ref) == (branch.repo_id, commit_id)
+        return lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address="", checksum="",
+                                      size_bytes=committed[path], mtime=0)
+
+    with monkeypatch.context():
+        monkeypatch.setattr(branch._client.sdk_client.objects_api, "list_objects", monkey_list_objects)
+        monkeypatch.setattr(branch._client.sdk_client.objects_api, "stat_object", monkey_stat_object)
+        monkeypatch.setattr(branch._client.sdk_client.branches_api, "diff_branch", monkey_diff_branch)
+        monkeypatch.setattr(branch._client.sdk_client.commits_api, "get_commit",
+                            lambda *_: lakefs_sdk.Commit(id=commit_id, parents=[], committer="", message="",
+                                                         creation_date=0, meta_range_id=""))
+
+        commit = Reference(branch.repo_id, commit_id, client=branch._client)
+        commit_usage = commit.usage(depth=2, max_workers=1, directory=tmp_path)
+        assert {k: (v.count, v.size_bytes) for k, v in commit_usage.items()} == {
+            "": (4, 65), "data/": (3, 60), "data/a/": (2, 30), "data/b/": (1, 30)}
+
+        usage = branch.usage(depth=2, max_workers=1, directory=tmp_path)
+        assert {k: (v.count, v.size_bytes) for k, v in usage.items()} == {
+            "": (4, 67), "data/": (3, 62), "data/a/": (1, 20), "data/b/": (2, 42)}
+        # The commit usage was computed once and cached
+        assert listings == [""]
+
+        usage = branch.usage(prefix="data/", depth=0, max_workers=1, directory=tmp_path)
+        assert {k: (v.count, v.size_bytes) for k, v in usage.items()} == {"data/": (3, 62)}
+
+        # A cache file which could not be written is removed
+        def monkey_replace(*_):
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(os, "replace", monkey_replace)
+        with expect_exception_context(OSError):
+            commit.usage(depth=1, max_workers=1, directory=tmp_path)
+        assert not list(tmp_path.glob("usage/**/*.tmp"))
@@ -0,0 +1,185 @@
+import os
+import threading
+
+from lakefs.cache import ObjectCache, _DiscardEntry, _is_commit_id
+from tests.utests.common import expect_exception_context
+
+
+def test_is_commit_id():
+    assert _is_commit_id("a" * 64)
+    assert not _is_commit_id("main")
+    assert not _is_commit_id("a" * 63)
+    assert not _is_commit_id("A" * 64)
+
+
+def test_cache_put_get(tmp_path):
+    cache = ObjectCache(tmp_path, max_size=1024)
+    assert cache.get("checksum", 5) is None
+
+    cached = cache.put("checksum", 5, lambda f: f.write(b"hello") > 0)
+    assert cached.read_at(0) == b"hello"
+    assert cached.read_at(1, 3) == b"ell"
+    assert cached.read_at(10) == b""
+    buf = bytearray(4)
+    assert cached.readinto_at(2, memoryview(buf)) == 3
+    assert buf[:3] == b"llo"
+    cached.close()
+
+    # Entries are shared between cache instances using the same directory
+    other = ObjectCache(tmp_path, max_size=1024)
+    with other.get("checksum", 5) as cached, open(cached.path, "rb") as f:
+        assert f.read() == b"hello"
+
+    # Same checksum with a different size is a different entry
+    assert cache.get("checksum", 6) is None
+
+
+def test_cache_discard(tmp_path):
+    cache = ObjectCache(tmp_path, max_size=1024)
+    # Download reports mismatching content
+    assert cache.put("checksum", 5, lambda f: f.write(b"hello") and False) is None
+    # Size mismatch
+    assert cache.put("checksum", 5, lambda f: f.write(b"hello world") > 0) is None
+    assert cache.get("checksum", 5) is None
+
+    # Failed downloads leave no partial files behind
+    def fail(f):
+        f.write(b"partial")
+        raise ConnectionError
+
+    with expect_exception_context(ConnectionError):
+        cache.put("checksum", 5, fail)
+    assert cache.get("checksum", 5) is None
+    assert all(len(files) == 0 for _, _, files in os.walk(tmp_path / "objects"))
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache = ObjectCache(tmp_path, max_size=25)
+    for i in range(3):
+        with cache.put(f"c{i}", 10, lambda f: f.write(b"0123456789") > 0) as cached:
+            os.utime(cached.path, (i, i))
+
+    # Total size exceeds max_size - the least recently used entry was evicted
+    assert cache.get("c0", 10) is None
+    # Accessing c1 makes c2 the least recently used
+    cache.get("c1", 10).close()
+    cache.put("c3", 10, lambda f: f.write(b"0123456789") > 0).close()
+    assert cache.get("c2", 10) is None
+    for checksum in ("c1", "c3"):
+        with cache.get(checksum, 10) as cached:
+            assert cached is not None
+
+    cache.clear()
+    assert cache.get("c3", 10) is None
+
+
+def test_cache_eviction_scans(tmp_path, monkeypatch):
+    cache = ObjectCache(tmp_path, max_size=100)
+    scans = []
+    entries = ObjectCache._entries
+    monkeypatch.setattr(ObjectCache, "_entries", lambda self: scans.append(1) or entries(self))
+
+    # The total size is tracked incrementally, the directory is scanned once and then only when max_size is exceeded
+    for i in range(10):
+        cache.put(f"c{i}", 10, lambda f: f.write(b"0123456789") > 0).close()
+    assert len(scans) == 1
+    cache.put("c10", 10, lambda f: f.write(b"0123456789") > 0).close()
+    assert len(scans) == 2
+    # Eviction frees space below max_size, so the next entries do not trigger a scan
+    cached = [cache.get(f"c{i}", 10) for i in range(11)]
+    assert sum(c is not None for c in cached) == 9
+    for c in cached:
+        if c is not None:
+            c.close()
+    cache.put("c11", 10, lambda f: f.write(b"0123456789") > 0).close()
+    assert len(scans) == 2
+
+
+def test_cache_refs(tmp_path):
+    cache = ObjectCache(tmp_path)
+    assert cache.lookup("repo", "a" * 64, "path") is None
+    cache.remember("repo", "a" * 64, "path", "checksum", 10)
+    assert cache.lookup("repo", "a" * 64, "path") == ("checksum", 10)
+    assert cache.lookup("repo", "a" * 64, "other") is None
+
+
+def test_cache_concurrent_put(tmp_path):
+    cache = ObjectCache(tmp_path)
+    data = os.urandom(1024 * 1024)
+    results = []
+
+    def put():
+        results.append(cache.put("checksum", len(data), lambda f: f.write(data) > 0))
+
+    threads = [threading.Thread(target=put) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for cached in results:
+        assert cached.read_at(0) == data
+        cached.close()
+
+
+def test_cache_sparse(tmp_path):
+    data = bytes(range(256)) * 4
+    fetches = []
+
+    def fetch(start, n):
+        fetches.append((start, n))
+        return data[start:start + n]
+
+    cache = ObjectCache(tmp_path, block_size=100)
+    cached = cache.open("checksum", len(data), fetch)
+    assert cached.read_at(150, 10) == data[150:160]
+    assert cached.read_at(120, 100) == data[120:220]
+    buf = bytearray(100)
+    assert cached.readinto_at(1000, memoryview(buf)) == 24
+    assert buf[:24] == data[1000:]
+    # Only the accessed blocks were fetched, each block once
+    assert fetches == [(100, 100), (200, 100), (1000, 24)]
+    assert not cached.complete
+    assert cache.get("checksum", len(data)) is None
+
+    # Blocks are shared with other readers
+    other = cache.open("checksum", len(data), fetch)
+    assert other.read_at(100, 200) == data[100:300]
+    assert len(fetches) == 3
+
+    # Once all blocks are present the entry is complete
+    path = other.fill()
+    assert other.complete
+    assert fetches[3:] == [(0, 100), (300, 700)]
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert cached.read_at(0) == data
+    cached.close()
+    other.close()
+
+    complete = cache.open("checksum", len(data), lambda *_: 1 / 0)
+    assert complete.read_at(0) == data
+    complete.close()
+    # No partial files are left behind
+    assert [p.name for p in (tmp_path / "objects").rglob("*") if p.is_file()] == [path.name]
+
+    with expect_exception_context(ValueError):
+        ObjectCache(tmp_path).open("checksum", len(data), fetch)
+
+
+def test_cache_sparse_discard(tmp_path):
+    cache = ObjectCache(tmp_path, block_size=4)
+    cached = cache.open("checksum", 10, lambda start, n: b"x" * (n - 1))
+    with expect_exception_context(_DiscardEntry):
+        cached.read_at(0, 4)
+    assert cached.discarded
+    cached.close()
+
+    # A stale bitmap does not describe a newly created sparse file
+    cached = cache.open("checksum", 10, lambda start, n: b"a" * n)
+    assert cached.read_at(0, 4) == b"aaaa"
+    cached.close()
+    cache.clear()
+    cached = cache.open("checksum", 10, lambda start, n: b"b" * n)
+    assert cached.read_at(0) == b"b" * 10
+    cached.close()
@@ -0,0 +1,93 @@
+import lakefs_sdk
+
+import lakefs.commit_graph
+from lakefs.commit_graph import CommitGraph
+from tests.utests.common import get_test_client, get_test_repo
+
+# root <- a1 <- a2 <- merge
+#           \          /
+#            b1 <------
+PARENTS = {"root": [], "a1": ["root"], "a2": ["a1"], "b1": ["a1"], "merge": ["a2", "b1"], "other": []}
+DATES = {"root": 1, "a1": 2, "a2": 3, "b1": 4, "merge": 5, "other": 6}
+REFS = {"main": "merge", "feature": "b1"}
+
+
+def commit_id(name):
+    return f"{DATES[name]:064x}"
+
+
+def sdk_commit(name):
+    return lakefs_sdk.Commit(id=commit_id(name), parents=[commit_id(p) for p in PARENTS[name]], committer="c",
+                             message=name, creation_date=DATES[name], meta_range_id="")
+
+
+def server_log(name):
+    names = {commit_id(n): n for n in PARENTS}
+    pending, seen = [names.get(name, name)], set()
+    while pending:
+        current = max(pending, key=lambda n: DATES[n])
+        pending.remove(current)
+        yield sdk_commit(current)
+        for parent in PARENTS[current]:
+            if parent not in seen:
+                seen.add(parent)
+                pending.append(parent)
+
+
+def test_commit_graph(monkeypatch, tmp_path):
+    clt = get_test_client()
+    calls = []
+
+    def monkey_log_commits(_, ref, amount=None, limit=None, **__):
+        assert limit
+        calls.append(("log", ref))
+        return lakefs_sdk.CommitList(pagination=lakefs_sdk.Pagination(has_more=False, next_offset="", results=0,
+                                                                      max_per_page=amount),
+                                     results=list(server_log(ref))[:amount])
+
+    def monkey_get_commit(_, ref, **__):
+        calls.append(("get", ref))
+        return sdk_commit(REFS[ref])
+
+    with monkeypatch.context():
+        monkeypatch.setattr(clt.sdk_client.refs_api, "log_commits", monkey_log_commits)
+        monkeypatch.setattr(clt.sdk_client.commits_api, "get_commit", monkey_get_commit)
+        monkeypatch.setattr(lakefs.commit_graph, "_LOG_PAGE_SIZE", 2)
+
+        with CommitGraph("repo", clt, directory=tmp_path) as graph:
+            assert [c.message for c in graph.log("main")] == ["merge", "b1", "a2", "a1", "root"]
+            # Missing commits were fetched a page of ancestors at a time
+            assert calls == [("get", "main"), ("log", commit_id("a2")), ("log", commit_id("b1")),
+                             ("log", commit_id("root"))]
+            assert len(graph) == 5
+            assert [c.message for c in graph.log(commit_id("merge"), max_amount=2)] == ["merge", "b1"]
+
+            calls.clear()
+            assert graph.is_ancestor("feature", "main")
+            assert not graph.is_ancestor("main", "feature")
+            assert graph.is_ancestor(commit_id("a1"), commit_id("a1"))
+            assert graph.merge_base(commit_id("a2"), "feature").message == "a1"
+            assert [c.message for c in graph.between(commit_id("a2"), "main")] == ["merge", "b1"]
+            # Branches are resolved with the server, the graph itself is served locally
+            assert all(kind == "get" for kind, _ in calls)
+
+            assert graph.merge_base(commit_id("other"), "main") is None
+
+            # Walks stop once they pass the ancestor, or reach a commit from both sides
+            fetched = []
+            get = graph.get
+            monkeypatch.setattr(graph, "get", lambda ref: fetched.append(ref) or get(ref))
+            assert not graph.is_ancestor(commit_id("b1"), commit_id("a2"))
+            assert fetched == [commit_id("b1"), commit_id("a2")]
+            assert graph.merge_base(commit_id("merge"), "feature").message == "b1"
+            assert commit_id("root") not in fetched
+
+        # The graph is persisted by repository
+        calls.clear()
+        repo = get_test_repo()
+        with repo.commit_graph(directory=tmp_path) as graph:
+            assert graph.path == tmp_path / "commits" / f"{repo.id}.sqlite"
+        with CommitGraph("repo", clt, directory=tmp_path) as graph:
+            assert [c.message for c in graph.between(commit_id("root"), commit_id("merge"))] == [
+                "merge", "b1", "a2", "a1"]
+            assert not calls
@@ -0,0 +1,91 @@
+import lakefs_sdk
+
+import lakefs.index
+from lakefs.index import ObjectIndex, _index_path
+from lakefs.models import ObjectInfo
+from lakefs.repository import Repository
+from tests.utests.common import get_test_client
+
+PATHS = ("a.txt", "data/a/1.csv", "data/a/2.parquet", "data/b/1.parquet", "data/c.csv", "data/d/e/f.csv", "z.txt")
+COMMIT_ID = "c" * 64
+
+
+def records(paths=PATHS):
+    for i, path in enumerate(paths):
+        yield {"path": path, "path_type": "object", "physical_address": f"address-{i}", "checksum": f"checksum-{i}",
+               "mtime": i, "size_bytes": i * 10, "content_type": "text/plain", "metadata": {"index": str(i)}}
+
+
+def paths_of(items):
+    return [item.path if isinstance(item, ObjectInfo) else ("prefix", item.path) for item in items]
+
+
+def test_index_objects(tmp_path):
+    with ObjectIndex.build(tmp_path / "index.sqlite", records(), user_metadata=True) as index:
+        assert len(index) == len(PATHS)
+        assert index.user_metadata
+        assert paths_of(index.objects()) == list(PATHS)
+        obj = next(index.objects(prefix="data/c"))
+        assert obj == ObjectInfo(path="data/c.csv", physical_address="address-4", checksum="checksum-4", mtime=4,
+                                 size_bytes=40, content_type="text/plain", metadata={"index": "4"})
+
+        assert paths_of(index.objects(delimiter="/")) == ["a.txt", ("prefix", "data/"), "z.txt"]
+        assert paths_of(index.objects(prefix="data/", delimiter="/")) == [
+            ("prefix", "data/a/"), ("prefix", "data/b/"), "data/c.csv", ("prefix", "data/d/")]
+        assert paths_of(index.objects(prefix="data/", delimiter="/", after="data/b/")) == [
+            "data/c.csv", ("prefix", "data/d/")]
+        assert paths_of(index.objects(after="data/b/1.parquet", max_amount=2)) == ["data/c.csv", "data/d/e/f.csv"]
+        assert paths_of(index.objects(prefix="data/", delimiter="/", max_amount=2)) == [
+            ("prefix", "data/a/"), ("prefix", "data/b/")]
+
+        # Wildcards do not match '/'
+        assert paths_of(index.glob("data/*.csv")) == ["data/c.csv"]
+        assert paths_of(index.glob("data/*/*.parquet")) == ["data/a/2.parquet", "data/b/1.parquet"]
+        assert paths_of(index.glob("data/**/*.csv")) == ["data/a/1.csv", "data/c.csv", "data/d/e/f.csv"]
+        assert paths_of(index.glob("data/?.csv")) == ["data/c.csv"]
+        assert paths_of(index.glob("[az].txt")) == ["a.txt", "z.txt"]
+        assert paths_of(index.glob("[!a].txt")) == ["z.txt"]
+
+
+def test_reference_index(monkeypatch, tmp_path):
+    client = get_test_client()
+    ref = Repository(repository_id="test_repo", client=client).ref("main")
+    listings = []
+
+    def monkey_list_objects(*_, ref=None, user_metadata=None, **__):
+        listings.append((ref, user_metadata))
+        results = [lakefs_sdk.ObjectStats(**r) for r in records()]
+        return lakefs_sdk.ObjectStatsList(pagination=lakefs_sdk.Pagination(
+            has_more=False, next_offset="", max_per_page=len(results), results=len(results)), results=results)
+
+    with monkeypatch.context():
+        monkeypatch.setattr(lakefs.index, "_DEFAULT_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(client.sdk_client.objects_api, "list_objects", monkey_list_objects)
+        monkeypatch.setattr(client.sdk_client.commits_api, "get_commit",
+                            lambda *_: lakefs_sdk.Commit(id=COMMIT_ID, parents=[], committer="", message="",
+                                                         creation_date=0, meta_range_id=""))
+
+        with ref.index() as index:
+            assert index.path == _index_path(None, "test_repo", COMMIT_ID)
+            assert paths_of(index.objects()) == list(PATHS)
+            assert next(index.objects()).metadata is None
+        # The index is cached by commit ID
+        with ref.index() as index:
+            assert not index.user_metadata
+        assert listings == [(COMMIT_ID, False)]
+
+        # Requesting user metadata rebuilds the index
+        commit_ref = Repository(repository_id="test_repo", client=client).ref(COMMIT_ID)
+        with commit_ref.index(user_metadata=True) as index:
+            assert next(index.objects()).metadata == {"index": "0"}
+        assert listings == [(COMMIT_ID, False), (COMMIT_ID, True)]
+
+        # Listing the commit uses the index
+        assert paths_of(commit_ref.objects(prefix="data/", delimiter="/")) == [
+            ("prefix", "data/a/"), ("prefix", "data/b/"), "data/c.csv", ("prefix", "data/d/")]
+        assert len(listings) == 2
+
+        # A corrupt index is ignored and the commit is listed by the server
+        _index_path(None, "test_repo", COMMIT_ID).write_bytes(b"not an index")
+        assert paths_of(commit_ref.objects()) == list(PATHS)
+        assert len(listings) == 3
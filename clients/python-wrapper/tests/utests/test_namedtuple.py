@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 from tests.utests.common import expect_exception_context
 from lakefs.namedtuple import LenientNamedTuple
 
@@ -53,3 +56,48 @@ def test_namedtuple():
     kwargs["field5"] = "something"
     nt3 = NamedTupleTest(**kwargs)
     assert nt2 == nt3
+
+
+class DefaultsTest(NamedTupleTest):
+    field4: str = "default"
+    field5: int = None
+
+
+def test_namedtuple_slots():
+    nt = DefaultsTest(field1="1", field2=1, field3=True, field6="unknown")
+    # Fields are stored in slots, with no per-instance dict
+    assert not hasattr(nt, "__dict__")
+    assert nt.field4 == "default"
+    assert nt.field5 is None
+    assert str(nt) == str({"field1": "1", "field2": 1, "field3": True, "field4": "default", "field5": None})
+    assert nt == DefaultsTest(field1="1", field2=1, field3=True, field4="default")
+    assert nt != DefaultsTest(field1="1", field2=1, field3=True, field4="other")
+
+    # Unknown fields are kept per instance
+    other = DefaultsTest(field1="1", field2=1, field3=True, field7="other")
+    assert nt.unknown == {"field6": "unknown"}
+    assert other.unknown == {"field7": "other"}
+    # Equal unknown values of different types are not conflated
+    values = [DefaultsTest(field1="1", field2=1, field3=True, field6=v).unknown["field6"] for v in (1, True)]
+    assert [repr(v) for v in values] == ["1", "True"]
+
+    with expect_exception_context(AttributeError):
+        nt.field4 = "2"
+
+    with expect_exception_context(TypeError):
+        DefaultsTest(field1="1", field2=1)
+
+
+def test_namedtuple_pickle_and_copy():
+    nt = DefaultsTest(field1="1", field2=1, field3=True, field5=[1, 2], field6="unknown")
+    for clone in (pickle.loads(pickle.dumps(nt)), copy.copy(nt), copy.deepcopy(nt)):
+        assert isinstance(clone, DefaultsTest)
+        assert clone == nt
+        assert clone.unknown == {"field6": "unknown"}
+        with expect_exception_context(AttributeError):
+            clone.field1 = "2"
+
+    # A deep copy does not share mutable field values
+    deep = copy.deepcopy(nt)
+    assert deep.field5 is not nt.field5
+    assert copy.copy(nt).field5 is nt.field5
@@ -1,4 +1,9 @@
+# pylint: disable=too-many-lines
 import http
+import io
+import json
+import os
+import time
 from contextlib import contextmanager
 from typing import get_args
 import urllib3
@@ -7,6 +12,10 @@ import pytest
 
 import lakefs_sdk.api
 
+import lakefs.object
+from lakefs.cache import ObjectCache
+from lakefs.exceptions import ServerException
+
 from lakefs.object import ReadModes
 from tests.utests.common import get_test_client, expect_exception_context
 
@@ -44,6 +53,11 @@ class StagingTestLocation(lakefs_sdk.StagingLocation):
         super().__init__(physical_address="physical_address")
 
 
+def unread_responses(responses):
+    # Responses released back to the pool with an unread body
+    return [resp for resp in responses if not resp.closed and resp._fp.read()]
+
+
 @contextmanager
 def readable_object_context(monkey, **kwargs):
     with monkey.context():
@@ -114,7 +128,7 @@ class TestObjectReader:
         object_stats = ObjectTestStats()
         object_stats.path = test_kwargs.path
         object_stats.size_bytes = len(data)
-        patch_setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args: object_stats)
+        patch_setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: object_stats)
 
         # read negative
         with expect_exception_context(OSError):
@@ -178,7 +192,7 @@ class TestObjectReader:
                 object_stats = ObjectTestStats()
                 object_stats.path = test_kwargs.path
                 object_stats.size_bytes = len(data)
-                monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args: object_stats)
+                monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: object_stats)
 
                 # Read whole file
                 start_pos = 0
@@ -200,6 +214,530 @@ class TestObjectReader:
 
                 assert fd.tell() == start_pos + object_stats.size_bytes
 
+    @staticmethod
+    def monkey_ranged_get_object(data, requests):
+        def monkey_get_object(_, repository, ref, path, range, presign, **__):  # pylint: disable=W0622
+            requests.append(range)
+            if range is None:
+                return data
+            start, end = range[len("bytes="):].split("-")
+            start = int(start)
+            if start >= len(data):
+                raise lakefs_sdk.exceptions.ApiException(status=http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            return data[start:int(end) + 1] if end else data[start:]
+
+        return monkey_get_object
+
+    def test_buffered_read(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = bytes(range(256)) * 10
+        requests = []
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: ObjectTestStats())
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", self.monkey_ranged_get_object(data, requests))
+            with obj.reader(mode="rb", block_size=1024, max_blocks=2, read_ahead=False) as fd:
+                # Small reads inside a cached block don't touch the network
+                assert fd.read(10) == data[:10]
+                assert fd.read(100) == data[10:110]
+                assert requests == ["bytes=0-1023"]
+
+                # Read across block boundary
+                fd.seek(1000)
+                assert fd.read(100) == data[1000:1100]
+                assert fd.tell() == 1100
+                assert requests == ["bytes=0-1023", "bytes=1024-2047"]
+
+                # Block 0 is still cached
+                fd.seek(5)
+                assert fd.read(5) == data[5:10]
+                assert len(requests) == 2
+
+                # Read until EOF and past it
+                fd.seek(2000)
+                assert fd.read() == data[2000:]
+                assert fd.tell() == len(data)
+                assert fd.read(10) == b""
+
+                # Block 0 was evicted from the LRU
+                fd.seek(0)
+                assert fd.read(1) == data[:1]
+                assert requests[-1] == "bytes=0-1023"
+
+    def test_buffered_read_ahead(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = b"0123456789" * 100
+        requests = []
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: ObjectTestStats())
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", self.monkey_ranged_get_object(data, requests))
+            with obj.reader(mode="rb", block_size=300) as fd:
+                contents = b""
+                while chunk := fd.read(64):
+                    contents += chunk
+                assert contents == data
+                # Each block is fetched exactly once
+                assert sorted(requests) == sorted(["bytes=0-299", "bytes=300-599", "bytes=600-899", "bytes=900-1199"])
+
+            with expect_exception_context(ValueError):
+                obj.reader(block_size=0)
+
+    @pytest.mark.parametrize("block_size", [None, 7])
+    def test_readline_streaming(self, monkeypatch, tmp_path, block_size):
+        test_kwargs = ObjectTestKWArgs()
+        lines = [b"first line\n", b"\n", b"a much longer line that spans several chunks\n", b"no newline"]
+        data = b"".join(lines)
+        requests = []
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: ObjectTestStats())
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", self.monkey_ranged_get_object(data, requests))
+            monkeypatch.setattr(lakefs.object, "_READLINE_CHUNK_SIZE", 16)
+            with obj.reader(mode="rb", block_size=block_size, read_ahead=False) as fd:
+                # First line requires a single small range request
+                assert fd.readline() == lines[0]
+                if block_size is None:
+                    assert requests == ["bytes=0-15"]
+                assert fd.tell() == len(lines[0])
+                assert list(fd) == lines[1:]
+                assert fd.readline() == b""
+
+                fd.seek(3)
+                assert fd.readline(5) == lines[0][3:8]
+                assert fd.readline() == lines[0][8:]
+                assert fd.readlines(hint=1) == lines[1:2]
+                assert fd.readlines() == lines[2:]
+
+            # Whole object is never requested
+            assert None not in requests
+            assert all(r.endswith(str(int(r[len("bytes="):].split("-")[0]) + (block_size or 16) - 1)) for r in requests)
+
+            with obj.reader(mode="r") as fd:
+                assert fd.readlines() == [line.decode("utf-8") for line in lines]
+
+    @pytest.mark.parametrize("newline,expected_lines", [
+        (None, ["\u03c4\u03bf\n", "a\n", "b\n", "\u03c1\u03bd\n", "end"]),
+        ("", ["\u03c4\u03bf\r\n", "a\r", "b\n", "\u03c1\u03bd\r\n", "end"]),
+        ("\n", ["\u03c4\u03bf\r\n", "a\rb\n", "\u03c1\u03bd\r\n", "end"]),
+        ("\r\n", ["\u03c4\u03bf\r\n", "a\rb\n\u03c1\u03bd\r\n", "end"]),
+    ])
+    def test_read_text(self, monkeypatch, tmp_path, newline, expected_lines):
+        test_kwargs = ObjectTestKWArgs()
+        text = "\u03c4\u03bf\r\na\rb\n\u03c1\u03bd\r\nend"
+        data = text.encode("utf-8")
+        requests = []
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: ObjectTestStats())
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", self.monkey_ranged_get_object(data, requests))
+            # Multi-byte characters and "\r\n" span chunk boundaries
+            monkeypatch.setattr(lakefs.object, "_READLINE_CHUNK_SIZE", 3)
+
+            with obj.reader(mode="r", newline=newline) as fd:
+                assert list(fd) == expected_lines
+                assert fd.tell() == len(data)
+
+            with obj.reader(mode="r", newline=newline) as fd:
+                chars = []
+                while c := fd.read(1):
+                    chars.append(c)
+                assert "".join(chars) == "".join(expected_lines)
+
+            with obj.reader(mode="r", newline=newline) as fd:
+                assert fd.readline() == expected_lines[0]
+                pos = fd.tell()
+                assert pos == len(expected_lines[0].encode("utf-8")) + (1 if newline is None else 0)
+                rest = fd.read()
+                fd.seek(pos)
+                assert fd.read(len(rest)) == rest
+                fd.seek(0)
+                assert fd.readline(1) == expected_lines[0][0]
+                assert fd.read(1) == expected_lines[0][1]
+
+            # The whole object is read with a single request
+            requests.clear()
+            with obj.reader(mode="r", newline=newline) as fd:
+                assert fd.read() == "".join(expected_lines)
+            assert requests == [None]
+
+            with expect_exception_context(ValueError):
+                obj.reader(mode="r", newline="x")
+            with expect_exception_context(ValueError):
+                obj.reader(mode="rb", newline="\n")
+
+    def test_read_presigned_direct(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = b"0123456789" * 10
+        stat_calls = []
+        store_requests = []
+        expiry = int(time.time()) + 3600
+        rejected_urls = set()
+
+        def monkey_stat_object(*_, presign=None, **__):
+            assert presign
+            stat_calls.append(presign)
+            stats = ObjectTestStats()
+            stats.physical_address = f"https://bucket.s3.amazonaws.com/obj?sig={len(stat_calls)}"
+            stats.physical_address_expiry = expiry
+            return stats
+
+        def monkey_request(_, method, url, headers, **__):
+            assert method == "GET"
+            store_requests.append((url, headers.get("Range")))
+            if url in rejected_urls:
+                return urllib3.response.HTTPResponse(status=http.HTTPStatus.FORBIDDEN)
+            start, end = headers["Range"][len("bytes="):].split("-")
+            return urllib3.response.HTTPResponse(body=data[int(start):int(end) + 1],
+                                                 status=http.HTTPStatus.PARTIAL_CONTENT)
+
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", monkey_stat_object)
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: 1 / 0)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            with obj.reader(mode="rb", block_size=10, read_ahead=False) as fd:
+                assert fd.read(25) == data[:25]
+                assert fd.read(5) == data[25:30]
+            # Presigned URL is resolved once, data is read directly from the object store
+            assert len(stat_calls) == 1
+            assert store_requests == [("https://bucket.s3.amazonaws.com/obj?sig=1", f"bytes={i}-{i + 9}")
+                                      for i in range(0, 30, 10)]
+
+            # URL which is about to expire is refreshed before use
+            expiry = int(time.time()) + 10
+            with obj.reader(mode="rb") as fd:
+                assert fd.read(10) == data[:10]
+                assert fd.read(10) == data[10:20]
+            assert len(stat_calls) == 3
+
+            # URL rejected by the object store is refreshed and request retried
+            expiry = int(time.time()) + 3600
+            with obj.reader(mode="rb") as fd:
+                assert fd.read(10) == data[:10]
+                rejected_urls.add(store_requests[-1][0])
+                assert fd.read(10) == data[10:20]
+            assert len(stat_calls) == 5
+
+    def test_readinto_releases_connections(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = b"0123456789"
+        responses = []
+
+        def monkey_stat_object(*_, presign=None, **__):
+            stats = ObjectTestStats()
+            stats.physical_address = f"https://bucket.s3.amazonaws.com/obj?sig={len(responses)}"
+            stats.physical_address_expiry = int(time.time()) + 3600
+            return stats
+
+        class BrokenBody(io.BytesIO):
+            def read(self, size=-1):
+                if self.tell() > 0:
+                    raise urllib3.exceptions.ProtocolError("Connection broken")
+                return super().read(1)
+
+        def monkey_request(_, method, url, headers, preload_content=True, **__):
+            assert method == "GET"
+            assert not preload_content
+            if url.endswith("sig=0"):
+                body = io.BytesIO(b"<Error>Request has expired</Error>")
+                status = http.HTTPStatus.FORBIDDEN
+            else:
+                start, end = headers["Range"][len("bytes="):].split("-")
+                body = io.BytesIO(data[int(start):int(end) + 1]) if len(responses) < 2 else BrokenBody(data)
+                status = http.HTTPStatus.PARTIAL_CONTENT
+            responses.append(urllib3.response.HTTPResponse(body=body, status=status, preload_content=False))
+            return responses[-1]
+
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", monkey_stat_object)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+            with obj.reader(mode="rb", pre_sign=True) as fd:
+                buf = bytearray(len(data))
+                assert fd.readinto(buf) == len(data)
+                assert buf == data
+                with expect_exception_context(urllib3.exceptions.ProtocolError):
+                    fd.readinto(buf)
+
+        # The rejected response is drained, and the broken response is closed, before their connections are reused
+        assert len(responses) == 3
+        assert not unread_responses(responses)
+
+    @pytest.mark.parametrize("pre_sign", [True, False])
+    def test_readinto(self, monkeypatch, tmp_path, pre_sign):
+        test_kwargs = ObjectTestKWArgs()
+        data = bytes(range(256)) * 4
+        requests = []
+
+        def monkey_request(_, method, url, headers, preload_content=True, **__):
+            assert method == "GET"
+            assert not preload_content
+            assert f"path={test_kwargs.path}" in url
+            assert ("presign=true" in url) == pre_sign
+            requests.append(headers["Range"])
+            start, end = headers["Range"][len("bytes="):].split("-")
+            if int(start) >= len(data):
+                return urllib3.response.HTTPResponse(status=http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            return urllib3.response.HTTPResponse(body=io.BytesIO(data[int(start):int(end) + 1]),
+                                                 status=http.HTTPStatus.PARTIAL_CONTENT,
+                                                 preload_content=False)
+
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: ObjectTestStats())
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: 1 / 0)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            with obj.reader(mode="rb", pre_sign=pre_sign) as fd:
+                buf = bytearray(100)
+                assert fd.readinto(buf) == 100
+                assert buf == data[:100]
+                view = memoryview(buf)[10:20]
+                assert fd.readinto(view) == 10
+                assert buf[10:20] == data[100:110]
+                assert fd.tell() == 110
+
+                fd.seek(len(data) - 5)
+                assert fd.readinto(buf) == 5
+                assert buf[:5] == data[-5:]
+                assert fd.readinto(buf) == 0
+                assert requests == ["bytes=0-99", "bytes=100-109", f"bytes={len(data) - 5}-{len(data) + 94}",
+                                    f"bytes={len(data)}-{len(data) + 99}"]
+
+            with io.BufferedReader(obj.reader(mode="rb", pre_sign=pre_sign), buffer_size=300) as fd:
+                assert fd.read(10) == data[:10]
+                assert fd.read(len(data)) == data[10:]
+
+            with obj.reader(mode="r", pre_sign=pre_sign) as fd:
+                with expect_exception_context(io.UnsupportedOperation):
+                    fd.readinto(bytearray(1))
+
+    def test_read_ranges(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = bytes(range(256)) * 8
+        requests = []
+
+        def monkey_request(_, method, url, headers, preload_content=True, **__):
+            assert method == "GET"
+            assert not preload_content
+            requests.append(headers["Range"])
+            start, end = headers["Range"][len("bytes="):].split("-")
+            if int(start) >= len(data):
+                return urllib3.response.HTTPResponse(status=http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            return urllib3.response.HTTPResponse(body=io.BytesIO(data[int(start):int(end) + 1]),
+                                                 status=http.HTTPStatus.PARTIAL_CONTENT,
+                                                 preload_content=False)
+
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: ObjectTestStats())
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: 1 / 0)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            ranges = [(2000, 100), (0, 10), (20, 5), (5, 10), (1000, 0)]
+            result = obj.read_ranges(ranges, pre_sign=False, max_gap=16)
+            assert [bytes(r) for r in result] == [data[2000:], data[0:10], data[20:25], data[5:15], b""]
+            # Nearby ranges are merged into a single request, empty ranges are not fetched
+            assert sorted(requests) == ["bytes=0-24", "bytes=2000-2099"]
+
+            requests.clear()
+            result = obj.read_ranges([(0, 10), (100, 10)], pre_sign=False, max_gap=100)
+            assert [bytes(r) for r in result] == [data[0:10], data[100:110]]
+            assert requests == ["bytes=0-109"]
+
+            with expect_exception_context(ValueError):
+                obj.read_ranges([(-1, 10)], pre_sign=False)
+            with obj.reader(mode="r", pre_sign=False) as fd:
+                with expect_exception_context(io.UnsupportedOperation):
+                    fd.read_ranges([(0, 1)])
+
+    @pytest.mark.parametrize("reference_id", ["test_branch", "a" * 64])
+    def test_read_cached(self, monkeypatch, tmp_path, reference_id):
+        test_kwargs = ObjectTestKWArgs()
+        test_kwargs.reference_id = reference_id
+        data = b"cached object data\n" * 10
+        stat_calls = []
+        downloads = []
+
+        def monkey_stat_object(*_, **__):
+            stat_calls.append(1)
+            stats = ObjectTestStats()
+            stats.checksum = "abcdef"
+            stats.size_bytes = len(data)
+            return stats
+
+        revalidations = []
+
+        def monkey_request(_, method, url, headers, **__):
+            assert method == "GET"
+            assert "presign" not in url
+            assert "Range" not in headers
+            if "If-None-Match" in headers:
+                revalidations.append(headers["If-None-Match"])
+                if headers["If-None-Match"] == '"abcdef"':
+                    return urllib3.response.HTTPResponse(status=http.HTTPStatus.NOT_MODIFIED, preload_content=False)
+            downloads.append(url)
+            return urllib3.response.HTTPResponse(body=io.BytesIO(data),
+                                                 headers={"ETag": '"abcdef"', "Content-Length": str(len(data))},
+                                                 status=http.HTTPStatus.OK, preload_content=False)
+
+        cache = ObjectCache(tmp_path)
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", monkey_stat_object)
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: 1 / 0)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            for _ in range(3):
+                with obj.reader(mode="rb", pre_sign=False, cache=cache) as fd:
+                    assert fd.read(5) == data[:5]
+                    fd.seek(10)
+                    assert fd.readline() == data[10:19]
+                    buf = bytearray(len(data))
+                    assert fd.readinto(buf) == len(data) - 19
+                    assert buf[:len(data) - 19] == data[19:]
+                    assert fd.read() == b""
+
+            # Object downloaded once, branch reads are revalidated by a conditional GET, commit reads are served locally
+            assert len(downloads) == 1
+            if reference_id == "test_branch":
+                assert len(stat_calls) == 0
+                assert revalidations == ['"abcdef"', '"abcdef"']
+            else:
+                assert len(stat_calls) == 1
+                assert len(revalidations) == 0
+
+            # Modified object is not stored under a stale checksum
+            cache.clear()
+            monkeypatch.setattr(urllib3.PoolManager, "request", lambda *args, **kwargs: urllib3.response.HTTPResponse(
+                body=io.BytesIO(b"new data"), headers={"ETag": '"other"'}, status=http.HTTPStatus.OK,
+                preload_content=False))
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: b"new data")
+            with obj.reader(mode="rb", pre_sign=False, cache=cache) as fd:
+                if reference_id == "test_branch":
+                    assert fd.read() == b"new data"
+                    assert cache.get("abcdef", len(data)) is None
+
+    @pytest.mark.parametrize("scenario", ["write_failure", "modified"])
+    def test_read_cached_unread_response(self, monkeypatch, tmp_path, scenario):
+        test_kwargs = ObjectTestKWArgs()
+        if scenario == "write_failure":
+            test_kwargs.reference_id = "a" * 64
+        data = b"0123456789" * 10
+        # A modified object no longer matches the checksum it was stat'ed with
+        etag = '"other"' if scenario == "modified" else '"abcdef"'
+        responses = []
+
+        def monkey_stat_object(*_, **__):
+            stats = ObjectTestStats()
+            stats.checksum = "abcdef"
+            stats.size_bytes = len(data)
+            return stats
+
+        def monkey_request(*_, **__):
+            responses.append(urllib3.response.HTTPResponse(body=io.BytesIO(data), headers={"ETag": etag},
+                                                           status=http.HTTPStatus.OK, preload_content=False))
+            return responses[-1]
+
+        class FailingFile(io.BytesIO):
+            def write(self, b):
+                if self.tell() > 0:
+                    raise OSError("No space left on device")
+                return super().write(b)
+
+        cache = ObjectCache(tmp_path, block_size=len(data) if scenario == "modified" else None)
+        if scenario == "write_failure":
+            monkeypatch.setattr(cache, "put", lambda checksum, size, download: download(FailingFile()))
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", monkey_stat_object)
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: data)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+            monkeypatch.setattr(lakefs.object, "_STREAM_CHUNK_SIZE", 10)
+            with obj.reader(mode="rb", pre_sign=False, cache=cache) as fd:
+                if scenario == "write_failure":
+                    with expect_exception_context(OSError):
+                        fd.read()
+                else:
+                    assert fd.read() == data
+
+        # A response whose body is not read to the end is not returned to the pool with the rest of its body
+        assert len(responses) == 1
+        assert not unread_responses(responses)
+
+    def test_read_cached_revalidate(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        contents = {"v1": b"first version", "v2": b"second version"}
+        current = ["v1"]
+        requests = []
+        responses = []
+
+        def monkey_request(_, method, url, headers, **__):
+            assert method == "GET"
+            requests.append(headers.get("If-None-Match"))
+            etag = f'"{current[0]}"'
+            if headers.get("If-None-Match") == etag:
+                return urllib3.response.HTTPResponse(status=http.HTTPStatus.NOT_MODIFIED, preload_content=False)
+            data = contents[current[0]]
+            responses.append(urllib3.response.HTTPResponse(body=io.BytesIO(data),
+                                                           headers={"ETag": etag, "Content-Length": str(len(data))},
+                                                           status=http.HTTPStatus.OK, preload_content=False))
+            return responses[-1]
+
+        cache = ObjectCache(tmp_path)
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", lambda *args, **kwargs: 1 / 0)
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: 1 / 0)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            for version in ("v1", "v1", "v2", "v2", "v1"):
+                current[0] = version
+                with obj.reader(mode="rb", pre_sign=False, cache=cache) as fd:
+                    assert fd.read() == contents[version]
+
+            # Changed content is downloaded by the conditional GET itself
+            assert requests == [None, '"v1"', '"v1"', '"v2"', '"v2"']
+            assert cache.lookup(test_kwargs.repository_id, test_kwargs.reference_id, test_kwargs.path) == \
+                ("v1", len(contents["v1"]))
+            # Content already cached under the new ETag is not read, its response is not returned to the pool unread
+            assert not unread_responses(responses)
+
+    def test_read_sparse_cached(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        test_kwargs.reference_id = "a" * 64
+        data = bytes(range(256)) * 4
+        requests = []
+
+        def monkey_stat_object(*_, **__):
+            stats = ObjectTestStats()
+            stats.checksum = "abcdef"
+            stats.size_bytes = len(data)
+            return stats
+
+        def monkey_request(_, method, url, headers, **__):
+            assert method == "GET"
+            requests.append(headers["Range"])
+            start, end = headers["Range"][len("bytes="):].split("-")
+            return urllib3.response.HTTPResponse(body=io.BytesIO(data[int(start):int(end) + 1]),
+                                                 headers={"ETag": '"abcdef"'},
+                                                 status=http.HTTPStatus.PARTIAL_CONTENT, preload_content=False)
+
+        cache = ObjectCache(tmp_path, block_size=100)
+        with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "stat_object", monkey_stat_object)
+            monkeypatch.setattr(lakefs_sdk.api.ObjectsApi, "get_object", lambda *args, **kwargs: 1 / 0)
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            with obj.reader(mode="rb", pre_sign=False, cache=cache) as fd:
+                fd.seek(150)
+                assert fd.read(100) == data[150:250]
+            with obj.reader(mode="rb", pre_sign=False, cache=cache) as fd:
+                fd.seek(120)
+                buf = bytearray(50)
+                assert fd.readinto(buf) == 50
+                assert buf == data[120:170]
+            # Only the accessed blocks were fetched, and the second reader was served from the cache
+            assert requests == ["bytes=100-299"]
+
+            with obj.mmap(cache, pre_sign=False) as m:
+                assert m[:] == data
+            assert requests == ["bytes=100-299", "bytes=0-99", "bytes=300-1023"]
+            with obj.mmap(cache, pre_sign=False) as m:
+                assert m[1000:] == data[1000:]
+            assert len(requests) == 3
+
     def test_read_invalid_mode(self, monkeypatch, tmp_path):
         test_kwargs = ObjectTestKWArgs()
         with readable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
@@ -245,3 +783,238 @@ class TestObjectWriter:
             with obj.reader() as fd:
                 with expect_exception_context(OSError):
                     fd.fileno()
+
+    def test_upload_failure(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        with writeable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(urllib3.PoolManager, "request", lambda *args, **kwargs: urllib3.response.HTTPResponse(
+                status=http.HTTPStatus.INTERNAL_SERVER_ERROR))
+            fd = obj.writer(pre_sign=False)
+            fd.write(b"test_data")
+            with expect_exception_context(ServerException):
+                fd.close()
+            # The write buffer is discarded along with the failed upload
+            assert fd.closed
+
+    @staticmethod
+    def object_stats(path, size):
+        return lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address="physical_address",
+                                      checksum="checksum", size_bytes=size, mtime=12345)
+
+    def test_streaming_raw(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = [b"first chunk", b"x" * 3 * 1024 * 1024, b"last"]
+        received = []
+        request_headers = []
+
+        def monkey_request(_, method, url, headers, body=None, chunked=False, **__):
+            assert method == "POST"
+            assert chunked
+            request_headers.append(headers)
+            received.extend(body)
+            stats = self.object_stats(test_kwargs.path, len(b"".join(received)))
+            return urllib3.response.HTTPResponse(body=json.dumps(stats.to_dict()).encode(), status=201)
+
+        with writeable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+            with obj.writer(mode="wb", pre_sign=False, content_type="text/plain", metadata={"key": "value"},
+                            streaming=True) as fd:
+                for chunk in data:
+                    assert fd.write(chunk) == len(chunk)
+                assert fd.tell() == len(b"".join(data))
+            assert b"".join(received) == b"".join(data)
+            assert request_headers[0]["Content-Type"] == "text/plain"
+            assert request_headers[0]["x-lakefs-meta-key"] == "value"
+            # Large writes are split into bounded chunks
+            assert max(len(chunk) for chunk in received) <= lakefs.object._STREAM_CHUNK_SIZE
+
+            # Discarded writer aborts the request body
+            received.clear()
+            with obj.writer(mode="wb", pre_sign=False, streaming=True) as fd:
+                fd.write(b"partial")
+                fd.discard()
+            assert fd.closed
+            assert received == [b"partial"]
+
+    def test_streaming_multipart(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = b"0123456789" * 5 + b"tail"
+        puts = []
+        calls = []
+
+        def monkey_create(*_, parts=None, **__):
+            calls.append("create")
+            urls = [f"https://store/part{i + 1}" for i in range(parts)]
+            return lakefs_sdk.PresignMultipartUpload(upload_id="upload_id", physical_address="s3://bucket/address",
+                                                     presigned_urls=urls)
+
+        def monkey_complete(_, repository, branch, upload_id, path, complete_presign_multipart_upload, **__):
+            calls.append("complete")
+            assert upload_id == "upload_id"
+            assert complete_presign_multipart_upload.physical_address == "s3://bucket/address"
+            assert complete_presign_multipart_upload.user_metadata == {"key": "value"}
+            assert [(p.part_number, p.etag) for p in complete_presign_multipart_upload.parts] == \
+                [(i + 1, f"etag{i + 1}") for i in range(len(puts))]
+            return self.object_stats(path, sum(len(body) for _, body in puts))
+
+        def monkey_request(_, method, url, body=None, headers=None, **__):
+            assert method == "PUT"
+            puts.append((url, body))
+            return urllib3.response.HTTPResponse(status=200, headers={"ETag": f'"etag{len(puts)}"'})
+
+        with writeable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            obj._client.storage_config.pre_sign_multipart_upload = True
+            monkeypatch.setattr(lakefs.object, "_WRITER_PART_SIZE", 20)
+            monkeypatch.setattr(lakefs.object, "_MULTIPART_RETRY_BACKOFF", 0)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "create_presign_multipart_upload", monkey_create)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "complete_presign_multipart_upload", monkey_complete)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "abort_presign_multipart_upload",
+                                lambda *args, **kwargs: calls.append("abort"))
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            with obj.writer(mode="wb", pre_sign=True, metadata={"key": "value"}, streaming=True) as fd:
+                for i in range(0, len(data), 7):
+                    fd.write(data[i:i + 7])
+            assert calls == ["create", "complete"]
+            assert puts == [("https://store/part1", data[:20]), ("https://store/part2", data[20:40]),
+                            ("https://store/part3", data[40:])]
+
+            # Failed part upload aborts the multipart upload
+            calls.clear()
+            monkeypatch.setattr(urllib3.PoolManager, "request",
+                                lambda *args, **kwargs: urllib3.response.HTTPResponse(status=500))
+            with expect_exception_context(ServerException):
+                with obj.writer(mode="wb", pre_sign=True, streaming=True) as fd:
+                    fd.write(data)
+            assert calls == ["create", "abort"]
+
+            # Stream smaller than a single part is uploaded with a single presigned PUT
+            puts.clear()
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+            staging_location = StagingTestLocation()
+            monkeypatch.setattr(lakefs_sdk.api.StagingApi, "get_physical_address", lambda *args: staging_location)
+
+            def monkey_link_physical_address(*_, staging_metadata: lakefs_sdk.StagingMetadata, **__):
+                assert staging_metadata.size_bytes == 5
+                return self.object_stats(test_kwargs.path, 5)
+
+            monkeypatch.setattr(lakefs_sdk.api.StagingApi, "link_physical_address", monkey_link_physical_address)
+            with obj.writer(mode="w", pre_sign=True, streaming=True) as fd:
+                fd.write("small")
+            assert puts == [(None, b"small")]
+
+    def test_parallel_multipart(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = bytes(range(95))
+        puts = {}
+        failures = {"https://store/part3": 2}
+        calls = []
+
+        def monkey_create(*_, parts=None, **__):
+            calls.append(("create", parts))
+            urls = [f"https://store/part{i + 1}" for i in range(parts)]
+            return lakefs_sdk.PresignMultipartUpload(upload_id="upload_id", physical_address="s3://bucket/address",
+                                                     presigned_urls=urls)
+
+        def monkey_complete(*_, complete_presign_multipart_upload, **__):
+            calls.append(("complete", [(p.part_number, p.etag) for p in complete_presign_multipart_upload.parts]))
+            return self.object_stats(test_kwargs.path, len(data))
+
+        def monkey_request(_, method, url, body=None, headers=None, **__):
+            assert method == "PUT"
+            assert headers["Content-Length"] == len(body)
+            if failures.get(url):
+                failures[url] -= 1
+                return urllib3.response.HTTPResponse(status=http.HTTPStatus.SERVICE_UNAVAILABLE)
+            puts[url] = body
+            return urllib3.response.HTTPResponse(status=200, headers={"ETag": f'"{url[-5:]}"'})
+
+        with writeable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            obj._client.storage_config.pre_sign_multipart_upload = True
+            monkeypatch.setattr(lakefs.object, "_WRITER_PART_SIZE", 10)
+            monkeypatch.setattr(lakefs.object, "_WRITER_MULTIPART_THRESHOLD", 30)
+            monkeypatch.setattr(lakefs.object, "_MULTIPART_RETRY_BACKOFF", 0)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "create_presign_multipart_upload", monkey_create)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "complete_presign_multipart_upload", monkey_complete)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "abort_presign_multipart_upload",
+                                lambda *args, **kwargs: calls.append(("abort",)))
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            obj.upload(data, mode="wb", pre_sign=True)
+            # Parts are uploaded concurrently, failed parts are retried and parts are completed in order
+            assert calls == [("create", 10), ("complete", [(i + 1, f"part{i + 1}"[-5:]) for i in range(10)])]
+            assert b"".join(puts[f"https://store/part{i + 1}"] for i in range(10)) == data
+
+            # A part which keeps failing aborts the upload, after retrying it
+            calls.clear()
+            failures["https://store/part2"] = 100
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+            with expect_exception_context(ServerException):
+                obj.upload(data, mode="wb", pre_sign=True)
+            assert calls == [("create", 10), ("abort",)]
+            assert failures["https://store/part2"] == 100 - lakefs.object._MULTIPART_PART_ATTEMPTS
+
+            # Objects below the threshold use a single PUT
+            calls.clear()
+            staging_location = StagingTestLocation()
+            monkeypatch.setattr(lakefs_sdk.api.StagingApi, "get_physical_address", lambda *args: staging_location)
+            monkeypatch.setattr(lakefs_sdk.api.StagingApi, "link_physical_address",
+                                lambda *args, **kwargs: self.object_stats(test_kwargs.path, 29))
+            monkeypatch.setattr(urllib3.PoolManager, "request",
+                                lambda *args, **kwargs: urllib3.response.HTTPResponse(status=200))
+            obj.upload(data[:29], mode="wb", pre_sign=True)
+            assert not calls
+
+
+class TestUploadFile:
+    def test_upload_file(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = os.urandom(1000)
+        local_path = tmp_path / "local_file"
+        local_path.write_bytes(data)
+        bodies = []
+
+        def monkey_request(_, method, url, headers, body=None, **__):
+            assert method == "POST"
+            assert headers["Content-Length"] == str(len(data))
+            # The request body is read directly from the local file
+            assert body.name == str(local_path)
+            bodies.append(body.read())
+            stats = TestObjectWriter.object_stats(test_kwargs.path, len(data))
+            return urllib3.response.HTTPResponse(body=json.dumps(stats.to_dict()).encode(), status=201)
+
+        with writeable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+            assert obj.upload_file(local_path, pre_sign=False) is obj
+            assert bodies == [data]
+
+            with expect_exception_context(FileNotFoundError):
+                obj.upload_file(tmp_path / "missing", pre_sign=False)
+
+    def test_upload_file_multipart(self, monkeypatch, tmp_path):
+        test_kwargs = ObjectTestKWArgs()
+        data = os.urandom(1000)
+        local_path = tmp_path / "local_file"
+        local_path.write_bytes(data)
+        puts = {}
+
+        def monkey_create(*_, parts=None, **__):
+            urls = [f"https://store/part{i + 1}" for i in range(parts)]
+            return lakefs_sdk.PresignMultipartUpload(upload_id="upload_id", physical_address="s3://bucket/address",
+                                                     presigned_urls=urls)
+
+        def monkey_request(_, method, url, body=None, **__):
+            puts[url] = body
+            return urllib3.response.HTTPResponse(status=200, headers={"ETag": '"etag"'})
+
+        with writeable_object_context(monkeypatch, **test_kwargs.__dict__) as obj:
+            obj._client.storage_config.pre_sign_multipart_upload = True
+            monkeypatch.setattr(lakefs.object, "_WRITER_PART_SIZE", 100)
+            monkeypatch.setattr(lakefs.object, "_WRITER_MULTIPART_THRESHOLD", 500)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "create_presign_multipart_upload", monkey_create)
+            monkeypatch.setattr(lakefs_sdk.api.ExperimentalApi, "complete_presign_multipart_upload",
+                                lambda *args, **kwargs: TestObjectWriter.object_stats(test_kwargs.path, len(data)))
+            monkeypatch.setattr(urllib3.PoolManager, "request", monkey_request)
+
+            obj.upload_file(local_path, pre_sign=True)
+            assert b"".join(puts[f"https://store/part{i + 1}"] for i in range(10)) == data
@@ -1,6 +1,13 @@
+import json
+import time
+from types import SimpleNamespace
+
 import lakefs_sdk
+import pytest
 
+import lakefs.reference
 from lakefs import ObjectInfo, CommonPrefix
+from lakefs.reference import generate_listing
 from lakefs.repository import Repository
 from tests.utests.common import get_test_client, expect_exception_context
 
@@ -162,3 +169,235 @@ def test_reference_objects(monkeypatch):
                     item.checksum  # pylint: disable=pointless-statement
 
             assert item.path == f"path-{i}"
+
+
+def test_generate_listing_prefetch():
+    total = 3000
+    requests = []
+
+    def list_items(*_, after=None, amount=None):
+        start = int(after or 0)
+        requests.append(amount)
+        end = min(start + amount, total)
+        return SimpleNamespace(results=[str(i) for i in range(start, end)],
+                               pagination=SimpleNamespace(has_more=end < total, next_offset=str(end)))
+
+    listing = generate_listing(list_items)
+    assert next(listing) == "0"
+    # The second page is fetched in the background while the first one is consumed
+    deadline = time.monotonic() + 5
+    while len(requests) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(requests) == 2
+    assert [int(i) for i in listing] == list(range(1, total))
+    # Page size grows up to the API maximum
+    assert requests == [100, 200, 400, 800, 1000, 1000]
+
+    # Page size is capped by max_amount
+    requests.clear()
+    assert len(list(generate_listing(list_items, max_amount=250))) == 250
+    assert requests == [100, 150]
+
+    # An explicit amount is respected
+    requests.clear()
+    assert len(list(generate_listing(list_items, max_amount=120, amount=50))) == 120
+    assert requests == [50, 50, 20]
+
+
+def delimited_listing_mock(paths, listings):
+    """
+    Returns a list_objects mock serving the given paths, recording the prefix and delimiter of every call
+    """
+
+    def monkey_list_objects(*_, after=None, amount=None, prefix=None, delimiter=None, **__):
+        listings.append((prefix, delimiter))
+        results = []
+        for path in paths:
+            if not path.startswith(prefix or "") or (after and path <= after):
+                continue
+            if delimiter and delimiter in path[len(prefix or ""):]:
+                common = path[:path.index(delimiter, len(prefix or "")) + 1]
+                if not results or results[-1].path != common:
+                    results.append(lakefs_sdk.ObjectStats(path=common, path_type="common_prefix",
+                                                          physical_address="", checksum="", mtime=0))
+                continue
+            results.append(lakefs_sdk.ObjectStats(path=path, path_type="object", physical_address="", checksum="",
+                                                  mtime=0))
+        page = results[:amount]
+        return lakefs_sdk.ObjectStatsList(pagination=lakefs_sdk.Pagination(
+            has_more=len(results) > amount, next_offset=page[-1].path if page else "", max_per_page=amount,
+            results=len(page)), results=page)
+
+    return monkey_list_objects
+
+
+def test_reference_objects_parallel(monkeypatch):
+    ref = get_test_ref()
+    paths = sorted([f"data/{d}/{s}/file-{i}" for d in "abc" for s in "xy" for i in range(7)] +
+                   [f"data/{d}/top" for d in "abc"] + ["data/root", "data/zzz", "other"])
+    listings = []
+    monkey_list_objects = delimited_listing_mock(paths, listings)
+
+    expected = [p for p in paths if p.startswith("data/")]
+    with monkeypatch.context():
+        monkeypatch.setattr(ref._client.sdk_client.objects_api, "list_objects", monkey_list_objects)
+        monkeypatch.setattr(lakefs.reference, "_LISTING_MAX_PAGE_SIZE", 2)
+        assert [o.path for o in ref.objects_parallel(prefix="data/", max_workers=4)] == expected
+        # Partitions were discovered two levels deep, to have enough work for all workers
+        assert ("data/a/", "/") in listings
+        assert ("data/a/x/", None) in listings
+
+        listings.clear()
+        assert sorted(o.path for o in ref.objects_parallel(prefix="data/", ordered=False, max_workers=4)) == expected
+
+        # A prefix with too many entries is listed as a single partition
+        listings.clear()
+        monkeypatch.setattr(lakefs.reference, "_PARALLEL_LISTING_DISCOVERY_LIMIT", 2)
+        assert [o.path for o in ref.objects_parallel(prefix="data/", max_workers=4)] == expected
+        assert ("data/", None) in listings
+
+
+def test_reference_glob(monkeypatch):
+    ref = get_test_ref()
+    paths = sorted([f"logs/{y}-{m:02}/{k}/part-{i}.{e}" for y in (2023, 2024) for m in (1, 2)
+                    for k in ("a", "b") for i in range(3) for e in ("csv", "parquet")] +
+                   ["logs/2024-01/part-0.parquet", "logs/readme", "other/part-0.parquet"])
+    listings = []
+    with monkeypatch.context():
+        monkeypatch.setattr(ref._client.sdk_client.objects_api, "list_objects", delimited_listing_mock(paths, listings))
+        expected = [p for p in paths if p.startswith("logs/2024-") and p.count("/") == 3 and p.endswith(".parquet")
+                    and "/part-" in p]
+        assert [o.path for o in ref.glob("logs/2024-*/?/part-[0-9].parquet", max_workers=3)] == expected
+        # Literal prefixes are pushed down, and only the matching directories are listed
+        assert all(prefix.startswith("logs/2024-") for prefix, _ in listings)
+        assert ("logs/2024-01/a/part-", "/") in listings
+        assert ("logs/2023-01/a/part-", "/") not in listings
+
+        listings.clear()
+        expected = [p for p in paths if p.startswith("logs/") and p.endswith("/part-0.parquet")]
+        assert sorted(o.path for o in ref.glob("logs/**/part-0.parquet", ordered=False)) == expected
+        assert listings == [("logs/", None)]
+
+        assert [o.path for o in ref.glob("logs/2024-0[!1]/b/*-2.csv")] == ["logs/2024-02/b/part-2.csv"]
+        assert not list(ref.glob("logs/*/missing/*"))
+
+
+def test_reference_objects_table(monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    ref = get_test_ref()
+    total = 250
+
+    def monkey_list_objects(repository, ref_id, after=None, amount=None, prefix=None, _preload_content=True, **__):
+        assert (repository, ref_id, prefix) == (ref.repo_id, ref.id, "data/")
+        assert not _preload_content
+        start = int(after or 0)
+        end = min(start + amount, total)
+        results = [lakefs_sdk.ObjectStats(path=f"data/{i:04}", path_type="object", physical_address=f"address-{i}",
+                                          checksum=f"checksum-{i}", size_bytes=i, mtime=1700000000 + i).to_dict()
+                   for i in range(start, end)]
+        pagination = lakefs_sdk.Pagination(has_more=end < total, next_offset=str(end), max_per_page=amount,
+                                           results=len(results))
+        return SimpleNamespace(raw_data=json.dumps({"pagination": pagination.to_dict(), "results": results}).encode())
+
+    with monkeypatch.context():
+        monkeypatch.setattr(ref._client.sdk_client.objects_api, "list_objects_with_http_info", monkey_list_objects)
+        monkeypatch.setattr(lakefs.reference, "_TABLE_BATCH_ROWS", 100)
+        table = ref.objects_table(prefix="data/")
+        assert table.column_names == ["path", "size_bytes", "mtime", "checksum"]
+        assert table.num_rows == total
+        assert table["path"].to_pylist() == [f"data/{i:04}" for i in range(total)]
+        assert table["size_bytes"].to_pylist() == list(range(total))
+        assert table.schema.field("mtime").type == pa.timestamp("s")
+        assert table["mtime"][0].value == 1700000000
+
+        table = ref.objects_table(prefix="data/", max_amount=120, columns=["physical_address", "content_type"])
+        assert table.column_names == ["physical_address", "content_type"]
+        assert table["physical_address"].to_pylist() == [f"address-{i}" for i in range(120)]
+        assert table["content_type"].null_count == 120
+
+        with expect_exception_context(ValueError):
+            ref.objects_table(columns=["path", "owner"])
+
+
+def test_reference_trusted_decoding(monkeypatch):
+    ref = get_test_ref()
+
+    def raw_response(results):
+        pagination = lakefs_sdk.Pagination(has_more=False, next_offset="", max_per_page=len(results),
+                                           results=len(results))
+        return SimpleNamespace(raw_data=json.dumps({"pagination": pagination.to_dict(), "results": results}).encode())
+
+    def monkey_list_objects(*_, _preload_content=True, **__):
+        assert not _preload_content
+        # Optional fields may be missing from the response
+        return raw_response([{"path": "a", "path_type": "object", "physical_address": "address", "checksum": "c",
+                              "size_bytes": 1, "mtime": 2, "unknown_field": "x"},
+                             {"path": "b/", "path_type": "common_prefix", "physical_address": "", "checksum": "",
+                              "mtime": 0}])
+
+    def monkey_log_commits(*_, _preload_content=True, **__):
+        assert not _preload_content
+        return raw_response([{"id": "c1", "parents": [], "committer": "user", "message": "msg", "creation_date": 5,
+                              "meta_range_id": "", "generation": 1}])
+
+    with monkeypatch.context():
+        monkeypatch.setattr(ref._client.config, "trusted_decoding", True)
+        monkeypatch.setattr(ref._client.sdk_client.objects_api, "list_objects_with_http_info", monkey_list_objects)
+        monkeypatch.setattr(ref._client.sdk_client.refs_api, "log_commits_with_http_info", monkey_log_commits)
+
+        obj, prefix = list(ref.objects(delimiter="/"))
+        assert obj == ObjectInfo(path="a", physical_address="address", checksum="c", size_bytes=1, mtime=2)
+        assert obj.content_type is None
+        assert isinstance(prefix, CommonPrefix)
+        assert prefix.path == "b/"
+
+        commit, = ref.log()
+        assert commit.id == "c1"
+        assert commit.metadata is None
+
+
+def test_reference_diff_parallel(monkeypatch):
+    ref = get_test_ref()
+    changes = sorted([(f"data/{d}/file-{i}", "added" if i % 3 else "removed", i) for d in "abc" for i in range(5)] +
+                     [("data/root", "changed", 100), ("top", "added", 1000)])
+    listings = []
+
+    def monkey_diff_refs(**kwargs):
+        assert (kwargs["repository"], kwargs["left_ref"], kwargs["right_ref"]) == (ref.repo_id, ref.id, "other")
+        after, amount, prefix, delimiter = (kwargs.get(k) for k in ("after", "amount", "prefix", "delimiter"))
+        listings.append((prefix, delimiter))
+        results = []
+        for path, change_type, size in changes:
+            if not path.startswith(prefix or "") or (after and path <= after):
+                continue
+            if delimiter and delimiter in path[len(prefix or ""):]:
+                common = path[:path.index(delimiter, len(prefix or "")) + 1]
+                if not results or results[-1].path != common:
+                    results.append(lakefs_sdk.Diff(type="prefix_changed", path=common, path_type="common_prefix"))
+                continue
+            results.append(lakefs_sdk.Diff(type=change_type, path=path, path_type="object", size_bytes=size))
+        page = results[:amount]
+        return lakefs_sdk.DiffList(pagination=lakefs_sdk.Pagination(
+            has_more=len(results) > amount, next_offset=page[-1].path if page else "", max_per_page=amount,
+            results=len(page)), results=page)
+
+    expected = [path for path, _, _ in changes if path.startswith("data/")]
+    with monkeypatch.context():
+        monkeypatch.setattr(ref._client.sdk_client.refs_api, "diff_refs", monkey_diff_refs)
+        monkeypatch.setattr(lakefs.reference, "_LISTING_MAX_PAGE_SIZE", 2)
+        assert [c.path for c in ref.diff_parallel("other", prefix="data/", max_workers=2)] == expected
+        assert ("data/b/", None) in listings
+        assert sorted(c.path for c in ref.diff_parallel("other", prefix="data/", ordered=False)) == expected
+
+        summary = ref.diff_summary("other", max_workers=2)
+        assert summary.total.count == len(changes)
+        assert summary.total.size_bytes == sum(size for _, _, size in changes)
+        assert summary.types["removed"].count == 6
+        assert summary.types["added"].size_bytes == 1000 + 3 * (1 + 2 + 4)
+        assert set(summary.prefixes) == {"", "data/"}
+        assert summary.prefixes[""]["added"].count == 1
+
+        summary = ref.diff_summary("other", prefix="data/")
+        assert set(summary.prefixes) == {"data/", "data/a/", "data/b/", "data/c/"}
+        assert summary.prefixes["data/"] == {"changed": lakefs.ChangeStats(count=1, size_bytes=100)}
+        assert summary.prefixes["data/a/"]["added"] == lakefs.ChangeStats(count=3, size_bytes=7)